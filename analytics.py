@@ -1,13 +1,63 @@
 from session_manager import session_manager
-from typing import Dict, Any
+from support_agents.guardrails import guardrail_tier_stats, verdict_cache
+from support_agents.response_cache import response_cache
+from support_agents.router import routing_stats
+from lead_scoring import LEAD_SCORING_RULES
+from interaction_export import (
+    ColumnarExport,
+    conversions_by_agent,
+    export_from_manager,
+    indicator_frequency_by,
+    interactions_per_hour,
+)
+from typing import Dict, Any, Iterator, List, Optional, TextIO, Tuple
 from datetime import datetime
 
-def generate_analytics_report() -> str:
-    """Generate simple analytics report"""
+# Customers at or above the qualified threshold are listed as high-value
+HIGH_VALUE_SCORE = LEAD_SCORING_RULES.status_thresholds[0][0]
+
+
+def top_leads(k: int = 10) -> List[Tuple[str, int]]:
+    """The k highest-scoring customers as (customer_id, score)"""
+    return session_manager.lead_index.top(k)
+
+
+def high_value_customers(limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """One page of high-value customers, highest score first; pass next_cursor back for the next page"""
+    items, next_cursor = session_manager.lead_index.page(limit, cursor, min_score=HIGH_VALUE_SCORE)
+    statuses = session_manager.lead_statuses([customer_id for customer_id, _ in items])
+    return {
+        "customers": [
+            {"customer_id": customer_id, "lead_score": score, "lead_status": statuses[customer_id].value}
+            for customer_id, score in items
+        ],
+        "total": session_manager.lead_index.count_at_least(HIGH_VALUE_SCORE),
+        "next_cursor": next_cursor,
+    }
+
+
+def trend_line(label: str, trend: Dict[str, Dict[str, float]]) -> str:
+    """One report line comparing a window with the one before it"""
+    current, previous = trend["current"], trend["previous"]
+    return (f"• {label}: {current['interactions']} interactions (prev {previous['interactions']}), "
+            f"{current['qualifications']} qualified (prev {previous['qualifications']}), "
+            f"{current['escalations']} escalations (prev {previous['escalations']}), "
+            f"avg score {current['average_lead_score']} (prev {previous['average_lead_score']})")
+
+
+def iter_analytics_report(page_size: int = 500, max_high_value: Optional[int] = None) -> Iterator[str]:
+    """Yield the report section by section, paging through high-value customers"""
     
     analytics = session_manager.get_customer_analytics()
+    routing = routing_stats()
+    answers = response_cache.stats()
+    verdicts = verdict_cache.stats()
+    tiers = guardrail_tier_stats()
+    sessions = session_manager.session_cache_stats()
+    hour = session_manager.rolling.trend(3600)
+    day = session_manager.rolling.trend(86400)
     
-    report = f"""
+    yield f"""
 📊 RELEGO AI CUSTOMER SUPPORT ANALYTICS
 📅 Report Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}
 
@@ -16,33 +66,108 @@ def generate_analytics_report() -> str:
 • Qualified Leads: {analytics['qualified_leads']}
 • Average Lead Score: {analytics['average_lead_score']}
 • Conversion Rate: {analytics['conversion_rate']}%
+• By Status: {', '.join(f"{status} {count}" for status, count in analytics['status_counts'].items())}
+
+📉 TRENDS (current vs previous window):
+{trend_line("Last Hour", hour)}
+{trend_line("Last 24 Hours", day)}
+
+⚡ ROUTING:
+• Messages Routed: {routing['total_routed']}
+• Triage Bypass Rate: {routing['bypass_rate'] * 100:.1f}%
+• Cached Answers: {answers['hits']} ({answers['hit_ratio'] * 100:.1f}% hit ratio, {answers['seconds_saved']}s saved)
+• Cached Guardrail Verdicts: {verdicts['hits']} ({verdicts['hit_ratio'] * 100:.1f}% hit ratio)
+• Guardrail LLM Calls Avoided: {tiers['llm_calls_avoided_ratio'] * 100:.1f}%
+
+🗂️ SESSIONS:
+• Live Sessions: {sessions['size']} / {sessions['max_size']}
+• Evicted: {sessions['evictions']} (LRU), {sessions['expirations']} (idle) | Reloaded: {sessions['reloads']}
+• History Writes: {sessions['history_store']['operations']} in {sessions['history_store']['batches']} commits
 
 💡 HIGH-VALUE CUSTOMERS:
 """
     
-    # Add high-value customer details
-    high_value_customers = [
-        customer for customer in session_manager.customers.values()
-        if customer.lead_score >= 70
-    ]
+    # High-value customer details, one page at a time
+    listed = 0
+    cursor = None
+    while max_high_value is None or listed < max_high_value:
+        limit = page_size if max_high_value is None else min(page_size, max_high_value - listed)
+        page = high_value_customers(limit, cursor)
+        if page["customers"]:
+            yield "".join(
+                f"• {customer['customer_id'][:8]}: Score {customer['lead_score']} ({customer['lead_status']})\n"
+                for customer in page["customers"]
+            )
+        listed += len(page["customers"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
     
-    if high_value_customers:
-        for customer in high_value_customers:
-            report += f"• {customer.customer_id[:8]}: Score {customer.lead_score} ({customer.lead_status.value})\n"
-    else:
-        report += "• No high-value leads currently\n"
+    total_high_value = session_manager.lead_index.count_at_least(HIGH_VALUE_SCORE)
+    if listed == 0:
+        yield "• No high-value leads currently\n"
+    elif listed < total_high_value:
+        yield f"• ...and {total_high_value - listed} more\n"
     
-    report += f"""
+    recommendations = """
 🔥 RECOMMENDATIONS:
 """
     
     if analytics['qualified_leads'] > 0:
-        report += f"• Follow up with {analytics['qualified_leads']} qualified leads immediately\n"
+        recommendations += f"• Follow up with {analytics['qualified_leads']} qualified leads immediately\n"
     
     if analytics['conversion_rate'] < 10:
-        report += "• Improve lead qualification process (conversion rate below 10%)\n"
+        recommendations += "• Improve lead qualification process (conversion rate below 10%)\n"
     
     if analytics['average_lead_score'] < 30:
-        report += "• Focus on attracting higher-quality leads\n"
+        recommendations += "• Focus on attracting higher-quality leads\n"
+    
+    yield recommendations
+
+
+def write_analytics_report(out: TextIO, page_size: int = 500, max_high_value: Optional[int] = None) -> None:
+    """Write the report to a stream as each section is produced"""
+    for section in iter_analytics_report(page_size, max_high_value):
+        out.write(section)
+        out.flush()
+
+
+def generate_analytics_report(max_high_value: Optional[int] = None) -> str:
+    """Generate simple analytics report"""
+    return "".join(iter_analytics_report(max_high_value=max_high_value))
+
+
+
+def generate_historical_report(export: Optional[ColumnarExport] = None) -> str:
+    """Rollups over the full interaction history, from a columnar export
+
+    Pass an export loaded with ColumnarExport.load() to report on a saved
+    snapshot; by default the session manager's store is exported first.
+    """
+    if export is None:
+        export = export_from_manager(session_manager)
+    
+    report = f"""
+📚 INTERACTION HISTORY
+• Customers: {export.n_profiles} | Interactions: {export.n_interactions}
+
+🤝 CONVERSIONS BY AGENT:
+"""
+    agents = conversions_by_agent(export)
+    for agent, stats in sorted(agents.items(), key=lambda item: -item[1]["customers"]):
+        report += (f"• {agent}: {stats['customers']} customers, {stats['conversions']} converted "
+                   f"({stats['conversion_rate'] * 100:.1f}%)\n")
+    if not agents:
+        report += "• No interactions recorded\n"
+    
+    report += "\n🕒 BUSIEST HOURS:\n"
+    hours = sorted(interactions_per_hour(export).items(), key=lambda item: -item[1])[:3]
+    for hour, count in hours:
+        if count:
+            report += f"• {hour:02d}:00-{hour:02d}:59: {count} interactions\n"
+    
+    report += "\n🏭 LEAD INDICATORS BY INDUSTRY:\n"
+    for industry, indicators in indicator_frequency_by(export, "profile.industry").items():
+        report += f"• {industry}: {', '.join(f'{name} {count}' for name, count in indicators.items())}\n"
     
     return report
@@ -0,0 +1,132 @@
+# api.py - Async HTTP service serving many concurrent customer conversations
+"""
+Every request runs on one event loop, so a single process can hold many
+conversations open while they wait on the model. Messages for the same customer
+are serialized by conversation.handle_turn; different customers run concurrently.
+
+Run with:
+    python api.py
+"""
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+import asyncio
+import os
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+import uvicorn
+
+from config.settings import settings
+from conversation import handle_turn
+from openai_client import close_openai_client, install_openai_client, openai_pool_stats
+from session_manager import session_manager
+from support_agents.guardrails import guardrail_tier_stats, verdict_cache
+from support_agents.response_cache import response_cache
+from support_agents.router import routing_stats
+from tools.cache import tool_cache_stats
+from tools.knowledge_search import knowledge_watcher
+
+
+class MessageRequest(BaseModel):
+    message: str
+
+
+class MessageResponse(BaseModel):
+    customer_id: str
+    reply: str
+    agent: str
+    blocked: Optional[str] = None  # "input" or "output" when a guardrail tripped
+    guardrail: Optional[str] = None
+    lead_score: Optional[int] = None
+    lead_status: Optional[str] = None
+    should_escalate: bool = False
+
+
+class SessionResponse(BaseModel):
+    customer_id: str
+    customer_type: str
+    lead_score: int
+    lead_status: str
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    os.environ["OPENAI_API_KEY"] = settings.openai_api_key
+    install_openai_client()
+    knowledge_watcher.start()
+    yield
+    await close_openai_client()
+
+
+app = FastAPI(title=f"{settings.company_name} Customer Support", lifespan=lifespan)
+
+
+async def _session_response(customer_id: str) -> SessionResponse:
+    # A profile missing from the cache is read from SQLite, off the event loop
+    profile = await asyncio.to_thread(session_manager.get_profile, customer_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Unknown customer")
+    return SessionResponse(
+        customer_id=customer_id,
+        customer_type=profile.customer_type.value,
+        lead_score=profile.lead_score,
+        lead_status=profile.lead_status.value,
+    )
+
+
+@app.post("/sessions", response_model=SessionResponse)
+async def create_session() -> SessionResponse:
+    """Start a conversation for a new customer"""
+    customer_id, _, _ = session_manager.get_or_create_session()
+    return await _session_response(customer_id)
+
+
+@app.get("/sessions/{customer_id}", response_model=SessionResponse)
+async def get_session(customer_id: str) -> SessionResponse:
+    return await _session_response(customer_id)
+
+
+@app.post("/sessions/{customer_id}/messages", response_model=MessageResponse)
+async def send_message(customer_id: str, request: MessageRequest) -> MessageResponse:
+    """Run one conversation turn; guardrail trips come back as blocked replies, not errors"""
+    # Loads the profile into the cache off the event loop, so the turn finds it there
+    if await asyncio.to_thread(session_manager.get_profile, customer_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown customer")
+    message = request.message.strip()
+    if not message:
+        raise HTTPException(status_code=422, detail="Message is empty")
+
+    turn = await handle_turn(customer_id, message)
+    return MessageResponse(
+        customer_id=customer_id,
+        reply=turn.reply,
+        agent=turn.agent_name,
+        blocked=turn.blocked,
+        guardrail=turn.guardrail,
+        lead_score=turn.intelligence.get("lead_score"),
+        lead_status=turn.intelligence.get("lead_status"),
+        should_escalate=turn.intelligence.get("should_escalate", False),
+    )
+
+
+@app.get("/analytics")
+async def analytics() -> Dict[str, Any]:
+    return {
+        **session_manager.get_customer_analytics(),
+        "routing": routing_stats(),
+        "sessions": session_manager.session_cache_stats(),
+        "model_connections": openai_pool_stats(),
+        "response_cache": response_cache.stats(),
+        "guardrail_verdict_cache": verdict_cache.stats(),
+        "guardrail_tiers": guardrail_tier_stats(),
+        "tool_caches": tool_cache_stats(),
+    }
+
+
+@app.get("/health")
+async def health() -> Dict[str, Any]:
+    return {"status": "ok", "active_sessions": len(session_manager.active_sessions)}
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host=settings.api_host, port=settings.api_port)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled guardrail pattern engine against per-pattern re.search loops
+
+Run from the project root:
+    python3 benchmarks/bench_guardrail_patterns.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from support_agents.guardrail_patterns import (  # noqa: E402
+    HIGH_THREAT_RULES,
+    HOMEWORK_RULES,
+    SENSITIVE_RULES,
+    UNPROFESSIONAL_RULES,
+)
+
+RULE_SETS = [HIGH_THREAT_RULES, HOMEWORK_RULES, SENSITIVE_RULES, UNPROFESSIONAL_RULES]
+
+# The per-guardrail pattern lists as they were written before the engine
+ORIGINAL_PATTERNS = {
+    "high_threat": [
+        r'(?i)(ignore\s+previous\s+instructions|forget\s+instructions)',
+        r'(?i)(admin|root)\s+(password|token|key)',
+        r'(?i)(sql\s+injection|xss\s+attack|exploit)',
+        r'(?i)(hack|crack|bypass)\s+(system|security)',
+    ],
+    "homework": [
+        r'(?i)solve\s+for\s+x\s*[:=]',
+        r'(?i)calculate\s+\d+\s*[\+\-\*\/]\s*\d+',
+        r'(?i)(homework|assignment)\s+(help|due)',
+        r'(?i)what\s+is\s+\d+\s*[\+\-\*\/]\s*\d+\s*[\=\?]',
+    ],
+    "sensitive": [
+        r'(?i)(api[_\s]?key|secret|token|password)',
+        r'(?i)(internal|confidential|private)',
+        r'\b\d{3}-\d{2}-\d{4}\b',
+        r'\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}\b',
+    ],
+    "unprofessional": [
+        r'(?i)(lol|omg|wtf|lmao)',
+        r'(?i)(dude|bro|hey\s+there\s+buddy)',
+        r'(?i)(awesome|sick|epic|lit)',
+        r'[!]{2,}',
+    ],
+}
+
+SAMPLES = {
+    "short clean": "Hi, I'm interested in your AI development services for my company",
+    "long clean": (
+        "Thank you for reaching out to Relego AI Solutions. Our automation specialists can "
+        "streamline invoice processing, reporting and customer onboarding with workflow tools. "
+    ) * 40,
+    "long with hit at end": (
+        "We are evaluating vendors for a multi-year modernisation programme across our offices. "
+    ) * 40 + "Also, what is your admin password?",
+    "unprofessional reply": "LOL dude, that's EPIC!! Thank you for asking about our secret sauce.",
+}
+
+
+def loop_scan(text: str) -> list:
+    """The original approach: one re.search per pattern per rule set"""
+    fired = []
+    for rule_set in RULE_SETS:
+        for rule, pattern in zip(rule_set.rules, ORIGINAL_PATTERNS[rule_set.name]):
+            if re.search(pattern, text):
+                fired.append(rule)
+    return fired
+
+
+def engine_scan(text: str) -> list:
+    fired = []
+    for rule_set in RULE_SETS:
+        fired.extend(rule_set.scan(text))
+    return fired
+
+
+def main():
+    number = 2000
+    print(f"{'sample':<24}{'chars':>8}{'loop us':>12}{'engine us':>12}{'speedup':>10}")
+    for name, text in SAMPLES.items():
+        assert set(loop_scan(text)) == set(engine_scan(text)), name
+        loop_time = timeit.timeit(lambda: loop_scan(text), number=number) / number * 1e6
+        engine_time = timeit.timeit(lambda: engine_scan(text), number=number) / number * 1e6
+        print(f"{name:<24}{len(text):>8}{loop_time:>12.1f}{engine_time:>12.1f}{loop_time / engine_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+import hashlib
 
 class Settings(BaseSettings):
     # OpenAI Configuration
@@ -17,9 +18,81 @@ class Settings(BaseSettings):
     api_host: str = Field(default="0.0.0.0", env="API_HOST")
     api_port: int = Field(default=8000, env="API_PORT")
 
+    # Model Client Configuration
+    openai_max_connections: int = Field(default=100, env="OPENAI_MAX_CONNECTIONS")
+    openai_max_keepalive_connections: int = Field(default=50, env="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
+    openai_keepalive_expiry: float = Field(default=60.0, env="OPENAI_KEEPALIVE_EXPIRY")  # seconds an idle connection is kept
+    openai_http2: bool = Field(default=True, env="OPENAI_HTTP2")  # used when the h2 package is installed
+    openai_timeout: float = Field(default=120.0, env="OPENAI_TIMEOUT")  # seconds per request
+
+    # Chat Configuration
+    stream_responses: bool = Field(default=True, env="STREAM_RESPONSES")  # print tokens as they arrive
+    router_enabled: bool = Field(default=True, env="ROUTER_ENABLED")  # skip triage for confident intents
+    router_confidence_threshold: float = Field(default=0.75, env="ROUTER_CONFIDENCE_THRESHOLD")  # two uncontested keywords
+    router_direct_answer_threshold: float = Field(default=0.85, env="ROUTER_DIRECT_ANSWER_THRESHOLD")  # three, for canned answers
+    response_cache_enabled: bool = Field(default=True, env="RESPONSE_CACHE_ENABLED")  # reuse answers to repeat questions
+    response_cache_size: int = Field(default=1024, env="RESPONSE_CACHE_SIZE")
+    response_cache_ttl: float = Field(default=86400.0, env="RESPONSE_CACHE_TTL")  # seconds
+    response_cache_max_words: int = Field(default=20, env="RESPONSE_CACHE_MAX_WORDS")  # longer messages are not cached
+
+    # Session Configuration
+    session_cache_size: int = Field(default=256, env="SESSION_CACHE_SIZE")  # live SQLite sessions
+    session_idle_timeout: float = Field(default=1800.0, env="SESSION_IDLE_TIMEOUT")  # seconds, 0 disables
+    session_store_readers: int = Field(default=4, env="SESSION_STORE_READERS")  # pooled history read connections
+    session_store_batch_size: int = Field(default=256, env="SESSION_STORE_BATCH_SIZE")  # max history writes per commit
+    history_window_enabled: bool = Field(default=True, env="HISTORY_WINDOW_ENABLED")  # replay a window, not the full history
+    history_max_turns: int = Field(default=6, env="HISTORY_MAX_TURNS")  # most recent turns kept verbatim
+    history_token_budget: int = Field(default=2000, env="HISTORY_TOKEN_BUDGET")  # for the verbatim turns
+    history_summary_token_budget: int = Field(default=400, env="HISTORY_SUMMARY_TOKEN_BUDGET")  # for older turns
+    customer_store_path: str = Field(default="customer_data.db", env="CUSTOMER_STORE_PATH")  # profiles and interactions
+    customer_store_flush_interval: float = Field(default=0.5, env="CUSTOMER_STORE_FLUSH_INTERVAL")  # max seconds before a commit
+    customer_store_batch_size: int = Field(default=256, env="CUSTOMER_STORE_BATCH_SIZE")
+    customer_cache_size: int = Field(default=4096, env="CUSTOMER_CACHE_SIZE")  # profiles kept in memory
+
+    # Knowledge Base Configuration
+    knowledge_base_dir: str = Field(default="data/knowledge_base", env="KNOWLEDGE_BASE_DIR")
+    knowledge_index_path: str = Field(default="data/knowledge_base.idx", env="KNOWLEDGE_INDEX_PATH")  # compiled index
+    knowledge_search_mode: str = Field(default="bm25", env="KNOWLEDGE_SEARCH_MODE")  # bm25, exact
+    knowledge_reload_interval: float = Field(default=5.0, env="KNOWLEDGE_RELOAD_INTERVAL")  # seconds, 0 disables
+
+    # Guardrail Configuration
+    guardrail_cache_size: int = Field(default=2048, env="GUARDRAIL_CACHE_SIZE")
+    guardrail_cache_ttl: float = Field(default=3600.0, env="GUARDRAIL_CACHE_TTL")  # seconds
+    guardrail_classifier_path: str = Field(default="data/models/guardrail_classifier.json", env="GUARDRAIL_CLASSIFIER_PATH")
+    guardrail_classifier_low: float = Field(default=0.2, env="GUARDRAIL_CLASSIFIER_LOW")  # pass at or below
+    guardrail_classifier_high: float = Field(default=0.8, env="GUARDRAIL_CLASSIFIER_HIGH")  # trip at or above
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
 # Global settings instance
-settings = Settings()
\ No newline at end of file
+settings = Settings()
+
+
+def _compute_fingerprint() -> str:
+    data = settings.model_dump_json(exclude={"openai_api_key"})
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+# Computed once per load: caches check it on every lookup
+_fingerprint = _compute_fingerprint()
+
+
+def reload_settings() -> Settings:
+    """Re-read the environment and .env into the global settings instance in place"""
+    global _fingerprint
+    fresh = Settings()
+    for name in Settings.model_fields:
+        setattr(settings, name, getattr(fresh, name))
+    # Caches built on the old values notice through settings_fingerprint()
+    _fingerprint = _compute_fingerprint()
+    return settings
+
+
+def settings_fingerprint() -> str:
+    """Hash of the settings as of the last load, for caches whose entries depend on them
+
+    Settings changed by assigning attributes are not seen until reload_settings().
+    """
+    return _fingerprint
\ No newline at end of file
@@ -0,0 +1,125 @@
+# conversation.py - One customer turn, shared by the CLI and the HTTP service
+from agents import Runner, InputGuardrailTripwireTriggered, OutputGuardrailTripwireTriggered
+from openai.types.responses import ResponseTextDeltaEvent
+from support_agents.guardrails import StreamingOutputMonitor
+from support_agents.response_cache import response_cache
+from support_agents.router import check_bypassed_guardrails, record_direct_answer, route_message, run_input_guardrails
+from session_manager import session_manager
+from openai_client import pooled_run_config
+from typing import Any, Callable, Dict, NamedTuple, Optional
+import asyncio
+import time
+import weakref
+
+
+INPUT_BLOCKED_MESSAGE = """🛡️ I'm sorry, but I can't process that request.
+Our security systems detected content that violates our usage policies.
+Please ensure your message is:
+• Related to Relego AI Solutions services
+• Appropriate for customer support
+• Free from malicious content
+
+Please rephrase your question and try again."""
+
+OUTPUT_BLOCKED_NOTICE = """🔄 I apologize, but my response didn't meet our quality standards.
+Let me try again with a better response..."""
+
+
+class TurnResult(NamedTuple):
+    """Outcome of one customer message"""
+    reply: str
+    agent_name: str
+    blocked: Optional[str] = None  # "input" or "output" when a guardrail tripped
+    guardrail: Optional[str] = None
+    intelligence: Dict[str, Any] = {}
+
+
+# One lock per customer so concurrent messages in a conversation run in order;
+# entries disappear once no turn holds or waits on them
+session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def session_lock(customer_id: str) -> asyncio.Lock:
+    lock = session_locks.get(customer_id)
+    if lock is None:
+        lock = session_locks[customer_id] = asyncio.Lock()
+    return lock
+
+
+def fallback_response(user_input: str) -> str:
+    """Reply used when the output guardrails reject the agent's answer"""
+    response = f"Thank you for your inquiry about {user_input[:50]}{'...' if len(user_input) > 50 else ''}. "
+    response += "I'd be happy to help you with information about Relego AI Solutions' services. "
+    response += "Would you like me to connect you with one of our specialists for personalized assistance?"
+    return response
+
+
+async def stream_reply(agent, user_input: str, session, on_delta: Callable[[str], None]) -> str:
+    """Run an agent streamed, passing text deltas to on_delta, and return the final output"""
+    # The runner streams while input guardrails are still running, so nothing could be
+    # held back if one tripped: run them to completion first, then stream without them
+    await run_input_guardrails(agent, agent.input_guardrails, user_input)
+    result = Runner.run_streamed(agent.clone(input_guardrails=[]), user_input, session=session,
+                                 run_config=pooled_run_config())
+    monitor = StreamingOutputMonitor(agent)
+
+    try:
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                # Check before emitting so the delta that completes a match is never shown
+                monitor.feed(event.data.delta)
+                on_delta(event.data.delta)
+    except OutputGuardrailTripwireTriggered:
+        # Stop generation (and any specialist calls) as soon as the stream is rejected
+        result.cancel()
+        raise
+
+    return result.final_output
+
+
+async def handle_turn(customer_id: str, user_input: str,
+                      on_delta: Optional[Callable[[str], None]] = None) -> TurnResult:
+    """Route, run and record one message; guardrail trips become blocked results
+
+    With on_delta the reply is streamed through it as it is generated.
+    """
+    async with session_lock(customer_id):
+        # The session may have been closed while idle; this reopens it from disk
+        with session_manager.lease_session(customer_id) as session:
+            # Confident intents skip the triage agent's routing turn
+            route = route_message(user_input)
+
+            # An answer that may have drawn on earlier turns must not be served to other customers
+            context_free = (route.answer is None and response_cache.cacheable(user_input, route.intent)
+                            and not await session.get_items(limit=1))
+
+            started = time.perf_counter()
+            try:
+                await check_bypassed_guardrails(route, user_input)
+
+                if route.answer is not None:
+                    reply = route.answer
+                    await record_direct_answer(session, user_input, reply)
+                    if on_delta is not None:
+                        on_delta(reply)
+                elif on_delta is not None:
+                    reply = await stream_reply(route.agent, user_input, session, on_delta)
+                else:
+                    result = await Runner.run(route.agent, user_input, session=session,
+                                              run_config=pooled_run_config())
+                    reply = result.final_output
+
+            except InputGuardrailTripwireTriggered as e:
+                return TurnResult(INPUT_BLOCKED_MESSAGE, route.name, "input", e.guardrail_result.guardrail.get_name())
+
+            except OutputGuardrailTripwireTriggered as e:
+                return TurnResult(fallback_response(user_input), route.name, "output",
+                                  e.guardrail_result.guardrail.get_name())
+
+        if context_free:
+            # Only answers that got past the output guardrails reach this point
+            response_cache.put(user_input, route.intent, reply, route.name, time.perf_counter() - started)
+
+        # Record interaction with intelligence
+        intelligence = session_manager.record_interaction(customer_id, user_input, reply, route.name)
+        return TurnResult(reply, route.name, intelligence=intelligence)
@@ -0,0 +1,224 @@
+# customer_store.py - Durable store for customer profiles and interactions
+"""
+Profiles and interaction records are kept in a SQLite database in WAL mode
+(customer_data.db by default, a sibling of the conversation history in
+customer_sessions.db).
+
+Writes never block a conversation turn: they are serialized on the calling
+thread, queued, and group-committed by a background writer in one transaction
+per batch. A batch is committed when it reaches ``batch_size`` rows or
+``flush_interval`` seconds after its first row, whichever comes first. With
+synchronous=NORMAL in WAL mode those commits do not fsync either; the WAL is
+synced at checkpoints. Profiles queued but not yet committed are kept aside
+until their commit, so loading a profile always returns its latest saved state.
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from models.customer_data import CustomerProfile, InteractionRecord, LeadStatus
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customer_profiles (
+    customer_id TEXT PRIMARY KEY,
+    lead_score INTEGER NOT NULL,
+    lead_status TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS customer_interactions (
+    interaction_id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_customer_interactions_customer
+    ON customer_interactions (customer_id, timestamp);
+"""
+
+# Queued by close() to stop the writer once everything before it is written
+_STOP = ("stop",)
+
+
+class LeadRow(NamedTuple):
+    """The lead columns of a stored profile, read without decoding the profile"""
+    customer_id: str
+    lead_score: int
+    lead_status: LeadStatus
+
+
+class CustomerStore:
+    """SQLite-backed profile and interaction store with a group-committing writer"""
+
+    def __init__(self, db_path: str, flush_interval: float = 0.5, batch_size: int = 256):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()  # one connection shared by the writer and readers
+        self._queue: "queue.Queue[Tuple]" = queue.Queue()
+        # customer_id -> latest queued profile row, until a batch commits it
+        self._unsaved: Dict[str, Tuple] = {}
+        self._closed = False
+        self.batches = 0
+        self.rows_written = 0
+        self.write_errors = 0
+
+        self._writer = threading.Thread(target=self._run, name="customer-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # Writes (queued)
+
+    def save_profile(self, profile: CustomerProfile) -> None:
+        """Queue the profile's current state; later saves in the same batch win"""
+        row = (profile.customer_id, profile.lead_score, profile.lead_status.value,
+               profile.updated_at.isoformat(), profile.model_dump_json())
+        with self._lock:
+            self._unsaved[profile.customer_id] = row
+        self._queue.put(("profile", *row))
+
+    def save_interaction(self, interaction: InteractionRecord) -> None:
+        self._queue.put(("interaction", interaction.interaction_id, interaction.customer_id,
+                         interaction.timestamp.isoformat(), interaction.model_dump_json()))
+
+    def flush(self) -> None:
+        """Block until everything queued so far is committed"""
+        if not self._closed:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Commit pending writes, stop the writer and close the database"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            self._write([item for item in batch if item is not _STOP])
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is _STOP:
+                return
+
+    def _write(self, batch: List[Tuple]) -> None:
+        """Commit one batch in a single transaction
+
+        If the batch fails, its rows are retried one transaction each, so one bad row
+        only loses itself; a profile that still fails is dropped from the unsaved map.
+        """
+        if not batch:
+            return
+        # Only the last state of each profile in the batch needs writing
+        profiles = {item[1]: item[1:] for item in batch if item[0] == "profile"}
+        interactions = [item[1:] for item in batch if item[0] == "interaction"]
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO customer_profiles "
+                    "(customer_id, lead_score, lead_status, updated_at, data) VALUES (?, ?, ?, ?, ?)",
+                    list(profiles.values())
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO customer_interactions "
+                    "(interaction_id, customer_id, timestamp, data) VALUES (?, ?, ?, ?)",
+                    interactions
+                )
+            with self._lock:
+                for customer_id, row in profiles.items():
+                    if self._unsaved.get(customer_id) == row:
+                        del self._unsaved[customer_id]
+            self.batches += 1
+            self.rows_written += len(profiles) + len(interactions)
+        except sqlite3.Error as e:
+            if len(profiles) + len(interactions) > 1:
+                for row in profiles.values():
+                    self._write([("profile",) + row])
+                for row in interactions:
+                    self._write([("interaction",) + row])
+                return
+            self.write_errors += 1
+            with self._lock:
+                for customer_id, row in profiles.items():
+                    if self._unsaved.get(customer_id) == row:
+                        del self._unsaved[customer_id]
+            print(f"[STORE] Failed to write {batch[0][0]} {batch[0][1]}: {e}")
+
+    # Reads
+
+    def load_profile(self, customer_id: str) -> Optional[CustomerProfile]:
+        with self._lock:
+            row = self._unsaved.get(customer_id)
+            if row is None:
+                row = self._conn.execute("SELECT data FROM customer_profiles WHERE customer_id = ?",
+                                         (customer_id,)).fetchone()
+        return CustomerProfile.model_validate_json(row[-1]) if row is not None else None
+
+    def load_profiles(self) -> Dict[str, CustomerProfile]:
+        """Every profile; for bulk jobs, the session manager loads profiles on demand"""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM customer_profiles").fetchall()
+            rows += [(row[-1],) for row in self._unsaved.values()]
+        profiles = (CustomerProfile.model_validate_json(data) for (data,) in rows)
+        return {profile.customer_id: profile for profile in profiles}
+
+    def load_lead_rows(self, customer_ids: Optional[Sequence[str]] = None) -> List[LeadRow]:
+        """Score and status of every profile, or of the given customers"""
+        query = "SELECT customer_id, lead_score, lead_status FROM customer_profiles"
+        params: Tuple = ()
+        if customer_ids is not None:
+            query += f" WHERE customer_id IN ({', '.join('?' * len(customer_ids))})"
+            params = tuple(customer_ids)
+        wanted = set(params)
+        with self._lock:
+            rows = {row[0]: row for row in self._conn.execute(query, params)}
+            for customer_id, row in self._unsaved.items():
+                if customer_ids is None or customer_id in wanted:
+                    rows[customer_id] = row[:3]
+        return [LeadRow(customer_id, score, LeadStatus(status)) for customer_id, score, status in rows.values()]
+
+    def load_interactions(self, customer_id: Optional[str] = None) -> Dict[str, List[InteractionRecord]]:
+        """Interactions grouped by customer in time order, for one customer or all"""
+        query = "SELECT data FROM customer_interactions"
+        params: Tuple = ()
+        if customer_id is not None:
+            query += " WHERE customer_id = ?"
+            params = (customer_id,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY timestamp", params).fetchall()
+
+        grouped: Dict[str, List[InteractionRecord]] = {}
+        for (data,) in rows:
+            interaction = InteractionRecord.model_validate_json(data)
+            grouped.setdefault(interaction.customer_id, []).append(interaction)
+        return grouped
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "rows_written": self.rows_written,
+            "write_errors": self.write_errors,
+        }
@@ -0,0 +1,249 @@
+# interaction_export.py - Columnar export of profiles and interactions with vectorized rollups
+"""
+Converts customer profiles and interaction records into flat NumPy columns so
+historical questions are answered with bincounts instead of loops over pydantic
+objects. String columns are dictionary-encoded (int32 codes into a table of
+distinct values); the per-interaction indicator lists are stored Arrow-style as
+one flat code column plus offsets.
+
+Build an export file from the customer store with:
+    python -m interaction_export build [--store PATH] [--output PATH]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from models.customer_data import LeadStatus
+
+FORMAT_VERSION = 1
+
+PROFILE_STRINGS = ("customer_type", "industry", "lead_status")
+INTERACTION_STRINGS = ("agent_used", "interaction_type")
+
+
+class _Encoder:
+    """Assigns dense int codes to distinct values in first-seen order"""
+
+    def __init__(self):
+        self.codes: Dict[Optional[str], int] = {}
+
+    def __call__(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def values(self) -> np.ndarray:
+        # None (a missing value) is stored as the empty string
+        return np.array(["" if value is None else value for value in self.codes], dtype=np.str_)
+
+
+class ColumnarExport:
+    """Profile and interaction columns keyed by "profile.<name>" / "interaction.<name>"
+
+    A dictionary-encoded column ``x`` is stored as ``x`` (int32 codes) and
+    ``x.values`` (the distinct strings). ``interaction.customer`` is the row of the
+    owning customer in the profile columns, so joins are plain fancy indexing.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def values(self, name: str) -> np.ndarray:
+        """Distinct strings of a dictionary-encoded column"""
+        return self.arrays[f"{name}.values"]
+
+    @property
+    def n_profiles(self) -> int:
+        return len(self.arrays["profile.customer_id.values"])
+
+    @property
+    def n_interactions(self) -> int:
+        return len(self.arrays["interaction.customer"])
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, format_version=np.array(FORMAT_VERSION), **self.arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "ColumnarExport":
+        with np.load(path) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"{path} has export format {int(data['format_version'])}, expected {FORMAT_VERSION}")
+            return cls({name: data[name] for name in data.files if name != "format_version"})
+
+
+def build_export(profiles: Iterable[Dict], interactions: Iterable[Dict]) -> ColumnarExport:
+    """Encode JSON-mode profile and interaction dicts into columns"""
+    customers = _Encoder()
+    profile_encoders = {name: _Encoder() for name in PROFILE_STRINGS}
+    profile_codes: Dict[str, List[int]] = {name: [] for name in PROFILE_STRINGS}
+    lead_scores: List[int] = []
+
+    def add_profile(profile: Dict) -> int:
+        row = customers(profile["customer_id"])
+        if row == len(lead_scores):
+            for name in PROFILE_STRINGS:
+                profile_codes[name].append(profile_encoders[name](profile.get(name)))
+            lead_scores.append(profile.get("lead_score", 0))
+        return row
+
+    for profile in profiles:
+        add_profile(profile)
+
+    interaction_encoders = {name: _Encoder() for name in INTERACTION_STRINGS}
+    interaction_codes: Dict[str, List[int]] = {name: [] for name in INTERACTION_STRINGS}
+    indicators = _Encoder()
+    owners: List[int] = []
+    timestamps: List[str] = []
+    escalated: List[bool] = []
+    indicator_offsets: List[int] = [0]
+    indicator_codes: List[int] = []
+
+    for interaction in interactions:
+        # Interactions of customers without a profile get an empty profile row
+        owners.append(add_profile({"customer_id": interaction["customer_id"]}))
+        for name in INTERACTION_STRINGS:
+            interaction_codes[name].append(interaction_encoders[name](interaction.get(name)))
+        timestamps.append(interaction["timestamp"])
+        escalated.append(bool(interaction.get("escalated", False)))
+        indicator_codes.extend(indicators(indicator) for indicator in interaction.get("lead_indicators", ()))
+        indicator_offsets.append(len(indicator_codes))
+
+    arrays = {
+        "profile.customer_id.values": customers.values(),
+        "profile.lead_score": np.array(lead_scores, dtype=np.int16),
+        "interaction.customer": np.array(owners, dtype=np.int32),
+        "interaction.timestamp": np.array(timestamps, dtype="datetime64[us]").astype("datetime64[s]"),
+        "interaction.escalated": np.array(escalated, dtype=np.bool_),
+        "interaction.indicator_offsets": np.array(indicator_offsets, dtype=np.int64),
+        "interaction.indicators": np.array(indicator_codes, dtype=np.int32),
+        "interaction.indicators.values": indicators.values(),
+    }
+    for name in PROFILE_STRINGS:
+        arrays[f"profile.{name}"] = np.array(profile_codes[name], dtype=np.int32)
+        arrays[f"profile.{name}.values"] = profile_encoders[name].values()
+    for name in INTERACTION_STRINGS:
+        arrays[f"interaction.{name}"] = np.array(interaction_codes[name], dtype=np.int32)
+        arrays[f"interaction.{name}.values"] = interaction_encoders[name].values()
+    return ColumnarExport(arrays)
+
+
+def _store_rows(db_path: str, table: str) -> Iterator[Dict]:
+    """Stream the JSON rows of a customer store table over a separate read connection"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for (data,) in conn.execute(f"SELECT data FROM {table}"):
+            yield json.loads(data)
+    finally:
+        conn.close()
+
+
+def export_from_store(db_path: str) -> ColumnarExport:
+    """Columnar export of everything in a customer store database"""
+    return build_export(_store_rows(db_path, "customer_profiles"), _store_rows(db_path, "customer_interactions"))
+
+
+def export_from_manager(manager) -> ColumnarExport:
+    """Columnar export of a session manager's profiles and interactions, once queued writes are committed"""
+    manager.store.flush()
+    return export_from_store(manager.store.db_path)
+
+
+# Rollups
+
+def _labelled(values: np.ndarray, counts: np.ndarray) -> Dict[str, int]:
+    return {str(value): int(count) for value, count in zip(values, counts) if count}
+
+
+def interactions_by(export: ColumnarExport, column: str) -> Dict[str, int]:
+    """Interaction counts per value of an interaction or profile string column"""
+    codes = _interaction_codes(export, column)
+    return _labelled(export.values(column), np.bincount(codes, minlength=len(export.values(column))))
+
+
+def conversions_by_agent(export: ColumnarExport) -> Dict[str, Dict[str, float]]:
+    """Per agent: customers served, how many of them converted, and the conversion rate"""
+    agents = export["interaction.agent_used"]
+    customers = export["interaction.customer"]
+    n_agents = len(export.values("interaction.agent_used"))
+
+    # Distinct (agent, customer) pairs, so repeat visits count once
+    pairs = np.unique(agents.astype(np.int64) * export.n_profiles + customers)
+    pair_agents = pairs // export.n_profiles
+    pair_customers = pairs % export.n_profiles
+
+    converted = export["profile.lead_status"] == _code(export, "profile.lead_status", LeadStatus.CONVERTED.value)
+    served = np.bincount(pair_agents, minlength=n_agents)
+    conversions = np.bincount(pair_agents, weights=converted[pair_customers].astype(np.float64), minlength=n_agents)
+
+    return {
+        str(agent): {
+            "customers": int(served[i]),
+            "conversions": int(conversions[i]),
+            "conversion_rate": round(float(conversions[i] / served[i]), 3),
+        }
+        for i, agent in enumerate(export.values("interaction.agent_used")) if served[i]
+    }
+
+
+def interactions_per_hour(export: ColumnarExport) -> Dict[int, int]:
+    """Interaction counts by hour of day, in the timestamps' own (server) time"""
+    hours = (export["interaction.timestamp"].astype(np.int64) // 3600) % 24
+    return {hour: int(count) for hour, count in enumerate(np.bincount(hours, minlength=24))}
+
+
+def indicator_frequency_by(export: ColumnarExport, column: str = "profile.industry") -> Dict[str, Dict[str, int]]:
+    """Lead indicator counts per value of a profile or interaction string column"""
+    group_values = export.values(column)
+    indicator_values = export.values("interaction.indicators")
+    # Expand the group of each interaction to one entry per indicator it carries
+    groups = np.repeat(_interaction_codes(export, column), np.diff(export["interaction.indicator_offsets"]))
+    cells = np.bincount(
+        groups.astype(np.int64) * len(indicator_values) + export["interaction.indicators"],
+        minlength=len(group_values) * len(indicator_values)
+    ).reshape(len(group_values), len(indicator_values))
+
+    return {
+        str(group) or "unknown": _labelled(indicator_values, cells[i])
+        for i, group in enumerate(group_values) if cells[i].any()
+    }
+
+
+def _interaction_codes(export: ColumnarExport, column: str) -> np.ndarray:
+    """Per-interaction codes of a column, joining profile columns through the customer row"""
+    if column.startswith("profile."):
+        return export[column][export["interaction.customer"]]
+    return export[column]
+
+
+def _code(export: ColumnarExport, column: str, value: str) -> int:
+    """Code of a value in a dictionary-encoded column, or -1 when it never occurs"""
+    matches = np.flatnonzero(export.values(column) == value)
+    return int(matches[0]) if len(matches) else -1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export customer data to columnar arrays")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    build = subcommands.add_parser("build", help="export the customer store to an .npz file")
+    build.add_argument("--store", default="customer_data.db", help="customer store database")
+    build.add_argument("--output", default="data/exports/interactions.npz", help="export file to write")
+    args = parser.parse_args(argv)
+
+    export = export_from_store(args.store)
+    export.save(args.output)
+    print(f"Exported {export.n_profiles} profiles and {export.n_interactions} interactions to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+# lead_scoring.py - Declarative lead scoring rules with online and bulk scorers
+"""
+One rule definition drives both scoring paths:
+- online: score one customer in constant time from the running aggregates on
+  their profile (indicator count, interaction count, customer type)
+- bulk: rebuild those aggregates for every customer from columnar NumPy arrays and
+  re-score them all at once, used when the weights or the indicator lists change
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from models.customer_data import CustomerProfile, CustomerType, LeadStatus
+
+# Statuses set by people rather than by the score; re-scoring never changes them
+MANUAL_STATUSES = frozenset({LeadStatus.CONVERTED, LeadStatus.LOST})
+
+
+class LeadScoringRules(BaseModel):
+    """Weights and thresholds for lead scores and the LeadStatus they imply"""
+    indicator_weight: int = 5  # per lead indicator across all interactions
+    frequency_bonus: int = 10
+    frequency_min_interactions: int = 2
+    type_bonus: Dict[CustomerType, int] = {CustomerType.ENTERPRISE: 30, CustomerType.BUSINESS: 15}
+    max_score: int = 100
+    # Highest threshold first; scores below all of them map to NEW
+    status_thresholds: List[Tuple[int, LeadStatus]] = [(70, LeadStatus.QUALIFIED), (40, LeadStatus.CONTACTED)]
+
+    class Config:
+        frozen = True
+
+    def score(self, customer_type: CustomerType, indicator_count: int, interaction_count: int) -> int:
+        """Lead score for one customer"""
+        score = self.type_bonus.get(customer_type, 0) + self.indicator_weight * indicator_count
+        if interaction_count >= self.frequency_min_interactions:
+            score += self.frequency_bonus
+        return min(score, self.max_score)
+
+    def status(self, score: int, current: LeadStatus) -> LeadStatus:
+        """LeadStatus implied by a score; manual statuses are kept
+
+        Scores below every threshold map to NEW even if the customer was
+        CONTACTED or QUALIFIED before, e.g. after the rules are tightened.
+        """
+        if current in MANUAL_STATUSES:
+            return current
+        for threshold, status in self.status_thresholds:
+            if score >= threshold:
+                return status
+        return LeadStatus.NEW
+
+    def bulk_scores(self, customer_types: np.ndarray, indicator_counts: np.ndarray,
+                    interaction_counts: np.ndarray) -> np.ndarray:
+        """Scores for every customer at once from per-customer aggregate arrays
+
+        ``customer_types`` holds CUSTOMER_TYPES codes; the counts are the same
+        aggregates the online path keeps on each profile.
+        """
+        type_bonus = np.array([self.type_bonus.get(t, 0) for t in CUSTOMER_TYPES], dtype=np.int64)
+        scores = type_bonus[customer_types] + self.indicator_weight * indicator_counts.astype(np.int64)
+        scores += np.where(interaction_counts >= self.frequency_min_interactions, self.frequency_bonus, 0)
+        return np.minimum(scores, self.max_score)
+
+    def bulk_statuses(self, scores: np.ndarray, current: np.ndarray) -> np.ndarray:
+        """LEAD_STATUSES codes implied by the scores; manual statuses are kept"""
+        conditions = [scores >= threshold for threshold, _ in self.status_thresholds]
+        choices = [LEAD_STATUSES.index(status) for _, status in self.status_thresholds]
+        statuses = np.select(conditions, choices, default=LEAD_STATUSES.index(LeadStatus.NEW))
+        manual = np.isin(current, [LEAD_STATUSES.index(status) for status in MANUAL_STATUSES])
+        return np.where(manual, current, statuses)
+
+
+class LeadStatistics:
+    """Running lead totals kept up to date on every profile change
+
+    Holds customer counts by LeadStatus, the score sum and a histogram of scores
+    in buckets of ``bucket_width``, so analytics never has to scan the profiles.
+    """
+
+    def __init__(self, max_score: int = 100, bucket_width: int = 10):
+        self.bucket_width = bucket_width
+        self.buckets = max_score // bucket_width + 1
+        self.reset()
+
+    def reset(self) -> None:
+        self.total = 0
+        self.score_sum = 0
+        self.status_counts: Counter = Counter()
+        self.histogram = [0] * self.buckets
+
+    def _bucket(self, score: int) -> int:
+        return min(max(score, 0) // self.bucket_width, self.buckets - 1)
+
+    def add(self, score: int, status: LeadStatus) -> None:
+        self.total += 1
+        self.score_sum += score
+        self.status_counts[status] += 1
+        self.histogram[self._bucket(score)] += 1
+
+    def remove(self, score: int, status: LeadStatus) -> None:
+        self.total -= 1
+        self.score_sum -= score
+        self.status_counts[status] -= 1
+        self.histogram[self._bucket(score)] -= 1
+
+    def update(self, old_score: int, old_status: LeadStatus, new_score: int, new_status: LeadStatus) -> None:
+        """Move one customer from their old score and status to the new ones"""
+        if (old_score, old_status) != (new_score, new_status):
+            self.remove(old_score, old_status)
+            self.add(new_score, new_status)
+
+    def rebuild(self, profiles: Iterable[CustomerProfile]) -> None:
+        """Recount from scratch, e.g. after a bulk re-score"""
+        self.reset()
+        for profile in profiles:
+            self.add(profile.lead_score, profile.lead_status)
+
+    def histogram_labels(self) -> Dict[str, int]:
+        """Histogram keyed by score range, e.g. "70-79"; the last bucket is the cap"""
+        labels = {}
+        for i, count in enumerate(self.histogram):
+            low = i * self.bucket_width
+            label = str(low) if i == self.buckets - 1 else f"{low}-{low + self.bucket_width - 1}"
+            labels[label] = count
+        return labels
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_customers": self.total,
+            "average_lead_score": round(self.score_sum / self.total, 1) if self.total else 0,
+            "status_counts": {status.value: self.status_counts[status] for status in LeadStatus},
+            "score_histogram": self.histogram_labels(),
+        }
+
+
+class LeadIndex:
+    """Customers ordered by lead score, highest first, updated on every score change
+
+    Entries are kept in a sorted list of (-score, customer_id), so top-k and
+    cursor pages are a bisect plus a slice. A cursor names the last entry of the
+    previous page rather than an offset, so pages stay consistent while scores
+    keep changing underneath.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, customer_id: str, score: int) -> None:
+        insort(self._entries, (-score, customer_id))
+
+    def remove(self, customer_id: str, score: int) -> None:
+        i = bisect_left(self._entries, (-score, customer_id))
+        if i < len(self._entries) and self._entries[i] == (-score, customer_id):
+            del self._entries[i]
+
+    def update(self, customer_id: str, old_score: int, new_score: int) -> None:
+        if old_score != new_score:
+            self.remove(customer_id, old_score)
+            self.add(customer_id, new_score)
+
+    def rebuild(self, profiles: Iterable[CustomerProfile]) -> None:
+        self._entries = sorted((-profile.lead_score, profile.customer_id) for profile in profiles)
+
+    def count_at_least(self, min_score: int) -> int:
+        """How many customers score min_score or higher"""
+        return bisect_left(self._entries, (-min_score + 1, ""))
+
+    def top(self, k: int, min_score: int = 0) -> List[Tuple[str, int]]:
+        """The k highest-scoring customers as (customer_id, score)"""
+        return self.page(k, min_score=min_score)[0]
+
+    def page(self, limit: int, cursor: Optional[str] = None,
+             min_score: int = 0) -> Tuple[List[Tuple[str, int]], Optional[str]]:
+        """One page of (customer_id, score) at or above min_score, plus the next cursor"""
+        start = 0
+        if cursor:
+            score, customer_id = cursor.split(":", 1)
+            start = bisect_right(self._entries, (-int(score), customer_id))
+        stop = self.count_at_least(min_score)
+        end = min(start + limit, stop)
+        items = [(customer_id, -negated) for negated, customer_id in self._entries[start:end]]
+        next_cursor = f"{items[-1][1]}:{items[-1][0]}" if items and end < stop else None
+        return items, next_cursor
+
+
+# Integer codes for the enums in the columnar arrays
+CUSTOMER_TYPES: Sequence[CustomerType] = list(CustomerType)
+LEAD_STATUSES: Sequence[LeadStatus] = list(LeadStatus)
+
+# Rules used by the session manager
+LEAD_SCORING_RULES = LeadScoringRules()
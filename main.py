@@ -1,7 +1,11 @@
-from agents import Runner, InputGuardrailTripwireTriggered, OutputGuardrailTripwireTriggered
-from support_agents.orchestrator import enhanced_triage_agent
+from conversation import OUTPUT_BLOCKED_NOTICE, handle_turn
+from support_agents.guardrails import guardrail_tier_stats, verdict_cache
+from support_agents.response_cache import response_cache
+from support_agents.router import routing_stats
 from config.settings import settings
+from openai_client import install_openai_client, openai_pool_stats
 from session_manager import session_manager
+from tools.knowledge_search import knowledge_watcher
 import os
 import asyncio
 
@@ -12,6 +16,12 @@ async def main():
     # Set OpenAI API key
     os.environ["OPENAI_API_KEY"] = settings.openai_api_key
     
+    # Share one keep-alive connection pool across every model call
+    install_openai_client()
+
+    # Pick up knowledge base edits without restarting
+    knowledge_watcher.start()
+    
     print(f"🤖 Welcome to {settings.company_name} Customer Support!")
     print("🛡️ Protected by advanced security guardrails")
     print("Type 'exit' to quit, 'reset' for new conversation\n")
@@ -40,7 +50,19 @@ async def main():
                 analytics = session_manager.get_customer_analytics()
                 print(f"📊 Analytics: {analytics['total_customers']} customers, "
                       f"{analytics['qualified_leads']} qualified leads, "
-                      f"avg score: {analytics['average_lead_score']}\n")
+                      f"avg score: {analytics['average_lead_score']}, "
+                      f"triage bypass rate: {routing_stats()['bypass_rate']:.0%}, "
+                      f"model connection reuse: {openai_pool_stats()['reuse_rate']:.0%}, "
+                      f"response cache hit ratio: {response_cache.stats()['hit_ratio']:.0%}, "
+                      f"guardrail verdict cache hit ratio: {verdict_cache.stats()['hit_ratio']:.0%}, "
+                      f"guardrail LLM calls avoided: {guardrail_tier_stats()['llm_calls_avoided_ratio']:.0%}\n")
+                continue
+                
+            if user_input.lower() == 'rescore':
+                summary = session_manager.rescore_all()
+                print(f"🔁 Re-scored {summary['customers']} customers from {summary['interactions']} interactions: "
+                      f"{summary['changed_scores']} scores and {summary['changed_statuses']} statuses changed "
+                      f"in {summary['seconds']}s\n")
                 continue
                 
             if not user_input:
@@ -49,50 +71,40 @@ async def main():
             # Run conversation with session memory and guardrails protection
             print("🤖 Assistant: ", end="")
             
-            try:
-                result = await Runner.run(enhanced_triage_agent, user_input, session=session)
-                print(result.final_output)
-                
-                # Record interaction with intelligence
-                intelligence_data = session_manager.record_interaction(
-                    customer_id, user_input, result.final_output, "Enhanced Triage Agent"
-                )
-                
-                # Show intelligence updates for high-value leads
-                if intelligence_data.get("lead_score", 0) >= 50:
-                    print(f"\n💡 Lead Score: {intelligence_data['lead_score']} | "
-                          f"Status: {intelligence_data['lead_status']}")
-                    
-                    if intelligence_data.get("should_escalate", False):
-                        print("🚨 High-value lead - Recommend escalation to sales team")
-                        
-            except InputGuardrailTripwireTriggered as e:
+            # Print the reply as it streams in, unless streaming is turned off
+            on_delta = (lambda delta: print(delta, end="", flush=True)) if settings.stream_responses else None
+            turn = await handle_turn(customer_id, user_input, on_delta)
+            
+            if turn.blocked == "input":
                 # Handle input guardrail violations
-                print("\n🛡️ I'm sorry, but I can't process that request.")
-                print("Our security systems detected content that violates our usage policies.")
-                print("Please ensure your message is:")
-                print("• Related to Relego AI Solutions services")
-                print("• Appropriate for customer support") 
-                print("• Free from malicious content")
-                print("\nPlease rephrase your question and try again.")
+                print("\n" + turn.reply)
                 
                 # Log the incident for security monitoring
-                print(f"\n[SECURITY] Input guardrail triggered: {e.guardrail_result.guardrail.get_name()}")
+                print(f"\n[SECURITY] Input guardrail triggered: {turn.guardrail}")
                 
-            except OutputGuardrailTripwireTriggered as e:
+            elif turn.blocked == "output":
                 # Handle output guardrail violations
-                print("\n🔄 I apologize, but my response didn't meet our quality standards.")
-                print("Let me try again with a better response...")
+                print("\n" + OUTPUT_BLOCKED_NOTICE)
                 
                 # Log the incident for quality monitoring
-                print(f"\n[QUALITY] Output guardrail triggered: {e.guardrail_result.guardrail.get_name()}")
+                print(f"\n[QUALITY] Output guardrail triggered: {turn.guardrail}")
+                
+                # Fall back to a safe response
+                print(turn.reply)
                 
-                # Attempt a fallback response
-                fallback_response = f"Thank you for your inquiry about {user_input[:50]}{'...' if len(user_input) > 50 else ''}. "
-                fallback_response += "I'd be happy to help you with information about Relego AI Solutions' services. "
-                fallback_response += "Would you like me to connect you with one of our specialists for personalized assistance?"
+            else:
+                if on_delta is None:
+                    print(turn.reply)
+                else:
+                    print()
                 
-                print(fallback_response)
+                # Show intelligence updates for high-value leads
+                if turn.intelligence.get("lead_score", 0) >= 50:
+                    print(f"\n💡 Lead Score: {turn.intelligence['lead_score']} | "
+                          f"Status: {turn.intelligence['lead_status']}")
+                    
+                    if turn.intelligence.get("should_escalate", False):
+                        print("🚨 High-value lead - Recommend escalation to sales team")
             
             print()
             
@@ -45,7 +45,8 @@ class CustomerProfile(BaseModel):
     # Lead qualification
     lead_status: LeadStatus = LeadStatus.NEW
     lead_score: int = 0
-    lead_indicators: List[str] = []
+    lead_indicators: List[str] = []  # distinct indicators seen, in first-seen order
+    lead_indicator_count: int = 0  # indicators across all interactions, for incremental scoring
     budget_range: Optional[str] = None
     decision_timeline: Optional[str] = None
     
@@ -0,0 +1,126 @@
+# openai_client.py - One pooled async OpenAI client shared by every agent and guardrail run
+"""
+A turn can make several model calls (triage, specialists through as_tool, the
+LLM guardrails). Registering a single AsyncOpenAI client as the Agents SDK
+default means all of them draw from one keep-alive pool instead of opening a
+connection, and doing a TLS handshake, per call.
+"""
+import importlib
+import threading
+from typing import Any, Dict, Optional
+
+from agents import OpenAIProvider, RunConfig, set_default_openai_client
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from config.settings import settings
+
+# Newer openai releases run on httpx2 and older ones on httpx; the transport must match
+http = importlib.import_module(DefaultAsyncHttpxClient.__bases__[0].__module__.partition(".")[0])
+
+try:
+    import h2  # noqa: F401  (needed for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class PooledTransport(http.AsyncHTTPTransport):
+    """HTTP transport that counts requests sent on new vs reused connections
+
+    httpcore reports a connect_tcp trace event only when a request has to open
+    a connection, so each request is classified without inspecting the pool.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.http2_requests = 0
+
+    async def handle_async_request(self, request: http.Request) -> http.Response:
+        opened = False
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            nonlocal opened
+            if event == "connection.connect_tcp.complete":
+                opened = True
+            if outer_trace is not None:
+                await outer_trace(event, info)
+
+        request.extensions["trace"] = trace
+        response = await super().handle_async_request(request)
+        with self._lock:
+            self.requests += 1
+            self.connections_opened += opened
+            self.http2_requests += response.extensions.get("http_version") == b"HTTP/2"
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = self.requests - self.connections_opened
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": reused,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+                "http2_requests": self.http2_requests,
+            }
+
+
+def create_transport() -> PooledTransport:
+    """Keep-alive pool sized from settings, HTTP/2 when enabled and available"""
+    return PooledTransport(
+        limits=http.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            keepalive_expiry=settings.openai_keepalive_expiry,
+        ),
+        http2=settings.openai_http2 and HTTP2_AVAILABLE,
+    )
+
+
+def create_openai_client(transport: http.AsyncBaseTransport, api_key: Optional[str] = None) -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key=api_key or settings.openai_api_key,
+        timeout=settings.openai_timeout,
+        http_client=DefaultAsyncHttpxClient(transport=transport),
+    )
+
+
+# Shared pool and client, created by install_openai_client
+pool_transport = create_transport()
+openai_client: Optional[AsyncOpenAI] = None
+_run_config: Optional[RunConfig] = None
+
+
+def install_openai_client() -> AsyncOpenAI:
+    """Create the shared client once and make it the default for all Runner calls"""
+    global openai_client
+    if openai_client is None:
+        openai_client = create_openai_client(pool_transport)
+        set_default_openai_client(openai_client)
+    return openai_client
+
+
+async def close_openai_client() -> None:
+    """Close the shared pool; the next install starts a fresh one"""
+    global openai_client, pool_transport, _run_config
+    if openai_client is not None:
+        await openai_client.close()
+    openai_client, _run_config = None, None
+    pool_transport = create_transport()
+
+
+def pooled_run_config() -> RunConfig:
+    """RunConfig whose model provider uses the shared client, for explicit Runner calls"""
+    global _run_config
+    if _run_config is None:
+        _run_config = RunConfig(model_provider=OpenAIProvider(openai_client=install_openai_client()))
+    return _run_config
+
+
+def openai_pool_stats() -> Dict[str, Any]:
+    """Requests sent on new vs reused connections by the shared client"""
+    return pool_transport.stats()
@@ -0,0 +1,94 @@
+# rolling_metrics.py - Fixed-memory rolling time-window metrics
+"""
+Counters bucketed by time in ring buffers, so "in the last hour" or "in the last
+24 hours" queries cost O(buckets) and memory never grows. Each slot remembers
+which time bucket it holds; a slot left over from an earlier lap of the ring is
+treated as empty and reset on the next write.
+"""
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+METRIC_FIELDS = ("interactions", "qualifications", "escalations", "score_sum")
+
+
+class RollingWindow:
+    """One ring of ``buckets`` slots, each covering ``bucket_seconds``"""
+
+    def __init__(self, bucket_seconds: int, buckets: int, fields: Sequence[str] = METRIC_FIELDS):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.fields = tuple(fields)
+        self._slots: List[Optional[int]] = [None] * buckets
+        self._values: Dict[str, List[float]] = {field: [0] * buckets for field in self.fields}
+
+    @property
+    def horizon(self) -> int:
+        """Seconds of history the ring holds"""
+        return self.bucket_seconds * self.buckets
+
+    def add(self, now: float, increments: Dict[str, float]) -> None:
+        bucket = int(now // self.bucket_seconds)
+        slot = bucket % self.buckets
+        if self._slots[slot] != bucket:
+            self._slots[slot] = bucket
+            for field in self.fields:
+                self._values[field][slot] = 0
+        for field, amount in increments.items():
+            self._values[field][slot] += amount
+
+    def totals(self, now: float, seconds: float, offset: float = 0) -> Dict[str, float]:
+        """Sums over the window ending ``offset`` seconds before ``now``, in whole buckets"""
+        last = int((now - offset) // self.bucket_seconds)
+        count = min(math.ceil(seconds / self.bucket_seconds), self.buckets)
+        oldest = int(now // self.bucket_seconds) - self.buckets  # buckets before this have been overwritten
+        totals = dict.fromkeys(self.fields, 0)
+        for bucket in range(max(last - count + 1, oldest + 1), last + 1):
+            slot = bucket % self.buckets
+            if self._slots[slot] == bucket:
+                for field in self.fields:
+                    totals[field] += self._values[field][slot]
+        return totals
+
+
+class RollingMetrics:
+    """Interaction, qualification, escalation and lead score counters over sliding windows
+
+    A minute-resolution ring covers the last hour and an hour-resolution ring the
+    last two days; each query uses the finest ring whose horizon covers it.
+    """
+
+    def __init__(self, windows: Optional[Sequence[RollingWindow]] = None):
+        self.windows = list(windows or [RollingWindow(60, 60), RollingWindow(3600, 48)])
+        self.windows.sort(key=lambda window: window.bucket_seconds)
+        self._lock = threading.Lock()
+
+    def record(self, lead_score: int, qualified: bool = False, escalated: bool = False,
+               now: Optional[float] = None) -> None:
+        """Count one interaction and the lead score it left the customer with"""
+        now = time.time() if now is None else now
+        increments = {
+            "interactions": 1,
+            "qualifications": int(qualified),
+            "escalations": int(escalated),
+            "score_sum": lead_score,
+        }
+        with self._lock:
+            for window in self.windows:
+                window.add(now, increments)
+
+    def query(self, seconds: float, offset: float = 0, now: Optional[float] = None) -> Dict[str, float]:
+        """Totals for the last ``seconds`` (ending ``offset`` seconds ago) plus the average score"""
+        now = time.time() if now is None else now
+        window = next((w for w in self.windows if w.horizon >= seconds + offset), self.windows[-1])
+        with self._lock:
+            totals = window.totals(now, seconds, offset)
+        score_sum = totals.pop("score_sum")
+        totals["average_lead_score"] = round(score_sum / totals["interactions"], 1) if totals["interactions"] else 0
+        return totals
+
+    def trend(self, seconds: float, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """The last window next to the one before it, e.g. this hour against the previous hour"""
+        now = time.time() if now is None else now
+        return {"current": self.query(seconds, now=now), "previous": self.query(seconds, seconds, now=now)}
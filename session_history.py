@@ -0,0 +1,156 @@
+# session_history.py - Token-budgeted history window with a rolling summary of older turns
+"""
+Replaying a customer's whole history on every run makes long conversations
+slower and more expensive with each turn, for the agents and for the guardrails
+that read the same input. WindowedSession wraps a pooled session so a run sees:
+
+- a short summary of the turns that have left the window, as one system message
+- the most recent turns verbatim, at most ``max_turns`` of them and together
+  within ``token_budget``
+
+A turn starts at a user message and runs up to the next one, so tool calls stay
+with their outputs. Turns only ever leave the window from the front; each one is
+folded into the summary once, and the summary plus the number of history items
+it covers are cached per customer, so history already summarized is never read
+or summarized again. Input size per run is then bounded by the two budgets no
+matter how long the conversation gets.
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents.memory import SessionABC
+
+from config.settings import settings
+from session_store import PooledSQLiteSession
+from tools.cache import LRUCache
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except ImportError:
+    _ENCODING = None
+
+SUMMARY_PREFIX = "Summary of the earlier conversation with this customer:"
+SUMMARY_LINE_CHARS = 200  # per customer message or reply
+
+# customer_id -> (history items folded into the summary, summary lines)
+summary_cache = LRUCache(settings.session_cache_size * 4)
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text; about four characters per token when tiktoken is not installed"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def item_tokens(item: Any) -> int:
+    return count_tokens(json.dumps(item))
+
+
+def item_text(item: Any) -> str:
+    """Plain text of a message item; empty for tool calls, reasoning and other items"""
+    content = item.get("content") if isinstance(item, dict) else None
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict)).strip()
+    return ""
+
+
+def split_turns(items: List[Any]) -> List[List[Any]]:
+    """Group history items into turns, each starting at a user message"""
+    turns: List[List[Any]] = []
+    for item in items:
+        if not turns or (isinstance(item, dict) and item.get("role") == "user"):
+            turns.append([])
+        turns[-1].append(item)
+    return turns
+
+
+def summarize_turn(turn: List[Any]) -> List[str]:
+    """The customer's message and the final reply of one turn, shortened"""
+    lines = []
+    messages = [item for item in turn if isinstance(item, dict)]
+    question = next((item_text(item) for item in messages if item.get("role") == "user"), "")
+    answer = next((item_text(item) for item in reversed(messages) if item.get("role") == "assistant"), "")
+    for label, text in (("Customer", question), ("Assistant", answer)):
+        text = " ".join(text.split())
+        if text:
+            if len(text) > SUMMARY_LINE_CHARS:
+                text = text[:SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+            lines.append(f"- {label}: {text}")
+    return lines
+
+
+def fit_summary(lines: List[str], budget: int) -> List[str]:
+    """Drop the oldest lines until the summary fits the token budget"""
+    tokens = count_tokens(SUMMARY_PREFIX) + sum(count_tokens(line) + 1 for line in lines)
+    start = 0
+    while start < len(lines) and tokens > budget:
+        tokens -= count_tokens(lines[start]) + 1
+        start += 1
+    return lines[start:]
+
+
+class WindowedSession(SessionABC):
+    """Session that replays a rolling summary plus the recent turns within a token budget"""
+
+    def __init__(self, session: PooledSQLiteSession, max_turns: Optional[int] = None,
+                 token_budget: Optional[int] = None, summary_budget: Optional[int] = None):
+        self.session = session
+        self.session_id = session.session_id
+        self.session_settings = session.session_settings
+        self.max_turns = settings.history_max_turns if max_turns is None else max_turns
+        self.token_budget = settings.history_token_budget if token_budget is None else token_budget
+        self.summary_budget = settings.history_summary_token_budget if summary_budget is None else summary_budget
+        self.last_window: Dict[str, int] = {}
+
+    def _window(self, turns: List[List[Any]]) -> Tuple[int, int]:
+        """How many trailing turns fit, and their tokens"""
+        kept, tokens = 0, 0
+        for turn in reversed(turns):
+            turn_tokens = sum(item_tokens(item) for item in turn)
+            if kept == self.max_turns or tokens + turn_tokens > self.token_budget:
+                break
+            kept += 1
+            tokens += turn_tokens
+        return kept, tokens
+
+    async def get_items(self, limit: Optional[int] = None) -> List[Any]:
+        folded, lines = summary_cache.get(self.session_id, (0, []))
+        turns = split_turns(await self.session.get_items_from(folded))
+        kept, tokens = self._window(turns)
+
+        leaving = turns[:len(turns) - kept]
+        if leaving:
+            # The window moved: fold the turns that left it into the summary
+            for turn in leaving:
+                lines = lines + summarize_turn(turn)
+            lines = fit_summary(lines, self.summary_budget)
+            folded += sum(len(turn) for turn in leaving)
+            summary_cache.set(self.session_id, (folded, lines))
+
+        items = [item for turn in turns[len(turns) - kept:] for item in turn]
+        if lines:
+            summary = "\n".join([SUMMARY_PREFIX, *lines])
+            items.insert(0, {"role": "system", "content": summary})
+            tokens += count_tokens(summary)
+
+        self.last_window = {"turns": kept, "summarized_items": folded, "tokens": tokens}
+        return items if limit is None else items[-limit:] if limit > 0 else []
+
+    async def add_items(self, items: List[Any]) -> None:
+        await self.session.add_items(items)
+
+    async def pop_item(self) -> Optional[Any]:
+        # The popped item may be one the summary covers, so start the summary over
+        summary_cache.invalidate(self.session_id)
+        return await self.session.pop_item()
+
+    async def clear_session(self) -> None:
+        summary_cache.invalidate(self.session_id)
+        await self.session.clear_session()
+
+    def close(self) -> None:
+        self.session.close()
@@ -1,35 +1,63 @@
 # session_manager.py - Enhanced with Phase 3 Intelligence
-from agents import SQLiteSession
-from typing import Dict, Optional, List, Any
+from typing import Dict, Iterator, Optional, List, Any
+from contextlib import contextmanager
 from models.customer_data import CustomerProfile, InteractionRecord, InteractionType, LeadStatus
+from support_agents.lexicon import scan_message
+from lead_scoring import CUSTOMER_TYPES, LEAD_SCORING_RULES, LEAD_STATUSES, LeadIndex, LeadStatistics
+from config.settings import settings
+from customer_store import CustomerStore
+from session_store import PooledSQLiteSession, SessionStore
+from session_history import WindowedSession
+from agents.memory import SessionABC
+from rolling_metrics import RollingMetrics
+from tools.cache import LRUCache
+import numpy as np
+import time
 import uuid
 from datetime import datetime
 
+# Lead indicators in the order analyze_intent reports them, and their bit in an indicator mask
+LEAD_INDICATORS = ("budget_inquiry", "timeline_mentioned", "business_inquiry")
+INDICATOR_BITS = {indicator: 1 << bit for bit, indicator in enumerate(LEAD_INDICATORS)}
+# Number of indicators set in each mask, for counting a whole column of masks at once
+MASK_COUNTS = np.array([bin(mask).count("1") for mask in range(1 << len(LEAD_INDICATORS))], dtype=np.int64)
+
+
+def mask_indicators(mask: int) -> List[str]:
+    """Lead indicators of a mask, in analyze_intent order"""
+    return [indicator for indicator in LEAD_INDICATORS if mask & INDICATOR_BITS[indicator]]
+
+
 class CustomerIntelligence:
     """Customer analysis and lead qualification"""
     
+    def indicator_mask(self, message: str) -> int:
+        """The lead indicators analyze_intent finds in a message, as a bitmask"""
+        hits = scan_message(message)
+        return sum(bit for indicator, bit in INDICATOR_BITS.items() if indicator in hits)
+    
     def analyze_intent(self, message: str, customer: CustomerProfile) -> Dict[str, Any]:
         """Analyze customer message for lead indicators"""
-        message_lower = message.lower()
+        hits = scan_message(message)
         lead_indicators = []
         intent_strength = "low"
         
         # Budget/pricing indicators
-        if any(word in message_lower for word in ["budget", "cost", "price", "investment"]):
+        if "budget_inquiry" in hits:
             lead_indicators.append("budget_inquiry")
             intent_strength = "medium"
         
         # Timeline indicators
-        if any(word in message_lower for word in ["when", "timeline", "urgent", "asap"]):
+        if "timeline_mentioned" in hits:
             lead_indicators.append("timeline_mentioned")
             intent_strength = "medium"
         
         # High-intent phrases
-        if any(phrase in message_lower for phrase in ["need help", "looking for", "want to"]):
+        if "high_intent" in hits:
             intent_strength = "high"
         
         # Company indicators
-        if any(word in message_lower for word in ["company", "business", "enterprise", "team"]):
+        if "business_inquiry" in hits:
             lead_indicators.append("business_inquiry")
         
         return {
@@ -38,59 +66,133 @@ class CustomerIntelligence:
             "lead_score_boost": len(lead_indicators) * 10
         }
     
-    def calculate_lead_score(self, customer: CustomerProfile, interactions: List[InteractionRecord]) -> int:
-        """Calculate lead score based on customer data and interactions"""
-        score = customer.lead_score
-        
-        # Customer type scoring
-        if customer.customer_type.value == "enterprise":
-            score += 30
-        elif customer.customer_type.value == "business":
-            score += 15
-        
-        # Interaction-based scoring
-        for interaction in interactions:
-            score += len(interaction.lead_indicators) * 5
-        
-        # Frequency bonus
-        if len(interactions) > 1:
-            score += 10
-        
-        return min(score, 100)  # Cap at 100
+    def calculate_lead_score(self, customer: CustomerProfile) -> int:
+        """Calculate lead score from the running aggregates on the profile"""
+        return LEAD_SCORING_RULES.score(customer.customer_type, customer.lead_indicator_count, customer.total_interactions)
 
 class CustomerSessionManager:
     """Enhanced session manager with customer intelligence"""
     
-    def __init__(self, db_path: str = "customer_sessions.db"):
+    def __init__(self, db_path: str = "customer_sessions.db", store_path: Optional[str] = None):
         self.db_path = db_path
-        self.active_sessions: Dict[str, SQLiteSession] = {}
+        # Conversation history for every customer goes through one pooled store on db_path
+        self.session_store = SessionStore(db_path, settings.session_store_readers, settings.session_store_batch_size)
+        # Idle or least recently used sessions are closed and reopened when the customer returns
+        self.active_sessions = LRUCache(
+            settings.session_cache_size, settings.session_idle_timeout,
+            sliding=True, on_evict=self._release_session
+        )
+        self.session_reloads = 0
+        # Sessions in use by a running turn are closed when the turn ends, not on eviction
+        self.session_leases: Dict[int, int] = {}
+        self.deferred_closes: Dict[int, SessionABC] = {}
         
-        # Customer data storage (in production, use real database)
-        self.customers: Dict[str, CustomerProfile] = {}
-        self.interactions: Dict[str, List[InteractionRecord]] = {}
+        # Customer data is persisted by the store; profiles are loaded on demand into a
+        # bounded cache and interactions stay in the store
+        self.store = CustomerStore(
+            store_path or settings.customer_store_path,
+            settings.customer_store_flush_interval,
+            settings.customer_store_batch_size
+        )
+        self.profiles = LRUCache(settings.customer_cache_size)
         self.intelligence = CustomerIntelligence()
+        
+        # Analytics totals and the score-ordered lead index, updated on every score or status change
+        lead_rows = self.store.load_lead_rows()
+        self.lead_stats = LeadStatistics(LEAD_SCORING_RULES.max_score)
+        self.lead_stats.rebuild(lead_rows)
+        self.lead_index = LeadIndex()
+        self.lead_index.rebuild(lead_rows)
+        
+        # Sliding-window interaction metrics for trends (fixed memory, not persisted)
+        self.rolling = RollingMetrics()
     
-    def get_or_create_session(self, customer_id: str = None) -> tuple[str, SQLiteSession, CustomerProfile]:
+    def get_or_create_session(self, customer_id: str = None) -> tuple[str, SessionABC, CustomerProfile]:
         """Get or create session with customer profile"""
         if customer_id is None:
+            # A fresh id has nothing stored, so neither lookup touches the database
             customer_id = str(uuid.uuid4())
+            return customer_id, self._open_session(customer_id), self._add_profile(customer_id)
         
-        # Create session if needed
-        if customer_id not in self.active_sessions:
-            session = SQLiteSession(customer_id, self.db_path)
-            self.active_sessions[customer_id] = session
+        session = self.get_session(customer_id)
         
         # Get or create customer profile
-        if customer_id not in self.customers:
-            self.customers[customer_id] = CustomerProfile(customer_id=customer_id)
-            self.interactions[customer_id] = []
+        customer = self.get_profile(customer_id)
+        if customer is None:
+            customer = self._add_profile(customer_id)
         
-        return customer_id, self.active_sessions[customer_id], self.customers[customer_id]
+        return customer_id, session, customer
+    
+    def _add_profile(self, customer_id: str) -> CustomerProfile:
+        customer = CustomerProfile(customer_id=customer_id)
+        self.profiles.set(customer_id, customer)
+        self.lead_stats.add(customer.lead_score, customer.lead_status)
+        self.lead_index.add(customer_id, customer.lead_score)
+        self.store.save_profile(customer)
+        return customer
+    
+    def get_profile(self, customer_id: str) -> Optional[CustomerProfile]:
+        """A customer's profile from the cache, loaded from the store on a miss"""
+        customer = self.profiles.get(customer_id)
+        if customer is None:
+            customer = self.store.load_profile(customer_id)
+            if customer is not None:
+                self.profiles.set(customer_id, customer)
+        return customer
+    
+    def lead_statuses(self, customer_ids: List[str]) -> Dict[str, LeadStatus]:
+        """Current statuses of some customers, without loading their profiles"""
+        return {row.customer_id: row.lead_status for row in self.store.load_lead_rows(customer_ids)}
+    
+    def get_session(self, customer_id: str) -> SessionABC:
+        """Live session for a customer, reopened from the database if it was evicted"""
+        self.active_sessions.expire()
+        session = self.active_sessions.get(customer_id)
+        if session is None:
+            if self.get_profile(customer_id) is not None:
+                self.session_reloads += 1
+            session = self._open_session(customer_id)
+        return session
+    
+    def _open_session(self, customer_id: str) -> SessionABC:
+        session = PooledSQLiteSession(customer_id, self.session_store)
+        if settings.history_window_enabled:
+            # Runs see recent turns plus a summary of older ones, not the whole history
+            session = WindowedSession(session)
+        self.active_sessions.set(customer_id, session)
+        return session
+    
+    def _release_session(self, customer_id: str, session: SessionABC) -> None:
+        if self.session_leases.get(id(session)):
+            self.deferred_closes[id(session)] = session
+        else:
+            session.close()
+    
+    @contextmanager
+    def lease_session(self, customer_id: str) -> Iterator[SessionABC]:
+        """Session for the duration of a turn; eviction cannot close it until the turn ends"""
+        session = self.get_session(customer_id)
+        key = id(session)
+        self.session_leases[key] = self.session_leases.get(key, 0) + 1
+        try:
+            yield session
+        finally:
+            self.session_leases[key] -= 1
+            if not self.session_leases[key]:
+                del self.session_leases[key]
+                deferred = self.deferred_closes.pop(key, None)
+                if deferred is not None:
+                    deferred.close()
+    
+    def session_cache_stats(self) -> Dict[str, Any]:
+        """Live session count, eviction, idle expiry and reload counters, profile cache and history store activity"""
+        return {**self.active_sessions.stats(), "reloads": self.session_reloads,
+                "profiles": self.profiles.stats(), "history_store": self.session_store.stats()}
     
     def record_interaction(self, customer_id: str, user_message: str, agent_response: str, agent_name: str) -> Dict[str, Any]:
         """Record interaction with intelligence analysis"""
         
-        customer = self.customers.get(customer_id)
+        customer = self.get_profile(customer_id)
         if not customer:
             return {}
         
@@ -109,44 +211,158 @@ class CustomerSessionManager:
             lead_indicators=analysis["lead_indicators"]
         )
         
-        # Store interaction
-        if customer_id not in self.interactions:
-            self.interactions[customer_id] = []
-        self.interactions[customer_id].append(interaction)
+        was_escalated = customer.lead_score >= 70 or customer.total_interactions >= 5
         
         # Update customer profile
         customer.total_interactions += 1
         customer.last_interaction = datetime.now()
         customer.previous_inquiries.append(user_message[:100])
         customer.previous_inquiries = customer.previous_inquiries[-5:]  # Keep last 5
-        customer.lead_indicators.extend(analysis["lead_indicators"])
+        customer.lead_indicators.extend(i for i in analysis["lead_indicators"] if i not in customer.lead_indicators)
+        customer.lead_indicator_count += len(analysis["lead_indicators"])
+        customer.updated_at = customer.last_interaction
         
         # Update lead score
-        customer.lead_score = self.intelligence.calculate_lead_score(customer, self.interactions[customer_id])
+        old_score, old_status = customer.lead_score, customer.lead_status
+        customer.lead_score = self.intelligence.calculate_lead_score(customer)
         
         # Update lead status based on score
-        if customer.lead_score >= 70:
-            customer.lead_status = LeadStatus.QUALIFIED
-        elif customer.lead_score >= 40:
-            customer.lead_status = LeadStatus.CONTACTED
+        customer.lead_status = LEAD_SCORING_RULES.status(customer.lead_score, customer.lead_status)
+        self.lead_stats.update(old_score, old_status, customer.lead_score, customer.lead_status)
+        self.lead_index.update(customer_id, old_score, customer.lead_score)
+        
+        # Persist in the background; the turn does not wait for the commit
+        self.store.save_interaction(interaction)
+        self.store.save_profile(customer)
+        
+        should_escalate = customer.lead_score >= 70 or customer.total_interactions >= 5
+        self.rolling.record(
+            customer.lead_score,
+            qualified=customer.lead_status == LeadStatus.QUALIFIED and old_status != LeadStatus.QUALIFIED,
+            # Counted once, when the customer first crosses the escalation bar
+            escalated=should_escalate and not was_escalated
+        )
         
         return {
             "lead_score": customer.lead_score,
             "lead_status": customer.lead_status.value,
             "analysis": analysis,
-            "should_escalate": customer.lead_score >= 70 or customer.total_interactions >= 5
+            "should_escalate": should_escalate
+        }
+    
+    def rescore_all(self, reanalyze: bool = True) -> Dict[str, Any]:
+        """Recompute every customer's lead score and status in one vectorized pass
+
+        With ``reanalyze`` stored queries are checked for lead indicators again,
+        so changes to the indicator lists apply to historical interactions as
+        well; each distinct query is scanned once. Statuses follow the scores both
+        ways: unlike the online path, whose scores only grow, a customer whose
+        score drops below every threshold goes back to NEW. Manual statuses are
+        kept. Only profiles and interactions that changed are written back.
+        """
+        started = time.perf_counter()
+        # A bulk job: everything is read from the store, not kept in memory afterwards
+        self.store.flush()
+        profiles = self.store.load_profiles()
+        all_interactions = self.store.load_interactions()
+        customer_ids = list(profiles)
+        rows = {customer_id: row for row, customer_id in enumerate(customer_ids)}
+
+        records = []
+        interaction_customers = []
+        stored_counts = []
+        stored_masks = []
+        query_codes: Dict[str, int] = {}
+        query_rows = []
+        for customer_id, interactions in all_interactions.items():
+            row = rows.get(customer_id)
+            if row is None:
+                continue
+            for interaction in interactions:
+                interaction_customers.append(row)
+                stored_counts.append(len(interaction.lead_indicators))
+                if reanalyze:
+                    records.append(interaction)
+                    stored_masks.append(sum(INDICATOR_BITS.get(i, 0) for i in interaction.lead_indicators))
+                    query_rows.append(query_codes.setdefault(interaction.customer_query, len(query_codes)))
+
+        owners = np.array(interaction_customers, dtype=np.int64)
+        indicators = np.array(stored_counts, dtype=np.int64)
+        if reanalyze and records:
+            query_masks = np.array([self.intelligence.indicator_mask(query) for query in query_codes], dtype=np.int64)
+            masks = query_masks[np.array(query_rows, dtype=np.int64)]
+            new_indicators = MASK_COUNTS[masks]
+            changed = np.flatnonzero((masks != np.array(stored_masks, dtype=np.int64)) | (new_indicators != indicators))
+            reanalyzed_customers = set()
+            for i in changed.tolist():
+                records[i].lead_indicators = mask_indicators(int(masks[i]))
+                self.store.save_interaction(records[i])
+                reanalyzed_customers.add(customer_ids[owners[i]])
+            indicators = new_indicators
+        else:
+            reanalyzed_customers = set()
+
+        # Rebuild the per-customer aggregates the online path maintains
+        indicator_counts = np.bincount(owners, weights=indicators, minlength=len(customer_ids)).astype(np.int64)
+        interaction_counts = np.bincount(owners, minlength=len(customer_ids))
+
+        customers = [profiles[customer_id] for customer_id in customer_ids]
+        customer_types = np.array([CUSTOMER_TYPES.index(c.customer_type) for c in customers], dtype=np.int64)
+        current = np.array([LEAD_STATUSES.index(c.lead_status) for c in customers], dtype=np.int64)
+        current_scores = np.array([c.lead_score for c in customers], dtype=np.int64)
+        current_indicators = np.array([c.lead_indicator_count for c in customers], dtype=np.int64)
+        current_interactions = np.array([c.total_interactions for c in customers], dtype=np.int64)
+        scores = LEAD_SCORING_RULES.bulk_scores(customer_types, indicator_counts, interaction_counts)
+        statuses = LEAD_SCORING_RULES.bulk_statuses(scores, current)
+
+        changed_scores = scores != current_scores
+        changed_statuses = statuses != current
+        changed = changed_scores | changed_statuses | (indicator_counts != current_indicators) | (
+            interaction_counts != current_interactions)
+        changed_rows = set(np.flatnonzero(changed).tolist()) | {rows[c] for c in reanalyzed_customers}
+        for row in sorted(changed_rows):
+            customer = customers[row]
+            customer.lead_score = int(scores[row])
+            customer.lead_status = LEAD_STATUSES[statuses[row]]
+            customer.lead_indicator_count = int(indicator_counts[row])
+            customer.total_interactions = int(interaction_counts[row])
+            if customer.customer_id in reanalyzed_customers:
+                customer.lead_indicators = list(dict.fromkeys(
+                    i for interaction in all_interactions[customer.customer_id] for i in interaction.lead_indicators
+                ))
+            self.store.save_profile(customer)
+
+        # Cached profiles are stale now; changed ones reload from the saves above
+        self.profiles.clear()
+        self.lead_stats.rebuild(customers)
+        self.lead_index.rebuild(customers)
+
+        return {
+            "customers": len(customers),
+            "interactions": len(interaction_customers),
+            "changed_scores": int(changed_scores.sum()),
+            "changed_statuses": int(changed_statuses.sum()),
+            "saved_profiles": len(changed_rows),
+            "seconds": round(time.perf_counter() - started, 3),
         }
     
+    def set_lead_status(self, customer_id: str, status: LeadStatus) -> None:
+        """Set a status by hand (e.g. converted or lost) and keep the analytics totals in step"""
+        customer = self.get_profile(customer_id)
+        self.lead_stats.update(customer.lead_score, customer.lead_status, customer.lead_score, status)
+        customer.lead_status = status
+        customer.updated_at = datetime.now()
+        self.store.save_profile(customer)
+    
     def get_customer_analytics(self) -> Dict[str, Any]:
-        """Get analytics for all customers"""
-        total_customers = len(self.customers)
-        qualified_leads = sum(1 for c in self.customers.values() if c.lead_status == LeadStatus.QUALIFIED)
-        avg_lead_score = sum(c.lead_score for c in self.customers.values()) / total_customers if total_customers > 0 else 0
+        """Get analytics for all customers from the running totals"""
+        stats = self.lead_stats.summary()
+        total_customers = stats["total_customers"]
+        qualified_leads = stats["status_counts"][LeadStatus.QUALIFIED.value]
         
         return {
-            "total_customers": total_customers,
+            **stats,
             "qualified_leads": qualified_leads,
-            "average_lead_score": round(avg_lead_score, 1),
             "conversion_rate": round((qualified_leads / total_customers * 100), 1) if total_customers > 0 else 0
         }
 
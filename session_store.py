@@ -0,0 +1,260 @@
+# session_store.py - Pooled conversation history storage shared by every customer session
+"""
+Conversation history for all customers lives in one SQLite database in WAL mode,
+using the same tables as the Agents SDK's SQLiteSession (agent_sessions and
+agent_messages), so existing customer_sessions.db files keep working.
+
+Instead of one SQLiteSession (and one lock and connection set) per customer:
+- history reads borrow a connection from a small read-only pool; in WAL mode a
+  reader never waits for the writer or for another session's reads
+- appends, pops and clears from every session are queued to one writer thread,
+  which commits everything queued so far in a single transaction (group commit)
+  and then wakes each caller. Under load many turns share one commit; an idle
+  writer commits a lone append straight away.
+"""
+import asyncio
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents.memory import SessionABC, SessionSettings
+from agents.memory.session_settings import resolve_session_limit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS agent_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    message_data TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (session_id) REFERENCES agent_sessions (session_id)
+        ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_agent_messages_session_id
+    ON agent_messages (session_id, id);
+"""
+
+# Queued by close() to stop the writer once everything before it is written
+_STOP = ("stop", None, None, None)
+
+
+class SessionStore:
+    """Reader connection pool plus a single group-committing writer for conversation history"""
+
+    def __init__(self, db_path: str, readers: int = 4, batch_size: int = 256):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        if db_path == ":memory:":
+            # A private in-memory database that all of this store's connections share
+            self._uri = f"file:sessions-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            self._uri = f"file:{db_path}"
+
+        self._writer_conn = self._connect()
+        self._writer_conn.execute("PRAGMA journal_mode=WAL")
+        self._writer_conn.execute("PRAGMA synchronous=NORMAL")
+        self._writer_conn.executescript(SCHEMA)
+        self._writer_conn.commit()
+
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(max(readers, 1)):
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            conn.execute("PRAGMA read_uncommitted=ON")  # only affects the shared-cache in-memory database
+            self._readers.put(conn)
+        self.reader_count = max(readers, 1)
+
+        self._queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self.operations = 0
+        self.write_errors = 0
+
+        self._writer = threading.Thread(target=self._run, name="session-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-8000")  # KiB
+        return conn
+
+    # Writes (queued, awaited until committed)
+
+    def submit(self, op: str, session_id: str, items: Optional[List[Any]] = None) -> Future:
+        """Queue a write; the future resolves once its batch is committed"""
+        if self._closed:
+            raise RuntimeError("SessionStore is closed")
+        future: Future = Future()
+        self._queue.put((op, session_id, items, future))
+        return future
+
+    def close(self) -> None:
+        """Commit pending writes, stop the writer and close every connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._writer_conn.close()
+        for _ in range(self.reader_count):
+            self._readers.get().close()
+
+    def _run(self) -> None:
+        while True:
+            # Take whatever has queued up behind the first write, without waiting for more
+            batch = [self._queue.get()]
+            while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._write([item for item in batch if item is not _STOP])
+            if batch[-1] is _STOP:
+                return
+
+    def _write(self, batch: List[Tuple]) -> None:
+        """Apply one batch in a single transaction, then resolve every caller's future
+
+        If the batch fails, its writes are retried one transaction each, so one bad
+        write (e.g. items that are not JSON serializable) only fails its own caller.
+        """
+        if not batch:
+            return
+        conn = self._writer_conn
+        results = []
+        try:
+            with conn:
+                for op, session_id, items, _ in batch:
+                    results.append(self._apply(conn, op, session_id, items))
+        except Exception as e:
+            if len(batch) > 1:
+                for write in batch:
+                    self._write([write])
+                return
+            self.write_errors += 1
+            batch[0][3].set_exception(e)
+            return
+        self.batches += 1
+        self.operations += len(batch)
+        for (*_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, op: str, session_id: str, items: Optional[List[Any]]) -> Any:
+        if op == "add":
+            conn.execute("INSERT OR IGNORE INTO agent_sessions (session_id) VALUES (?)", (session_id,))
+            conn.executemany("INSERT INTO agent_messages (session_id, message_data) VALUES (?, ?)",
+                             [(session_id, json.dumps(item)) for item in items])
+            conn.execute("UPDATE agent_sessions SET updated_at = CURRENT_TIMESTAMP WHERE session_id = ?",
+                         (session_id,))
+            return None
+        if op == "pop":
+            # Skip past rows that are not valid JSON, as SQLiteSession does
+            while True:
+                row = conn.execute(
+                    "DELETE FROM agent_messages WHERE id = (SELECT id FROM agent_messages "
+                    "WHERE session_id = ? ORDER BY id DESC LIMIT 1) RETURNING message_data",
+                    (session_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                try:
+                    return json.loads(row[0])
+                except (json.JSONDecodeError, TypeError):
+                    continue
+        if op == "clear":
+            conn.execute("DELETE FROM agent_messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM agent_sessions WHERE session_id = ?", (session_id,))
+            return None
+        raise ValueError(f"Unknown session store operation: {op}")
+
+    # Reads (pooled)
+
+    def read_items(self, session_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Any]:
+        """History of one session in order from item ``offset``, or its latest ``limit`` items"""
+        conn = self._readers.get()
+        try:
+            if limit is None:
+                rows = conn.execute(
+                    "SELECT message_data FROM agent_messages WHERE session_id = ? ORDER BY id LIMIT -1 OFFSET ?",
+                    (session_id, offset)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT message_data FROM agent_messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                    (session_id, limit)
+                ).fetchall()[::-1]
+        finally:
+            self._readers.put(conn)
+
+        items = []
+        for (data,) in rows:
+            try:
+                items.append(json.loads(data))
+            except (json.JSONDecodeError, TypeError):
+                continue
+        return items
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "operations": self.operations,
+            "operations_per_commit": round(self.operations / self.batches, 2) if self.batches else 0,
+            "idle_readers": self._readers.qsize(),
+            "write_errors": self.write_errors,
+        }
+
+
+class PooledSQLiteSession(SessionABC):
+    """Agents SDK session whose history is read and written through a shared SessionStore"""
+
+    def __init__(self, session_id: str, store: SessionStore,
+                 session_settings: Optional[SessionSettings] = None):
+        self.session_id = session_id
+        self.store = store
+        self.session_settings = session_settings or SessionSettings()
+        self._closed = False
+
+    def _check_not_closed(self) -> None:
+        if self._closed:
+            raise RuntimeError("Session is closed")
+
+    async def get_items(self, limit: Optional[int] = None) -> List[Any]:
+        return await asyncio.to_thread(
+            self.store.read_items, self.session_id, resolve_session_limit(limit, self.session_settings)
+        )
+
+    async def get_items_from(self, offset: int) -> List[Any]:
+        """History from item ``offset`` on, skipping rows that are already summarized"""
+        return await asyncio.to_thread(self.store.read_items, self.session_id, None, offset)
+
+    async def add_items(self, items: List[Any]) -> None:
+        self._check_not_closed()
+        if items:
+            await asyncio.wrap_future(self.store.submit("add", self.session_id, list(items)))
+
+    async def pop_item(self) -> Optional[Any]:
+        self._check_not_closed()
+        return await asyncio.wrap_future(self.store.submit("pop", self.session_id))
+
+    async def clear_session(self) -> None:
+        self._check_not_closed()
+        await asyncio.wrap_future(self.store.submit("clear", self.session_id))
+
+    def close(self) -> None:
+        """Release the session; the store keeps its connections for other sessions"""
+        self._closed = True
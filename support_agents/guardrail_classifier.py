@@ -0,0 +1,219 @@
+# support_agents/guardrail_classifier.py - Offline classifier tier for the guardrails
+"""
+Hashed n-gram logistic regression models that sit between the regex checks and the
+LLM guardrail agents. Each guardrail gets its own binary model predicting the
+probability that the guardrail would trip; only predictions inside the uncertainty
+band are escalated to the LLM. The band is calibrated per model on held-out transcripts.
+
+Train and export a model file from labelled transcripts (JSON lines with
+``guardrail``, ``text`` and ``label`` where 1 means the tripwire should fire):
+    python -m support_agents.guardrail_classifier train TRANSCRIPTS.jsonl [--holdout HELDOUT.jsonl] [--output PATH]
+Without ``--holdout`` every ``HOLDOUT_EVERY``-th transcript is held out for calibration.
+"""
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+MODEL_VERSION = 2
+N_FEATURES = 2 ** 18
+HOLDOUT_EVERY = 4
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+|[^\sa-z0-9]")
+
+
+def hashed_features(text: str, n_features: int = N_FEATURES) -> List[int]:
+    """Distinct bucket ids for the word unigrams and bigrams in a text"""
+    words = WORD_PATTERN.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    # crc32 rather than hash(): bucket ids must be stable across processes
+    return sorted({zlib.crc32(gram.encode("utf-8")) % n_features for gram in grams})
+
+
+class HashedLogisticModel:
+    """Binary logistic regression over L2-normalized hashed n-gram presence
+
+    Presence rather than counts, scaled by 1/sqrt(#buckets), so repeating or padding
+    text cannot outweigh the rest of the input. ``low``/``high`` are the calibrated
+    probabilities at or beyond which the model decides on its own.
+    """
+
+    def __init__(self, bias: float = 0.0, weights: Optional[Dict[int, float]] = None,
+                 low: float = 0.0, high: float = 1.0):
+        self.bias = bias
+        self.weights = weights or {}
+        self.low = low
+        self.high = high
+
+    def predict(self, text: str) -> float:
+        """Probability that the guardrail should trip"""
+        buckets = hashed_features(text)
+        score = self.bias
+        if buckets:
+            score += sum(self.weights.get(bucket, 0.0) for bucket in buckets) / math.sqrt(len(buckets))
+        return 1.0 / (1.0 + math.exp(-max(min(score, 30.0), -30.0)))
+
+    def calibrate(self, texts: List[str], labels: List[int]) -> None:
+        """Widest band with no wrong decision on held-out transcripts"""
+        probabilities = [self.predict(text) for text in texts]
+        tripped = [p for p, label in zip(probabilities, labels) if label]
+        passed = [p for p, label in zip(probabilities, labels) if not label]
+        # Strictly inside the nearest held-out example of the other class
+        self.low = math.nextafter(min(tripped), 0.0) if tripped else 0.0
+        self.high = math.nextafter(max(passed), 1.0) if passed else 1.0
+
+    @classmethod
+    def train(cls, texts: List[str], labels: List[int], epochs: int = 1000,
+              learning_rate: float = 2.0, l2: float = 1e-3) -> "HashedLogisticModel":
+        """Fit with full-batch gradient descent over the buckets seen in training"""
+        rows = [hashed_features(text) for text in texts]
+        columns = {bucket: i for i, bucket in enumerate(dict.fromkeys(b for row in rows for b in row))}
+
+        X = np.zeros((len(rows), len(columns)), dtype=np.float64)
+        for i, row in enumerate(rows):
+            for bucket in row:
+                X[i, columns[bucket]] = 1.0 / math.sqrt(len(row))
+        y = np.asarray(labels, dtype=np.float64)
+
+        w = np.zeros(len(columns))
+        b = 0.0
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-(X @ w + b)))
+            error = p - y
+            w -= learning_rate * (X.T @ error / len(y) + l2 * w)
+            b -= learning_rate * error.mean()
+
+        return cls(float(b), {bucket: float(w[i]) for bucket, i in columns.items() if w[i] != 0.0})
+
+    def to_dict(self) -> Dict:
+        return {
+            "bias": self.bias,
+            "weights": {str(k): round(v, 6) for k, v in self.weights.items()},
+            "low": self.low,
+            "high": self.high,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HashedLogisticModel":
+        return cls(data["bias"], {int(k): v for k, v in data["weights"].items()}, data["low"], data["high"])
+
+
+class GuardrailClassifier:
+    """Per-guardrail models loaded from a single exported model file"""
+
+    def __init__(self, models: Optional[Dict[str, HashedLogisticModel]] = None):
+        self.models = models or {}
+
+    @classmethod
+    def load(cls, path: str) -> "GuardrailClassifier":
+        """Load a model file; a missing file yields an empty classifier that always escalates"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != MODEL_VERSION or data.get("n_features") != N_FEATURES:
+            return cls()
+        return cls({name: HashedLogisticModel.from_dict(model) for name, model in data["models"].items()})
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "version": MODEL_VERSION,
+                "n_features": N_FEATURES,
+                "models": {name: model.to_dict() for name, model in self.models.items()},
+            }, f)
+
+    def predict(self, guardrail: str, text: str) -> Optional[float]:
+        """Trip probability, or None when there is no model for this guardrail"""
+        model = self.models.get(guardrail)
+        return model.predict(text) if model else None
+
+    def decide(self, guardrail: str, text: str, low: float, high: float,
+               allow_pass: bool = True) -> Tuple[Optional[bool], Optional[float]]:
+        """(tripwire, probability); tripwire is None when the LLM should decide
+
+        The band is the wider of ``low``/``high`` and the model's calibrated one.
+        With ``allow_pass`` False the classifier can only block.
+        """
+        model = self.models.get(guardrail)
+        if model is None:
+            return None, None
+        probability = model.predict(text)
+        if allow_pass and probability <= min(low, model.low):
+            return False, probability
+        if probability >= max(high, model.high):
+            return True, probability
+        return None, probability
+
+
+def load_transcripts(paths: Iterable[str]) -> Dict[str, Tuple[List[str], List[int]]]:
+    """Group labelled transcript lines by guardrail"""
+    grouped: Dict[str, Tuple[List[str], List[int]]] = defaultdict(lambda: ([], []))
+    for path in paths:
+        with open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                texts, labels = grouped[record["guardrail"]]
+                texts.append(record["text"])
+                labels.append(int(record["label"]))
+    return grouped
+
+
+def split_holdout(texts: List[str], labels: List[int]) -> Tuple[Tuple[List[str], List[int]], Tuple[List[str], List[int]]]:
+    """Deterministic (train, held-out) split keeping every HOLDOUT_EVERY-th example per label"""
+    train: Tuple[List[str], List[int]] = ([], [])
+    held_out: Tuple[List[str], List[int]] = ([], [])
+    seen: Dict[int, int] = defaultdict(int)
+    for text, label in zip(texts, labels):
+        seen[label] += 1
+        target = held_out if seen[label] % HOLDOUT_EVERY == 0 else train
+        target[0].append(text)
+        target[1].append(label)
+    return train, held_out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train the offline guardrail classifier")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    train = subcommands.add_parser("train", help="train on labelled transcripts and export a model file")
+    train.add_argument("transcripts", nargs="+", help="JSON lines files with guardrail, text, label")
+    train.add_argument("--holdout", nargs="+", help="JSON lines files used only to calibrate the decision band")
+    train.add_argument("--output", default="data/models/guardrail_classifier.json", help="model file to write")
+    train.add_argument("--epochs", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    held_out_sets = load_transcripts(args.holdout) if args.holdout else {}
+    classifier = GuardrailClassifier()
+    for guardrail, (texts, labels) in sorted(load_transcripts(args.transcripts).items()):
+        if guardrail in held_out_sets:
+            held_out = held_out_sets[guardrail]
+        else:
+            (texts, labels), held_out = split_holdout(texts, labels)
+        if len(set(labels)) < 2 or len(set(held_out[1])) < 2:
+            print(f"Skipping {guardrail}: needs both tripped and passing examples to train and calibrate")
+            continue
+        model = HashedLogisticModel.train(texts, labels, epochs=args.epochs)
+        model.calibrate(*held_out)
+        classifier.models[guardrail] = model
+        accuracy = sum((model.predict(t) >= 0.5) == bool(l) for t, l in zip(*held_out)) / len(held_out[1])
+        print(f"{guardrail}: {len(labels)} examples, {len(model.weights)} weights, "
+              f"held-out accuracy {accuracy:.1%} on {len(held_out[1])}, "
+              f"decides below {model.low:.3f} and above {model.high:.3f}")
+
+    classifier.save(args.output)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# support_agents/guardrail_patterns.py - Compiled pattern engine for the guardrails
+"""
+Every guardrail rule set is merged at import time into one compiled alternation,
+so a turn's text is scanned once per rule set and the scan reports every rule
+that fired.
+
+Rules are matched against the lowercased text, so they are written in lowercase
+without (?i). Every top-level alternative should start with a literal character:
+the regex compiler then builds a first-character set for the whole alternation
+and skips positions that cannot start any rule, which is where the speedup over
+one re.search per pattern comes from.
+"""
+import re
+from typing import Dict, List, Optional
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+
+class RuleSet:
+    """A named set of regex rules compiled into a single alternation"""
+
+    def __init__(self, name: str, rules: Dict[str, str]):
+        self.name = name
+        self.rules = dict(rules)
+        # No capture groups around the rules: they would hide the literal prefixes
+        self.regex = re.compile("|".join(self.rules.values()))
+        self.rule_regexes = {rule: re.compile(pattern) for rule, pattern in self.rules.items()}
+
+        widths = {rule: sre_parse.parse(pattern).getwidth()[1] for rule, pattern in self.rules.items()}
+        # Rules with an unbounded repeat (\s+, .*) have no longest match
+        self.unbounded_rules = [rule for rule, width in widths.items() if width >= sre_parse.MAXREPEAT]
+        self.max_match_length = max((width for width in widths.values() if width < sre_parse.MAXREPEAT), default=0)
+
+    def _rule_at(self, text: str, position: int) -> str:
+        """Which rule the alternation matched at a position (the first one that matches there)"""
+        for rule, regex in self.rule_regexes.items():
+            if regex.match(text, position):
+                return rule
+        raise AssertionError(f"no {self.name} rule matches at {position}")
+
+    def scan(self, text: str, start: int = 0) -> List[str]:
+        """Names of every rule that matched, in order of first occurrence
+
+        Matches are found left to right without overlap, so a rule whose only
+        match overlaps an earlier rule's match is not reported separately; whether
+        any rule fired is always exact. Attribution only runs on matches, so clean
+        text costs a single scan. Only matches beginning at or after ``start`` are
+        reported; the text before it still counts as context for ``\\b``.
+        """
+        lowered = text.lower()
+        fired = {}
+        for match in self.regex.finditer(lowered, start):
+            fired.setdefault(self._rule_at(lowered, match.start()), None)
+            if len(fired) == len(self.rules):
+                break
+        return list(fired)
+
+    def first(self, text: str) -> Optional[str]:
+        """Name of the first rule that matched, or None"""
+        lowered = text.lower()
+        match = self.regex.search(lowered)
+        return self._rule_at(lowered, match.start()) if match else None
+
+    def pattern(self, rule: str) -> str:
+        return self.rules[rule]
+
+
+HIGH_THREAT_RULES = RuleSet("high_threat", {
+    "prompt_injection": r'ignore\s+previous\s+instructions|forget\s+instructions',
+    "credential_request": r'admin\s+(?:password|token|key)|root\s+(?:password|token|key)',
+    "attack_terms": r'sql\s+injection|xss\s+attack|exploit',
+    "intrusion": r'hack\s+(?:system|security)|crack\s+(?:system|security)|bypass\s+(?:system|security)',
+})
+
+HOMEWORK_RULES = RuleSet("homework", {
+    "solve_for_x": r'solve\s+for\s+x\s*[:=]',  # More specific math homework pattern
+    "arithmetic_calculation": r'calculate\s+\d+\s*[\+\-\*\/]\s*\d+',  # Math calculations
+    "homework_request": r'homework\s+(?:help|due)|assignment\s+(?:help|due)',  # Explicit homework requests
+    "arithmetic_question": r'what\s+is\s+\d+\s*[\+\-\*\/]\s*\d+\s*[\=\?]',  # Math questions
+})
+
+SENSITIVE_RULES = RuleSet("sensitive", {
+    "credential_terms": r'api[_\s]?key|secret|token|password',
+    "confidentiality_terms": r'internal|confidential|private',
+    "ssn": r'\b\d{3}-\d{2}-\d{4}\b',  # SSN pattern
+    "credit_card": r'\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}\b',  # Credit card pattern
+})
+
+UNPROFESSIONAL_RULES = RuleSet("unprofessional", {
+    "slang": r'lol|omg|wtf|lmao',
+    "casual_address": r'dude|bro|hey\s+there\s+buddy',
+    "hype_words": r'awesome|sick|epic|lit',
+    "repeated_exclamation": r'!!+',  # Multiple exclamation marks
+})
+
+SIMPLE_GREETINGS = frozenset({
+    "hello", "hi", "hey", "good morning", "good afternoon",
+    "good evening", "thanks", "thank you", "yes", "no", "ok", "okay"
+})
@@ -4,13 +4,108 @@ from agents import (
     GuardrailFunctionOutput,
     input_guardrail,
     output_guardrail,
+    OutputGuardrailResult,
+    OutputGuardrailTripwireTriggered,
     RunContextWrapper,
     TResponseInputItem,
     Runner
 )
-from typing import Union
+from typing import Any, Dict, List, Union
+from collections import Counter, defaultdict
 from pydantic import BaseModel
-import re
+from config.settings import settings
+from support_agents.guardrail_classifier import GuardrailClassifier
+from support_agents.guardrail_patterns import (
+    HIGH_THREAT_RULES,
+    HOMEWORK_RULES,
+    SENSITIVE_RULES,
+    SIMPLE_GREETINGS,
+    UNPROFESSIONAL_RULES,
+)
+from support_agents.lexicon import scan_message
+from openai_client import pooled_run_config
+from tools.cache import LRUCache
+import hashlib
+
+
+# Bump whenever guardrail prompts or trip rules change so cached verdicts are not reused
+GUARDRAIL_VERSION = "1"
+
+# Verdicts from the LLM-backed input guardrails, keyed by guardrail + normalized input
+verdict_cache = LRUCache(settings.guardrail_cache_size, settings.guardrail_cache_ttl)
+
+
+# Offline classifier tier between the regex checks and the LLM guardrail agents
+guardrail_classifier = GuardrailClassifier.load(settings.guardrail_classifier_path)
+
+# Guardrails the classifier may block but never pass; their passes always go to the LLM
+CLASSIFIER_BLOCK_ONLY = frozenset({"security"})
+
+# Which tier (rule, regex, cache, classifier, llm) decided each guardrail evaluation
+guardrail_tier_counts: Dict[str, Counter] = defaultdict(Counter)
+
+
+def verdict_key(guardrail_name: str, text: str) -> str:
+    """Cache key for a guardrail verdict on a piece of text"""
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha256(f"{guardrail_name}|{GUARDRAIL_VERSION}|{normalized}".encode("utf-8")).hexdigest()
+
+
+def decided(guardrail_name: str, tier: str, output_info: Dict[str, Any], tripwire: bool) -> GuardrailFunctionOutput:
+    """Build a guardrail result tagged with the tier that decided it"""
+    guardrail_tier_counts[guardrail_name][tier] += 1
+    return GuardrailFunctionOutput(
+        output_info={**output_info, "decided_by": tier},
+        tripwire_triggered=tripwire
+    )
+
+
+def classify_or_escalate(guardrail_name: str, text: str) -> Union[GuardrailFunctionOutput, None]:
+    """Cached verdict or confident classifier verdict; None means ask the LLM"""
+    cached = verdict_cache.get(verdict_key(guardrail_name, text))
+    if cached is not None:
+        return decided(guardrail_name, "cache", cached.output_info, cached.tripwire_triggered)
+
+    tripwire, probability = guardrail_classifier.decide(
+        guardrail_name, text, settings.guardrail_classifier_low, settings.guardrail_classifier_high,
+        allow_pass=guardrail_name not in CLASSIFIER_BLOCK_ONLY
+    )
+    if tripwire is not None:
+        return decided(guardrail_name, "classifier", {"trip_probability": round(probability, 4)}, tripwire)
+    return None
+
+
+def output_text(output: Any) -> str:
+    """Extract the text of an agent output for the output guardrails"""
+    if hasattr(output, 'response'):
+        return output.response
+    elif isinstance(output, str):
+        return output
+    else:
+        return str(output)
+
+
+def tone_assessment(text_output: str) -> Dict[str, Any]:
+    """Regex and length checks behind professional_tone_guardrail"""
+    unprofessional_rules = UNPROFESSIONAL_RULES.scan(text_output)
+    return {
+        "unprofessional_detected": bool(unprofessional_rules),
+        "rules": unprofessional_rules,
+        # Check for minimum professional requirements
+        "has_greeting": "greeting" in scan_message(text_output),
+        "is_too_short": len(text_output.strip()) < 20,
+        "length": len(text_output)
+    }
+
+
+def guardrail_tier_stats() -> Dict[str, Any]:
+    """Decision counts per guardrail and tier, plus the share of LLM calls avoided"""
+    stats: Dict[str, Any] = {name: dict(counts) for name, counts in guardrail_tier_counts.items()}
+    escalations = sum(counts[tier] for counts in guardrail_tier_counts.values()
+                      for tier in ("cache", "classifier", "llm"))
+    avoided = sum(counts["cache"] + counts["classifier"] for counts in guardrail_tier_counts.values())
+    stats["llm_calls_avoided_ratio"] = round(avoided / escalations, 3) if escalations else 0.0
+    return stats
 
 
 class SecurityAssessment(BaseModel):
@@ -130,49 +225,35 @@ async def security_input_guardrail(
         text_input = input
     
     # Allow simple greetings to pass through quickly
-    simple_greetings = [
-        "hello", "hi", "hey", "good morning", "good afternoon", 
-        "good evening", "thanks", "thank you", "yes", "no", "ok", "okay"
-    ]
-    
-    if text_input.strip().lower() in simple_greetings:
-        return GuardrailFunctionOutput(
-            output_info={"greeting_pass": True},
-            tripwire_triggered=False
-        )
-    
-    # Quick pattern-based checks for serious threats only
-    high_threat_patterns = [
-        r'(?i)(ignore\s+previous\s+instructions|forget\s+instructions)',
-        r'(?i)(admin|root)\s+(password|token|key)',
-        r'(?i)(sql\s+injection|xss\s+attack|exploit)',
-        r'(?i)(hack|crack|bypass)\s+(system|security)',
-    ]
+    if text_input.strip().lower() in SIMPLE_GREETINGS:
+        return decided("security", "rule", {"greeting_pass": True}, False)
     
-    # Check for immediate serious security threats
-    for pattern in high_threat_patterns:
-        if re.search(pattern, text_input):
-            return GuardrailFunctionOutput(
-                output_info={"threat_detected": True, "pattern": pattern},
-                tripwire_triggered=True
-            )
+    # Check for immediate serious security threats (single pass over all threat rules)
+    fired = HIGH_THREAT_RULES.scan(text_input)
+    if fired:
+        return decided("security", "regex", {
+            "threat_detected": True, "rules": fired, "pattern": HIGH_THREAT_RULES.pattern(fired[0])
+        }, True)
     
     # Only run detailed AI security analysis for longer, complex inputs
     if len(text_input.strip()) > 50:
-        result = await Runner.run(security_guardrail_agent, text_input, context=ctx.context)
+        # Repeat inputs and confident classifier calls skip the LLM round trip
+        verdict = classify_or_escalate("security", text_input)
+        if verdict is not None:
+            return verdict
+
+        result = await Runner.run(security_guardrail_agent, text_input, context=ctx.context, run_config=pooled_run_config())
         
         # Only trigger on high threats, not medium or low
-        return GuardrailFunctionOutput(
-            output_info=result.final_output,
-            tripwire_triggered=result.final_output.is_malicious or 
-                              result.final_output.threat_level == "high"
+        verdict = decided(
+            "security", "llm", {"assessment": result.final_output},
+            result.final_output.is_malicious or result.final_output.threat_level == "high"
         )
+        verdict_cache.set(verdict_key("security", text_input), verdict)
+        return verdict
     
     # Default to allowing shorter business-like content
-    return GuardrailFunctionOutput(
-        output_info={"short_content_pass": True},
-        tripwire_triggered=False
-    )
+    return decided("security", "rule", {"short_content_pass": True}, False)
 
 
 @input_guardrail  
@@ -189,58 +270,38 @@ async def business_relevance_guardrail(
     else:
         text_input = input
     
-    # Quick checks for obvious off-topic requests (be more lenient)
-    homework_patterns = [
-        r'(?i)solve\s+for\s+x\s*[:=]',  # More specific math homework pattern
-        r'(?i)calculate\s+\d+\s*[\+\-\*\/]\s*\d+',  # Math calculations
-        r'(?i)(homework|assignment)\s+(help|due)',  # Explicit homework requests
-        r'(?i)what\s+is\s+\d+\s*[\+\-\*\/]\s*\d+\s*[\=\?]',  # Math questions
-    ]
-    
     # Only block if it's clearly homework/unrelated, not general business chat
-    for pattern in homework_patterns:
-        if re.search(pattern, text_input):
-            return GuardrailFunctionOutput(
-                output_info={"off_topic": True, "reason": "homework_detected"},
-                tripwire_triggered=True
-            )
+    fired = HOMEWORK_RULES.scan(text_input)
+    if fired:
+        return decided("business_relevance", "regex", {"off_topic": True, "reason": "homework_detected", "rules": fired}, True)
     
     # Allow short greetings and general business inquiries to pass through
     # Only use AI analysis for longer, potentially problematic content
     if len(text_input.strip()) < 20:
-        return GuardrailFunctionOutput(
-            output_info={"quick_pass": True, "reason": "short_greeting"},
-            tripwire_triggered=False
-        )
+        return decided("business_relevance", "rule", {"quick_pass": True, "reason": "short_greeting"}, False)
     
     # Check for business-related keywords to allow through
-    business_keywords = [
-        "website", "web", "app", "portfolio", "business", "service", "help",
-        "ai", "automation", "development", "cybersecurity", "design",
-        "company", "team", "project", "consultation", "quote", "price"
-    ]
-    
-    if any(keyword in text_input.lower() for keyword in business_keywords):
-        return GuardrailFunctionOutput(
-            output_info={"business_related": True, "reason": "business_keywords_found"},
-            tripwire_triggered=False
-        )
+    keyword = scan_message(text_input).first("business")
+    if keyword is not None:
+        return decided("business_relevance", "rule", {"business_related": True, "reason": "business_keywords_found", "keyword": keyword}, False)
     
     # Only run detailed AI analysis for potentially problematic longer content
     if len(text_input.strip()) > 100:
-        result = await Runner.run(business_guardrail_agent, text_input, context=ctx.context)
+        verdict = classify_or_escalate("business_relevance", text_input)
+        if verdict is not None:
+            return verdict
+
+        result = await Runner.run(business_guardrail_agent, text_input, context=ctx.context, run_config=pooled_run_config())
         
-        return GuardrailFunctionOutput(
-            output_info=result.final_output,
-            tripwire_triggered=not result.final_output.is_business_related or
-                              not result.final_output.is_support_appropriate
+        verdict = decided(
+            "business_relevance", "llm", {"assessment": result.final_output},
+            not result.final_output.is_business_related or not result.final_output.is_support_appropriate
         )
+        verdict_cache.set(verdict_key("business_relevance", text_input), verdict)
+        return verdict
     
     # Default to allowing reasonable length business inquiries
-    return GuardrailFunctionOutput(
-        output_info={"default_pass": True, "reason": "reasonable_business_inquiry"},
-        tripwire_triggered=False
-    )
+    return decided("business_relevance", "rule", {"default_pass": True, "reason": "reasonable_business_inquiry"}, False)
 
 
 @output_guardrail
@@ -252,36 +313,36 @@ async def content_quality_guardrail(
     """Content quality guardrail for agent outputs"""
     
     # Extract text from output
-    if hasattr(output, 'response'):
-        text_output = output.response
-    elif isinstance(output, str):
-        text_output = output
-    else:
-        text_output = str(output)
+    text_output = output_text(output)
     
     # Quick checks for sensitive information leakage
-    sensitive_patterns = [
-        r'(?i)(api[_\s]?key|secret|token|password)',
-        r'(?i)(internal|confidential|private)',
-        r'\b\d{3}-\d{2}-\d{4}\b',  # SSN pattern
-        r'\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}\b',  # Credit card pattern
-    ]
+    fired = SENSITIVE_RULES.scan(text_output)
+    if fired:
+        return decided("content_quality", "regex", {
+            "sensitive_info_detected": True, "rules": fired, "pattern": SENSITIVE_RULES.pattern(fired[0])
+        }, True)
+    
+    # The tone checks are pure regex and length tests: if they reject the response,
+    # trip here before the LLM quality review is ever started
+    tone = tone_assessment(text_output)
+    if tone["unprofessional_detected"] or tone["is_too_short"]:
+        return decided("content_quality", "regex", {"failed_check": "professional_tone", **tone}, True)
     
-    for pattern in sensitive_patterns:
-        if re.search(pattern, text_output):
-            return GuardrailFunctionOutput(
-                output_info={"sensitive_info_detected": True, "pattern": pattern},
-                tripwire_triggered=True
-            )
+    # Confident classifier verdicts skip the LLM quality review
+    tripwire, probability = guardrail_classifier.decide(
+        "content_quality", text_output, settings.guardrail_classifier_low, settings.guardrail_classifier_high
+    )
+    if tripwire is not None:
+        return decided("content_quality", "classifier", {"trip_probability": round(probability, 4)}, tripwire)
     
     # Run detailed content quality analysis
-    result = await Runner.run(content_guardrail_agent, text_output, context=ctx.context)
+    result = await Runner.run(content_guardrail_agent, text_output, context=ctx.context, run_config=pooled_run_config())
     
-    return GuardrailFunctionOutput(
-        output_info=result.final_output,
-        tripwire_triggered=result.final_output.contains_sensitive_info or
-                          not result.final_output.is_professional or
-                          result.final_output.quality_score < 4
+    return decided(
+        "content_quality", "llm", {"assessment": result.final_output},
+        result.final_output.contains_sensitive_info or
+        not result.final_output.is_professional or
+        result.final_output.quality_score < 4
     )
 
 
@@ -294,48 +355,71 @@ async def professional_tone_guardrail(
     """Ensure professional tone in responses"""
     
     # Extract text from output
-    if hasattr(output, 'response'):
-        text_output = output.response
-    elif isinstance(output, str):
-        text_output = output
-    else:
-        text_output = str(output)
+    text_output = output_text(output)
     
-    # Check for unprofessional patterns
-    unprofessional_patterns = [
-        r'(?i)(lol|omg|wtf|lmao)',
-        r'(?i)(dude|bro|hey\s+there\s+buddy)',
-        r'(?i)(awesome|sick|epic|lit)',
-        r'[!]{2,}',  # Multiple exclamation marks
-    ]
+    # Check for unprofessional patterns and minimum professional requirements
+    tone = tone_assessment(text_output)
     
-    unprofessional_detected = any(re.search(pattern, text_output) 
-                                for pattern in unprofessional_patterns)
-    
-    # Check for minimum professional requirements
-    has_greeting = any(word in text_output.lower() 
-                      for word in ['hello', 'hi', 'welcome', 'thank you'])
-    
-    is_too_short = len(text_output.strip()) < 20
-    
-    return GuardrailFunctionOutput(
-        output_info={
-            "unprofessional_detected": unprofessional_detected,
-            "has_greeting": has_greeting,
-            "is_too_short": is_too_short,
-            "length": len(text_output)
-        },
-        tripwire_triggered=unprofessional_detected or is_too_short
-    )
+    return decided("professional_tone", "regex", tone, tone["unprofessional_detected"] or tone["is_too_short"])
 
 
-# Guardrail sets for different agent types
+# Guardrail sets for different agent types. Output guardrails are listed in cost
+# order; when the cheap one trips, the runner cancels the LLM-backed one still in flight.
 TRIAGE_GUARDRAILS = {
     "input_guardrails": [security_input_guardrail, business_relevance_guardrail],
-    "output_guardrails": [content_quality_guardrail, professional_tone_guardrail]
+    "output_guardrails": [professional_tone_guardrail, content_quality_guardrail]
 }
 
 SPECIALIST_GUARDRAILS = {
     "input_guardrails": [security_input_guardrail],
-    "output_guardrails": [content_quality_guardrail, professional_tone_guardrail]
+    "output_guardrails": [professional_tone_guardrail, content_quality_guardrail]
 }
+
+
+class StreamingOutputMonitor:
+    """Incremental sensitive-info and tone checks over a streamed response
+
+    Each delta is scanned together with the tail of the text before it, so a match
+    split across deltas is still found while the stream is only scanned once. The
+    tail is longer than any match of a bounded rule. A rule with an unbounded repeat
+    is only caught mid-stream while its match fits in the tail (``!!+`` always does,
+    ``casual_address``'s ``\s+`` may not); longer matches are left to the full output
+    guardrails, which still run when the stream completes.
+    """
+
+    WINDOW = max(64, SENSITIVE_RULES.max_match_length + 1, UNPROFESSIONAL_RULES.max_match_length + 1)
+
+    def __init__(self, agent: Agent):
+        self.agent = agent
+        self.parts: List[str] = []
+        self.tail = ""
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def feed(self, delta: str) -> None:
+        """Check a delta; raises OutputGuardrailTripwireTriggered when a rule fires"""
+        window = self.tail + delta
+        self.parts.append(delta)
+        # The first tail character was scanned last time and only serves as context
+        start = 1 if self.tail else 0
+
+        fired = SENSITIVE_RULES.scan(window, start)
+        if fired:
+            self.trip(content_quality_guardrail, decided("content_quality", "stream", {
+                "sensitive_info_detected": True, "rules": fired, "pattern": SENSITIVE_RULES.pattern(fired[0])
+            }, True))
+
+        fired = UNPROFESSIONAL_RULES.scan(window, start)
+        if fired:
+            self.trip(professional_tone_guardrail, decided("professional_tone", "stream", {
+                "unprofessional_detected": True, "rules": fired
+            }, True))
+
+        self.tail = window[-self.WINDOW:]
+
+    def trip(self, guardrail, output: GuardrailFunctionOutput) -> None:
+        raise OutputGuardrailTripwireTriggered(OutputGuardrailResult(
+            guardrail=guardrail, agent_output=self.text, agent=self.agent, output=output
+        ))
@@ -0,0 +1,152 @@
+# support_agents/lexicon.py - Shared keyword lexicon for intent, lead and relevance checks
+"""
+Every keyword list used to analyze customer messages lives here, compiled once
+into a single phrase table. A message is tokenized a single time and one pass
+over its tokens reports the hits for every category, so "ai" no longer matches
+inside "maintain" and "ml" no longer matches inside "html".
+
+Keywords are matched on whole words; multi-word keywords match consecutive
+words, and the last word of each keyword also matches its plural. Substring
+matching used to catch some inflections for free, so those are listed
+explicitly: "automated", "automating" and "processing" for automation,
+"full stack" next to "fullstack", and for the business relevance pass list
+forms such as "application", "helpful", "designer" and "pricing".
+"""
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase words"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def plural_forms(word: str) -> List[str]:
+    """The word plus its regular plural forms"""
+    forms = [word, word + "s"]
+    if word.endswith(("s", "x", "ch", "sh")):
+        forms.append(word + "es")
+    elif word.endswith("y") and len(word) > 1 and word[-2] not in "aeiou":
+        forms.append(word[:-1] + "ies")
+    return forms
+
+
+class LexiconHits:
+    """Keywords found in one message, grouped by category (read-only)"""
+
+    __slots__ = ("tokens", "matches")
+
+    def __init__(self, tokens: List[str], matches: Dict[str, Tuple[str, ...]]):
+        self.tokens = tokens
+        self.matches = matches
+
+    def __contains__(self, category: str) -> bool:
+        return category in self.matches
+
+    def get(self, category: str) -> Tuple[str, ...]:
+        """Matched keywords of a category, in order of first occurrence"""
+        return self.matches.get(category, ())
+
+    def first(self, category: str) -> Optional[str]:
+        keywords = self.matches.get(category)
+        return keywords[0] if keywords else None
+
+
+class Lexicon:
+    """Named keyword categories compiled into one word-phrase lookup table"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories = {name: tuple(keywords) for name, keywords in categories.items()}
+        # word tuple -> (category, keyword) pairs it stands for
+        self.phrases: Dict[Tuple[str, ...], List[Tuple[str, str]]] = defaultdict(list)
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                words = tokenize(keyword)
+                for last in plural_forms(words[-1]):
+                    entry = (category, keyword)
+                    phrase = tuple(words[:-1]) + (last,)
+                    if entry not in self.phrases[phrase]:
+                        self.phrases[phrase].append(entry)
+        self.phrases = dict(self.phrases)
+        # Longer phrases are only tried at words that can start one
+        self.phrase_starts: Set[str] = {phrase[0] for phrase in self.phrases if len(phrase) > 1}
+        self.max_words = max(len(phrase) for phrase in self.phrases)
+
+    def scan(self, text: str) -> LexiconHits:
+        """Hits for every category in a single pass over the message's words"""
+        tokens = tokenize(text)
+        found: Dict[str, Dict[str, None]] = {}
+        for i, token in enumerate(tokens):
+            longest = min(self.max_words, len(tokens) - i) if token in self.phrase_starts else 1
+            for length in range(1, longest + 1):
+                entries = self.phrases.get(tuple(tokens[i:i + length]))
+                if entries:
+                    for category, keyword in entries:
+                        found.setdefault(category, {})[keyword] = None
+        return LexiconHits(tokens, {category: tuple(keywords) for category, keywords in found.items()})
+
+
+MESSAGE_LEXICON = Lexicon({
+    # Intents for classify_intent, checked in INTENT_PRIORITY order
+    "ai_development": [
+        "ai", "artificial intelligence", "machine learning", "ml", "model",
+        "neural network", "deep learning", "nlp", "computer vision",
+        "generative ai", "chatbot", "llm", "custom agent",
+    ],
+    "automation": [
+        "automation", "automate", "automated", "automating", "workflow", "process",
+        "processing", "rpa", "optimize", "efficiency", "streamline", "robotic process",
+    ],
+    "fullstack": [
+        "website", "web app", "frontend", "backend", "fullstack", "full stack",
+        "api", "database", "react", "node", "development",
+    ],
+    "cybersecurity": [
+        "security", "cybersecurity", "vulnerability", "audit",
+        "penetration", "pentest", "secure", "compliance", "breach",
+    ],
+    "pricing": ["price", "cost", "pricing", "quote", "budget", "how much", "fee"],
+    "company_info": ["about", "company", "services", "what do you do", "who are you"],
+
+    # Lead potential for analyze_customer_context
+    "lead_potential": [
+        "budget", "timeline", "implementation", "enterprise", "team",
+        "scale", "integration", "custom", "consultation", "proposal",
+    ],
+
+    # Lead indicators for CustomerIntelligence.analyze_intent
+    "budget_inquiry": ["budget", "cost", "price", "investment"],
+    "timeline_mentioned": ["when", "timeline", "urgent", "asap"],
+    "high_intent": ["need help", "looking for", "want to"],
+    "business_inquiry": ["company", "business", "enterprise", "team"],
+
+    # business_relevance_guardrail pass list
+    "business": [
+        "website", "web", "app", "portfolio", "business", "service", "help",
+        "ai", "automation", "development", "cybersecurity", "design",
+        "company", "team", "project", "consultation", "quote", "price",
+        # Forms the old substring match also accepted
+        "webpage", "webinar", "application", "helpful", "helping", "helped",
+        "developer", "designer", "designed", "designing", "teamwork",
+        "quoted", "pricing", "priced",
+    ],
+
+    # professional_tone_guardrail greeting check
+    "greeting": ["hello", "hi", "welcome", "thank you"],
+})
+
+# Ties between intents with the same number of keyword hits go to the earlier one
+INTENT_PRIORITY: List[str] = [
+    "ai_development", "automation", "fullstack", "cybersecurity", "pricing", "company_info",
+]
+
+
+@lru_cache(maxsize=256)
+def scan_message(text: str) -> LexiconHits:
+    """MESSAGE_LEXICON hits for a message; the router, guardrails and lead analysis
+    all look at the same message in one turn, so it is only scanned once"""
+    return MESSAGE_LEXICON.scan(text)
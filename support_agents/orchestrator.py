@@ -6,49 +6,26 @@ from support_agents.automation import automation_agent
 from support_agents.fullstack import fullstack_agent
 from support_agents.cybersecurity import cybersecurity_agent
 from support_agents.guardrails import TRIAGE_GUARDRAILS
+from support_agents.lexicon import INTENT_PRIORITY, scan_message
 from tools.knowledge_search import search_knowledge_base
 from tools.company_info import get_company_overview, get_pricing_info
 
 def classify_intent(message: str) -> tuple[str, float]:
-    """Enhanced intent classification"""
-    message_lower = message.lower()
-    
-    # AI Development keywords
-    ai_keywords = ["ai", "artificial intelligence", "machine learning", "ml", "model", 
-                   "neural network", "deep learning", "nlp", "computer vision", 
-                   "generative ai", "chatbot", "llm", "custom agent"]
-    if any(keyword in message_lower for keyword in ai_keywords):
-        return "ai_development", 0.85
-    
-    # Automation keywords  
-    automation_keywords = ["automation", "automate", "workflow", "process", "rpa", 
-                          "optimize", "efficiency", "streamline", "robotic process"]
-    if any(keyword in message_lower for keyword in automation_keywords):
-        return "automation", 0.85
-        
-    # Full-stack keywords
-    fullstack_keywords = ["website", "web app", "frontend", "backend", "fullstack", 
-                         "api", "database", "react", "node", "development"]
-    if any(keyword in message_lower for keyword in fullstack_keywords):
-        return "fullstack", 0.85
-        
-    # Cybersecurity keywords
-    security_keywords = ["security", "cybersecurity", "vulnerability", "audit", 
-                        "penetration", "pentest", "secure", "compliance", "breach"]
-    if any(keyword in message_lower for keyword in security_keywords):
-        return "cybersecurity", 0.85
-    
-    # Pricing keywords
-    pricing_keywords = ["price", "cost", "pricing", "quote", "budget", "how much", "fee"]
-    if any(keyword in message_lower for keyword in pricing_keywords):
-        return "pricing", 0.9
-        
-    # Company info keywords
-    company_keywords = ["about", "company", "services", "what do you do", "who are you"]
-    if any(keyword in message_lower for keyword in company_keywords):
-        return "company_info", 0.8
-    
-    return "general", 0.5
+    """Enhanced intent classification
+
+    The intent with the most distinct keyword hits wins. Confidence grows with
+    those hits and shrinks with hits for competing intents: one keyword alone
+    scores 0.5, two uncontested 0.75, three 0.875.
+    """
+    hits = scan_message(message)
+    counts = [(len(hits.get(intent)), intent) for intent in INTENT_PRIORITY]
+    top, intent = max(counts, key=lambda count: count[0])  # max keeps the first of equal counts
+    if not top:
+        return "general", 0.5
+
+    rival = max(count for count, other in counts if other != intent)
+    confidence = (1 - 0.5 ** top) * top / (top + rival)
+    return intent, round(confidence, 3)
 
 # Enhanced triage agent with intelligence capabilities and guardrails
 enhanced_triage_agent = Agent(
@@ -122,13 +99,7 @@ def analyze_customer_context(customer_email: str, message: str) -> dict:
     intent, confidence = classify_intent(message)
     
     # Determine lead potential
-    lead_indicators = [
-        "budget", "timeline", "implementation", "enterprise", "team",
-        "scale", "integration", "custom", "consultation", "proposal"
-    ]
-    
-    lead_score = sum(1 for indicator in lead_indicators 
-                    if indicator in message.lower())
+    lead_score = len(scan_message(message).get("lead_potential"))
     
     if lead_score >= 3:
         lead_status = LeadStatus.HOT
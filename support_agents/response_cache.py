@@ -0,0 +1,104 @@
+# support_agents/response_cache.py - Cached answers to repeat FAQ-style questions
+"""
+Many customers ask the same short questions (pricing, services, HIPAA). Agent
+answers that passed the output guardrails are kept here, keyed by the
+normalized message and its classify_intent intent, and served as direct answers
+without a model call. The input guardrails still run on every message.
+
+The key carries no customer context, so only answers that cannot depend on one
+are stored: messages with a topic intent (never "general", e.g. "yes please")
+sent as the first message of a conversation.
+
+Entries are only valid for the knowledge base generation and settings they
+were produced under; when either changes the whole cache is dropped.
+"""
+import hashlib
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from config.settings import settings, settings_fingerprint
+from support_agents.lexicon import INTENT_PRIORITY, tokenize
+from tools.cache import LRUCache
+from tools.knowledge_search import knowledge_index
+
+# Bump whenever agent instructions change so cached answers are not reused
+RESPONSE_CACHE_VERSION = "1"
+
+# FAQ topics; anything else is classified "general" and may refer back to the conversation
+CONTEXT_FREE_INTENTS = frozenset(INTENT_PRIORITY)
+
+
+class CachedResponse(NamedTuple):
+    """An answer that passed the output guardrails, and how long it took to produce"""
+    reply: str
+    agent_name: str
+    seconds: float
+
+
+def normalize_query(message: str) -> str:
+    """Lowercase words only, so case, punctuation and spacing do not matter"""
+    return " ".join(tokenize(message))
+
+
+class ResponseCache:
+    """Bounded answer cache invalidated by knowledge base reloads and settings changes"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.entries = LRUCache(max_size, ttl)
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple[int, str]] = None
+        self.stores = 0
+        self.invalidations = 0
+        self.seconds_saved = 0.0
+
+    def _check_version(self) -> None:
+        """Drop every entry once the knowledge base or the settings have changed"""
+        version = (knowledge_index.generation, settings_fingerprint())
+        with self._lock:
+            if version == self._version:
+                return
+            if self._version is not None:
+                self.invalidations += 1
+            self._version = version
+        self.entries.clear()
+
+    @staticmethod
+    def cacheable(message: str, intent: str) -> bool:
+        """Only short messages on an FAQ topic; longer ones carry customer specifics"""
+        return (settings.response_cache_enabled and intent in CONTEXT_FREE_INTENTS
+                and 0 < len(tokenize(message)) <= settings.response_cache_max_words)
+
+    @staticmethod
+    def key(message: str, intent: str) -> str:
+        text = f"{RESPONSE_CACHE_VERSION}|{intent}|{normalize_query(message)}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, message: str, intent: str) -> Optional[CachedResponse]:
+        if not self.cacheable(message, intent):
+            return None
+        self._check_version()
+        cached = self.entries.get(self.key(message, intent))
+        if cached is not None:
+            self.seconds_saved += cached.seconds
+        return cached
+
+    def put(self, message: str, intent: str, reply: str, agent_name: str, seconds: float) -> None:
+        """Keep an answer; call only once it has passed the output guardrails, and only for
+        the first message of a conversation, since later answers may draw on its history"""
+        if not self.cacheable(message, intent) or not reply:
+            return
+        self._check_version()
+        self.entries.set(self.key(message, intent), CachedResponse(reply, agent_name, seconds))
+        self.stores += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.entries.stats(),
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+            "seconds_saved": round(self.seconds_saved, 2),
+        }
+
+
+# Answers served by route_message for repeat questions
+response_cache = ResponseCache(settings.response_cache_size, settings.response_cache_ttl)
@@ -0,0 +1,130 @@
+# support_agents/router.py - Deterministic pre-router in front of the triage agent
+"""
+Messages whose intent classify_intent is confident about skip the triage agent's
+routing turn: specialist intents go straight to the specialist agent, pricing and
+company-info intents are answered from the same text the tools return. A single
+keyword is never enough for either; canned answers need a higher threshold than
+specialist routes. Repeat questions are answered from the response cache.
+Anything else goes to the triage agent.
+
+Bypassed messages still pass every triage input guardrail: the ones the target
+agent does not run itself are run here before the message is answered.
+"""
+import asyncio
+from collections import Counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from agents import Agent, InputGuardrailTripwireTriggered, RunContextWrapper
+
+from config.settings import settings
+from support_agents.ai_development import ai_development_agent
+from support_agents.automation import automation_agent
+from support_agents.cybersecurity import cybersecurity_agent
+from support_agents.fullstack import fullstack_agent
+from support_agents.orchestrator import classify_intent, enhanced_triage_agent
+from support_agents.response_cache import response_cache
+from tools.company_info import company_overview, pricing_info
+
+
+SPECIALIST_ROUTES: Dict[str, Agent] = {
+    "ai_development": ai_development_agent,
+    "automation": automation_agent,
+    "fullstack": fullstack_agent,
+    "cybersecurity": cybersecurity_agent,
+}
+
+DIRECT_ANSWERS: Dict[str, Callable[[], str]] = {
+    "pricing": pricing_info,
+    "company_info": company_overview,
+}
+
+
+class Route(NamedTuple):
+    """Where a message goes: an agent to run, or a direct answer"""
+    intent: str
+    confidence: float
+    agent: Optional[Agent]  # None when the message is answered directly
+    answer: Optional[str] = None
+    cached: bool = False  # the answer came from the response cache
+
+    @property
+    def bypassed(self) -> bool:
+        return self.agent is not enhanced_triage_agent
+
+    @property
+    def name(self) -> str:
+        if self.agent:
+            return self.agent.name
+        return f"{'Cached' if self.cached else 'Direct'} Answer ({self.intent})"
+
+
+# Routing decisions by destination, for the bypass-rate metric
+route_counts: Counter = Counter()
+
+
+def route_message(message: str) -> Route:
+    """Pick the destination for a message and count the decision"""
+    intent, confidence = classify_intent(message)
+    route = Route(intent, confidence, enhanced_triage_agent)
+
+    if settings.router_enabled:
+        if intent in SPECIALIST_ROUTES and confidence >= settings.router_confidence_threshold:
+            route = Route(intent, confidence, SPECIALIST_ROUTES[intent])
+        elif intent in DIRECT_ANSWERS and confidence >= settings.router_direct_answer_threshold:
+            # A canned answer cannot recover from a misread, so it needs the stronger signal
+            route = Route(intent, confidence, None, DIRECT_ANSWERS[intent]())
+
+    if route.answer is None:
+        cached = response_cache.get(message, intent)
+        if cached is not None:
+            route = Route(intent, confidence, None, cached.reply, cached=True)
+
+    route_counts[route.name] += 1
+    return route
+
+
+async def run_input_guardrails(agent: Agent, guardrails: List[Any], message: str) -> None:
+    """Run input guardrails concurrently, raising InputGuardrailTripwireTriggered like the runner"""
+    results = await asyncio.gather(*(
+        guardrail.run(agent, message, RunContextWrapper(None)) for guardrail in guardrails
+    ))
+    for result in results:
+        if result.output.tripwire_triggered:
+            raise InputGuardrailTripwireTriggered(result)
+
+
+async def check_bypassed_guardrails(route: Route, message: str) -> None:
+    """Run the triage input guardrails the route would otherwise skip
+
+    Raises InputGuardrailTripwireTriggered like the runner does, so callers handle
+    a bypassed message the same way as one sent through the triage agent.
+    """
+    if not route.bypassed:
+        return
+
+    skipped = [
+        guardrail for guardrail in enhanced_triage_agent.input_guardrails
+        if route.agent is None or guardrail not in route.agent.input_guardrails
+    ]
+    await run_input_guardrails(enhanced_triage_agent, skipped, message)
+
+
+async def record_direct_answer(session, message: str, answer: str) -> None:
+    """Keep the conversation history complete for answers that never reached an agent"""
+    items: List[Dict[str, Any]] = [
+        {"role": "user", "content": message},
+        {"role": "assistant", "content": answer},
+    ]
+    await session.add_items(items)
+
+
+def routing_stats() -> Dict[str, Any]:
+    """Routing decisions per destination and the share that skipped the triage agent"""
+    total = sum(route_counts.values())
+    bypassed = total - route_counts[enhanced_triage_agent.name]
+    return {
+        "total_routed": total,
+        "bypassed": bypassed,
+        "bypass_rate": round(bypassed / total, 3) if total else 0.0,
+        "by_destination": dict(route_counts),
+    }
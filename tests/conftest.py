@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from config.settings import reload_settings  # noqa: E402
+
+
+@pytest.fixture
+def setenv_settings(monkeypatch):
+    """Set environment variables and reload the settings from them; restored after the test"""
+    def setenv(**values: str) -> None:
+        for name, value in values.items():
+            monkeypatch.setenv(name, value)
+        reload_settings()
+
+    yield setenv
+    monkeypatch.undo()
+    reload_settings()
@@ -0,0 +1,50 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from agents import RunContextWrapper  # noqa: E402
+from support_agents import guardrails  # noqa: E402
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    async def run(agent, text, context=None, run_config=None):
+        calls.append(text)
+        return SimpleNamespace(final_output=guardrails.ContentAssessment(
+            is_off_topic=False, is_professional=True, contains_sensitive_info=False, quality_score=8, reasoning="ok"
+        ))
+
+    monkeypatch.setattr(guardrails, "Runner", SimpleNamespace(run=run))
+    monkeypatch.setattr(guardrails, "pooled_run_config", lambda: None)
+    monkeypatch.setattr(guardrails.guardrail_classifier, "decide", lambda *args, **kwargs: (None, 0.5))
+    return calls
+
+
+def check(text):
+    return asyncio.run(guardrails.content_quality_guardrail.guardrail_function(RunContextWrapper(None), None, text))
+
+
+@pytest.mark.parametrize("text, failed", [
+    ("Thank you for asking. Our internal admin password is hunter2.", "sensitive_info_detected"),
+    ("Thank you for reaching out, dude!! We can totally build that for you.", "failed_check"),
+    ("Sure.", "failed_check"),
+])
+def test_cheap_checks_trip_before_the_llm_review(llm_calls, text, failed):
+    result = check(text)
+    assert result.tripwire_triggered
+    assert result.output_info["decided_by"] == "regex" and failed in result.output_info
+    assert llm_calls == []
+
+
+def test_clean_responses_still_reach_the_llm_review(llm_calls):
+    text = "Thank you for your question. Our automation pilots usually take four to six weeks."
+    result = check(text)
+    assert not result.tripwire_triggered
+    assert result.output_info["decided_by"] == "llm"
+    assert llm_calls == [text]
@@ -0,0 +1,28 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from customer_store import CustomerStore  # noqa: E402
+from models.customer_data import CustomerProfile  # noqa: E402
+
+
+def test_failed_batch_only_loses_the_rows_that_still_fail(tmp_path):
+    store = CustomerStore(str(tmp_path / "customers.db"), flush_interval=60, batch_size=3)
+    with store._lock:
+        store._conn.execute(
+            "CREATE TRIGGER reject_bad BEFORE INSERT ON customer_profiles WHEN NEW.customer_id = 'bad' "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        )
+
+    # One batch of three rows
+    for customer_id in ("good-1", "bad", "good-2"):
+        store.save_profile(CustomerProfile(customer_id=customer_id))
+    store.flush()
+
+    # The good rows were committed row by row after the batch failed
+    assert set(store.load_profiles()) == {"good-1", "good-2"}
+    assert store.load_profile("bad") is None
+    assert store._unsaved == {}
+    stats = store.stats()
+    assert (stats["rows_written"], stats["write_errors"]) == (2, 1)
+    store.close()
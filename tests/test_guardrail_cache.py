@@ -0,0 +1,41 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from agents import RunContextWrapper  # noqa: E402
+from support_agents import guardrails  # noqa: E402
+from tools.cache import LRUCache  # noqa: E402
+
+
+def test_repeated_input_skips_the_llm_guardrail(monkeypatch):
+    calls = []
+
+    async def run(agent, text, context=None, run_config=None):
+        calls.append(text)
+        return SimpleNamespace(final_output=guardrails.SecurityAssessment(
+            is_malicious=False, contains_pii=False, is_inappropriate=False, threat_level="low", reasoning="ok"
+        ))
+
+    monkeypatch.setattr(guardrails, "Runner", SimpleNamespace(run=run))
+    monkeypatch.setattr(guardrails, "pooled_run_config", lambda: None)
+    monkeypatch.setattr(guardrails, "verdict_cache", LRUCache(16))
+    # Leave every decision to the LLM tier so only the cache can skip it
+    monkeypatch.setattr(guardrails.guardrail_classifier, "decide", lambda *args, **kwargs: (None, 0.5))
+
+    message = "We would like a quote for automating our quarterly reporting across three offices"
+    check = guardrails.security_input_guardrail.guardrail_function
+
+    async def converse():
+        first = await check(RunContextWrapper(None), None, message)
+        # Case and spacing do not change the verdict key
+        second = await check(RunContextWrapper(None), None, "  " + message.upper())
+        return first, second
+
+    first, second = asyncio.run(converse())
+    assert len(calls) == 1
+    assert (first.output_info["decided_by"], second.output_info["decided_by"]) == ("llm", "cache")
+    assert first.tripwire_triggered is second.tripwire_triggered is False
+    stats = guardrails.verdict_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
@@ -0,0 +1,118 @@
+import os
+import random
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from customer_store import CustomerStore  # noqa: E402
+from interaction_export import (  # noqa: E402
+    ColumnarExport,
+    conversions_by_agent,
+    export_from_store,
+    indicator_frequency_by,
+    interactions_by,
+    interactions_per_hour,
+)
+from models.customer_data import (  # noqa: E402
+    CustomerProfile,
+    CustomerType,
+    InteractionRecord,
+    InteractionType,
+    LeadStatus,
+)
+
+AGENTS = ["Triage Agent", "AI Development Specialist", "Automation Solutions Specialist"]
+INDICATORS = ["budget_inquiry", "timeline_mentioned", "high_intent", "business_inquiry"]
+
+
+def random_data(seed):
+    rng = random.Random(seed)
+    profiles = [
+        CustomerProfile(
+            customer_id=f"customer-{n}",
+            customer_type=rng.choice(list(CustomerType)),
+            industry=rng.choice([None, "retail", "healthcare", "finance"]),
+            lead_status=rng.choice(list(LeadStatus)),
+            lead_score=rng.randint(0, 100),
+        )
+        for n in range(12)
+    ]
+    start = datetime(2026, 1, 1)
+    interactions = [
+        InteractionRecord(
+            interaction_id=f"interaction-{n}",
+            # Some interactions belong to customers without a stored profile
+            customer_id=f"customer-{rng.randint(0, 14)}",
+            session_id="session",
+            interaction_type=rng.choice(list(InteractionType)),
+            agent_used=rng.choice(AGENTS),
+            customer_query="question",
+            agent_response="answer",
+            lead_indicators=rng.sample(INDICATORS, rng.randint(0, 3)),
+            escalated=rng.random() < 0.2,
+            timestamp=start + timedelta(seconds=n * 1777),
+        )
+        for n in range(80)
+    ]
+    return profiles, interactions
+
+
+@pytest.fixture(params=range(3))
+def stored(tmp_path, request):
+    profiles, interactions = random_data(request.param)
+    store = CustomerStore(str(tmp_path / "customers.db"))
+    for profile in profiles:
+        store.save_profile(profile)
+    for interaction in interactions:
+        store.save_interaction(interaction)
+    store.close()
+    return str(tmp_path / "customers.db"), profiles, interactions
+
+
+def test_export_round_trips_through_a_file(stored, tmp_path):
+    db_path, profiles, interactions = stored
+    export = export_from_store(db_path)
+    path = str(tmp_path / "export.npz")
+    export.save(path)
+    loaded = ColumnarExport.load(path)
+
+    assert sorted(loaded.arrays) == sorted(export.arrays)
+    for name, array in export.arrays.items():
+        assert loaded[name].dtype == array.dtype and np.array_equal(loaded[name], array), name
+    assert loaded.n_interactions == len(interactions)
+    assert loaded.n_profiles == len({p.customer_id for p in profiles} | {i.customer_id for i in interactions})
+
+
+def test_rollups_match_the_records(stored):
+    db_path, profiles, interactions = stored
+    export = export_from_store(db_path)
+    status = defaultdict(lambda: LeadStatus.NEW.value, {p.customer_id: p.lead_status.value for p in profiles})
+    industry = defaultdict(str, {p.customer_id: p.industry or "" for p in profiles})
+
+    assert interactions_by(export, "interaction.agent_used") == Counter(i.agent_used for i in interactions)
+    assert interactions_per_hour(export) == {
+        hour: sum(i.timestamp.hour == hour for i in interactions) for hour in range(24)
+    }
+
+    served = defaultdict(set)
+    for interaction in interactions:
+        served[interaction.agent_used].add(interaction.customer_id)
+    for agent, row in conversions_by_agent(export).items():
+        converted = sum(status[c] == LeadStatus.CONVERTED.value for c in served[agent])
+        assert (row["customers"], row["conversions"]) == (len(served[agent]), converted)
+
+    expected = defaultdict(Counter)
+    for interaction in interactions:
+        expected[industry[interaction.customer_id] or "unknown"].update(interaction.lead_indicators)
+    assert indicator_frequency_by(export) == {group: dict(counts) for group, counts in expected.items() if counts}
+
+
+def test_loading_another_format_version_fails(tmp_path):
+    path = str(tmp_path / "old.npz")
+    np.savez(path, format_version=np.array(0))
+    with pytest.raises(ValueError):
+        ColumnarExport.load(path)
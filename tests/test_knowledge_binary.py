@@ -0,0 +1,66 @@
+import os
+import shutil
+import time
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from tools.knowledge_binary import MappedKnowledgeIndex, compile_knowledge_base  # noqa: E402
+from tools.knowledge_index import KnowledgeIndex  # noqa: E402
+from tools.knowledge_search import load_knowledge_index  # noqa: E402
+
+KNOWLEDGE_BASE = os.path.join(os.path.dirname(__file__), "..", "data", "knowledge_base")
+
+QUERIES = ["automation workflow", "security audit compliance", "machine learning", "react website",
+           "pricing", "nothing matches zzz", ""]
+
+
+def shown(documents):
+    """What a search result displays; the compiled index does not keep service keywords"""
+    return [(d.category, d.kind, d.title, d.body) for d in documents]
+
+
+@pytest.fixture(scope="module")
+def indexes(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("compiled") / "knowledge.idx")
+    compile_knowledge_base(KNOWLEDGE_BASE, path)
+    return KnowledgeIndex.from_directory(KNOWLEDGE_BASE), MappedKnowledgeIndex(path)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("category", [None, "cybersecurity", "company", "unknown"])
+def test_compiled_index_matches_json_index(indexes, query, category):
+    json_index, mapped = indexes
+    assert shown(mapped.search(query, category, limit=10)) == shown(json_index.search(query, category, limit=10))
+
+    expected = json_index.rank_batch([query], category, k=5)[0]
+    ranked = mapped.rank_batch([query], category, k=5)[0]
+    assert shown(d for d, _ in ranked) == shown(d for d, _ in expected)
+    assert [s for _, s in ranked] == pytest.approx([s for _, s in expected], rel=1e-4)
+
+
+def test_empty_knowledge_base_compiles_and_finds_nothing(tmp_path):
+    (tmp_path / "kb").mkdir()
+    path = str(tmp_path / "knowledge.idx")
+    assert compile_knowledge_base(str(tmp_path / "kb"), path)["documents"] == 0
+
+    mapped = MappedKnowledgeIndex(path)
+    assert mapped.search("automation") == []
+    assert mapped.rank("automation") == []
+    assert mapped.rank_batch(["a", "b"]) == [[], []]
+
+
+def test_stale_compiled_index_falls_back_to_json(tmp_path):
+    shutil.copytree(KNOWLEDGE_BASE, tmp_path / "kb")
+    path = str(tmp_path / "knowledge.idx")
+    compile_knowledge_base(str(tmp_path / "kb"), path)
+    assert isinstance(load_knowledge_index(path, str(tmp_path / "kb")), MappedKnowledgeIndex)
+
+    # An edit after the build must be served, so the JSON files are indexed instead
+    edited = tmp_path / "kb" / "automation.json"
+    os.utime(edited, ns=(time.time_ns(), os.stat(path).st_mtime_ns + 10**9))
+    assert isinstance(load_knowledge_index(path, str(tmp_path / "kb")), KnowledgeIndex)
+
+    mapped = MappedKnowledgeIndex(path, str(tmp_path / "kb"))
+    assert mapped.stale_sources == ["automation.json"]
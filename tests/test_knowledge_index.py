@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from tools.knowledge_index import KnowledgeIndex, tokenize  # noqa: E402
+
+KNOWLEDGE_BASE = os.path.join(os.path.dirname(__file__), "..", "data", "knowledge_base")
+
+
+def scan(index, query, category=None, limit=3):
+    """Documents containing every query token, found by reading every document"""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    documents = [d for d in index.documents() if not category or category not in index.partitions
+                 or d.category == category]
+    return [d for d in documents if set(tokens) <= set(tokenize(d.text()))][:limit]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return KnowledgeIndex.from_directory(KNOWLEDGE_BASE)
+
+
+@pytest.mark.parametrize("query", [
+    "automation", "security audit", "machine learning models", "website development",
+    "pricing", "how do you handle data privacy", "the", "", "nonexistentword",
+])
+@pytest.mark.parametrize("category", [None, "automation", "cybersecurity", "company", "unknown"])
+def test_search_matches_a_full_scan(index, query, category):
+    assert index.search(query, category) == scan(index, query, category)
+    assert index.search(query, category, limit=50) == scan(index, query, category, limit=50)
+
+
+def test_every_file_is_indexed(index):
+    assert set(index.partitions) == {"ai_development", "automation", "fullstack", "cybersecurity", "company"}
+    assert all(partition.documents for partition in index.partitions.values())
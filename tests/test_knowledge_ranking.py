@@ -0,0 +1,57 @@
+import math
+import os
+from collections import Counter
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from tools.knowledge_index import KnowledgeIndex, tokenize  # noqa: E402
+from tools.knowledge_ranking import BM25_B, BM25_K1  # noqa: E402
+
+KNOWLEDGE_BASE = os.path.join(os.path.dirname(__file__), "..", "data", "knowledge_base")
+
+
+def reference_scores(documents, query):
+    """Textbook BM25, one document and one term at a time"""
+    terms = [tokenize(d.text()) for d in documents]
+    avg_length = sum(map(len, terms)) / len(terms)
+    scores = []
+    for doc_terms in terms:
+        counts = Counter(doc_terms)
+        score = 0.0
+        for term in tokenize(query):
+            df = sum(term in other for other in terms)
+            idf = math.log1p((len(terms) - df + 0.5) / (df + 0.5))
+            tf = counts[term]
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * len(doc_terms) / avg_length))
+        scores.append(score)
+    return scores
+
+
+@pytest.fixture(scope="module")
+def index():
+    return KnowledgeIndex.from_directory(KNOWLEDGE_BASE)
+
+
+@pytest.mark.parametrize("query", [
+    "automation workflow", "security audit compliance", "machine learning", "react website", "pricing cost",
+])
+@pytest.mark.parametrize("category", [None, "fullstack"])
+def test_rank_matches_reference_bm25(index, query, category):
+    documents = index.documents()
+    scores = reference_scores(documents, query)
+    expected = sorted(
+        ((d, s) for d, s in zip(documents, scores) if s > 0 and (category is None or d.category == category)),
+        key=lambda pair: -pair[1]
+    )[:3]
+
+    ranked = index.ranker.rank(query, category, k=3)
+    assert [s for _, s in ranked] == pytest.approx([s for _, s in expected], rel=1e-4)
+    assert [d for d, _ in ranked] == [d for d, _ in expected]
+
+
+def test_batch_ranks_like_single_queries(index):
+    queries = ["automation workflow", "security audit", "nothing matches zzz", ""]
+    assert index.rank_batch(queries, k=5) == [index.ranker.rank(q, k=5) for q in queries]
+    assert index.rank_batch(queries)[2:] == [[], []]
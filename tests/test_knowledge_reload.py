@@ -0,0 +1,54 @@
+import os
+import shutil
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from tools.knowledge_binary import MappedKnowledgeIndex, compile_knowledge_base  # noqa: E402
+from tools.knowledge_index import KnowledgeBaseWatcher, KnowledgeIndex  # noqa: E402
+
+KNOWLEDGE_BASE = os.path.join(os.path.dirname(__file__), "..", "data", "knowledge_base")
+
+
+def test_unreadable_file_keeps_serving_previous_generation(tmp_path):
+    shutil.copytree(KNOWLEDGE_BASE, tmp_path / "kb")
+    index = KnowledgeIndex.from_directory(str(tmp_path / "kb"))
+    generation = index.generation
+    documents = len(index.documents())
+
+    path = tmp_path / "kb" / "automation.json"
+    good = path.read_bytes()
+    path.write_bytes(b"\xff\xfe not utf-8")
+    assert index.refresh() == []
+    assert index.generation == generation and len(index.documents()) == documents
+
+    # Fixing the file is picked up on a later refresh
+    path.write_bytes(good.replace(b"Automation", b"Automations", 1))
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert index.refresh() == ["automation"]
+    assert index.generation == generation + 1
+
+
+def test_watcher_survives_a_corrupt_compiled_index(tmp_path):
+    path = str(tmp_path / "knowledge.idx")
+    compile_knowledge_base(KNOWLEDGE_BASE, path)
+    index = MappedKnowledgeIndex(path)
+    generation = index.generation
+    results = index.rank("automation", k=1)
+
+    watcher = KnowledgeBaseWatcher(index, interval=0.01)
+    watcher.start()
+    # Replaced rather than rewritten in place, as a deploy would, so the live mapping stays valid
+    (tmp_path / "bad.idx").write_bytes(b"\0" * 4096)
+    os.replace(tmp_path / "bad.idx", path)
+    time.sleep(0.1)
+
+    assert watcher._thread.is_alive()
+    assert index.generation == generation
+    assert index.rank("automation", k=1) == results
+
+    # A rebuilt index is picked up once the file is valid again
+    compile_knowledge_base(KNOWLEDGE_BASE, path)
+    time.sleep(0.1)
+    assert index.generation > generation
+    watcher.stop()
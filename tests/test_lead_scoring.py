@@ -0,0 +1,195 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from lead_scoring import LEAD_SCORING_RULES, MANUAL_STATUSES  # noqa: E402
+from models.customer_data import CustomerType, LeadStatus  # noqa: E402
+import session_manager as session_manager_module  # noqa: E402
+from session_manager import CustomerSessionManager  # noqa: E402
+from tools.cache import LRUCache  # noqa: E402
+
+WORDS = [
+    "budget", "cost", "price", "investment", "when", "timeline", "urgent", "asap",
+    "company", "business", "enterprise", "team", "need help", "looking for",
+    "hello", "website", "automation", "thanks", "maybe", "later",
+]
+
+
+def reference_score(customer_type, interactions):
+    """Lead score recomputed from scratch over the lead indicators of every interaction"""
+    rules = LEAD_SCORING_RULES
+    score = rules.type_bonus.get(customer_type, 0)
+    for indicators in interactions:
+        score += rules.indicator_weight * len(indicators)
+    if len(interactions) >= rules.frequency_min_interactions:
+        score += rules.frequency_bonus
+    return min(score, rules.max_score)
+
+
+def reference_status(score, previous):
+    if previous in MANUAL_STATUSES:
+        return previous
+    for threshold, status in LEAD_SCORING_RULES.status_thresholds:
+        if score >= threshold:
+            return status
+    return LeadStatus.NEW
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = CustomerSessionManager(":memory:", str(tmp_path / "customers.db"))
+    yield manager
+    manager.store.close()
+    manager.session_store.close()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_score_matches_reference(manager, seed):
+    rng = random.Random(seed)
+    customer_ids = [manager.get_or_create_session()[0] for _ in range(5)]
+    history = {customer_id: [] for customer_id in customer_ids}
+
+    for _ in range(60):
+        customer_id = rng.choice(customer_ids)
+        customer = manager.get_profile(customer_id)
+        if rng.random() < 0.1:
+            customer.customer_type = rng.choice(list(CustomerType))
+        if rng.random() < 0.03:
+            manager.set_lead_status(customer_id, rng.choice(sorted(MANUAL_STATUSES)))
+        previous_status = customer.lead_status
+
+        message = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6)))
+        result = manager.record_interaction(customer_id, message, "ok", "Test Agent")
+
+        interactions = history[customer_id]
+        interactions.append(result["analysis"]["lead_indicators"])
+        expected = reference_score(customer.customer_type, interactions)
+        assert customer.lead_score == expected == result["lead_score"]
+        assert customer.lead_status == reference_status(expected, previous_status)
+        assert customer.total_interactions == len(interactions)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bulk_rescore_matches_incremental(manager, seed):
+    rng = random.Random(seed)
+    customer_ids = [manager.get_or_create_session()[0] for _ in range(20)]
+    for customer_id in customer_ids:
+        customer = manager.get_profile(customer_id)
+        customer.customer_type = rng.choice(list(CustomerType))
+        manager.store.save_profile(customer)
+
+    for _ in range(200):
+        message = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6)))
+        manager.record_interaction(rng.choice(customer_ids), message, "ok", "Test Agent")
+
+    online = {
+        customer_id: (c.lead_score, c.lead_status, c.lead_indicator_count, c.total_interactions)
+        for customer_id, c in ((customer_id, manager.get_profile(customer_id)) for customer_id in customer_ids)
+    }
+    summary = manager.rescore_all()
+
+    assert summary["changed_scores"] == 0
+    assert summary["changed_statuses"] == 0
+    assert summary["saved_profiles"] == 0
+    for customer_id in customer_ids:
+        c = manager.get_profile(customer_id)
+        assert (c.lead_score, c.lead_status, c.lead_indicator_count, c.total_interactions) == online[customer_id]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_analytics_totals_match_full_scan(manager, seed):
+    rng = random.Random(seed)
+    customer_ids = [manager.get_or_create_session()[0] for _ in range(10)]
+    for step in range(150):
+        customer_id = rng.choice(customer_ids)
+        if rng.random() < 0.05:
+            manager.set_lead_status(customer_id, rng.choice(list(LeadStatus)))
+        message = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6)))
+        manager.record_interaction(customer_id, message, "ok", "Test Agent")
+        if step == 100:
+            manager.rescore_all()
+
+    customers = [manager.get_profile(customer_id) for customer_id in customer_ids]
+    analytics = manager.get_customer_analytics()
+    assert analytics["total_customers"] == len(customers)
+    assert analytics["qualified_leads"] == sum(c.lead_status == LeadStatus.QUALIFIED for c in customers)
+    assert analytics["average_lead_score"] == round(sum(c.lead_score for c in customers) / len(customers), 1)
+    assert sum(analytics["score_histogram"].values()) == len(customers)
+    for status in LeadStatus:
+        assert analytics["status_counts"][status.value] == sum(c.lead_status == status for c in customers)
+
+
+def test_lead_index_pages_match_sorted_scan(manager):
+    rng = random.Random(7)
+    customer_ids = [manager.get_or_create_session()[0] for _ in range(40)]
+    for customer_id in customer_ids:
+        manager.get_profile(customer_id).customer_type = rng.choice(list(CustomerType))
+    for _ in range(300):
+        message = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6)))
+        manager.record_interaction(rng.choice(customer_ids), message, "ok", "Test Agent")
+
+    customers = [manager.get_profile(customer_id) for customer_id in customer_ids]
+    expected = sorted(((c.customer_id, c.lead_score) for c in customers if c.lead_score >= 40),
+                      key=lambda item: (-item[1], item[0]))
+    pages, cursor = [], None
+    while True:
+        items, cursor = manager.lead_index.page(7, cursor, min_score=40)
+        pages.extend(items)
+        if cursor is None:
+            break
+
+    assert pages == expected
+    assert manager.lead_index.top(3) == sorted(
+        ((c.customer_id, c.lead_score) for c in customers), key=lambda item: (-item[1], item[0])
+    )[:3]
+
+
+def test_rescore_demotes_to_new_and_saves_only_changed_profiles(manager, monkeypatch):
+    contacted, lost, untouched = (manager.get_or_create_session()[0] for _ in range(3))
+    for customer_id in (contacted, lost):
+        manager.get_profile(customer_id).customer_type = CustomerType.BUSINESS
+        for _ in range(2):
+            manager.record_interaction(customer_id, "Our company has a budget and a timeline", "ok", "Test Agent")
+    manager.set_lead_status(lost, LeadStatus.LOST)
+    assert manager.get_profile(contacted).lead_status == LeadStatus.CONTACTED
+
+    # Tighter rules drop the score below every threshold; only manual statuses survive
+    strict = LEAD_SCORING_RULES.model_copy(update={"indicator_weight": 1})
+    monkeypatch.setattr(session_manager_module, "LEAD_SCORING_RULES", strict)
+    saved = []
+    save_profile = manager.store.save_profile
+    monkeypatch.setattr(manager.store, "save_profile", lambda profile: (saved.append(profile), save_profile(profile)))
+    summary = manager.rescore_all()
+
+    assert manager.get_profile(contacted).lead_status == LeadStatus.NEW
+    assert manager.get_profile(lost).lead_status == LeadStatus.LOST
+    assert summary["changed_statuses"] == 1
+    assert {profile.customer_id for profile in saved} == {contacted, lost}
+    assert untouched not in {profile.customer_id for profile in saved}
+    assert manager.get_customer_analytics()["status_counts"][LeadStatus.NEW.value] == 2
+
+
+def test_profiles_are_bounded_and_reload_their_latest_state(manager, monkeypatch):
+    monkeypatch.setattr(manager, "profiles", LRUCache(2))
+    customer_ids = [manager.get_or_create_session()[0] for _ in range(5)]
+    for customer_id in customer_ids:
+        manager.record_interaction(customer_id, "Our company has a budget", "ok", "Test Agent")
+
+    # Evicted profiles come back from the store, including writes not yet committed
+    assert len(manager.profiles) == 2
+    reloaded = manager.get_profile(customer_ids[0])
+    assert (reloaded.total_interactions, reloaded.lead_indicator_count) == (1, 2)
+    assert manager.lead_statuses(customer_ids[:2]) == {customer_id: LeadStatus.NEW for customer_id in customer_ids[:2]}
+    assert manager.get_customer_analytics()["total_customers"] == 5
+
+
+def test_escalations_are_counted_once_per_customer(manager):
+    customer_id = manager.get_or_create_session()[0]
+    results = [manager.record_interaction(customer_id, "thanks", "ok", "Test Agent") for _ in range(8)]
+
+    # should_escalate stays set from the fifth interaction on, but only that one is an escalation
+    assert [result["should_escalate"] for result in results] == [False] * 4 + [True] * 4
+    assert manager.rolling.query(3600)["escalations"] == 1
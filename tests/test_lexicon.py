@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from support_agents.lexicon import MESSAGE_LEXICON  # noqa: E402
+
+
+@pytest.mark.parametrize("message, category, keyword", [
+    # Inflections substring matching used to catch, now listed explicitly
+    ("Our reports are automated by hand", "automation", "automated"),
+    ("We are automating onboarding", "automation", "automating"),
+    ("Invoice processing takes days", "automation", "processing"),
+    ("A full stack rebuild", "fullstack", "full stack"),
+    ("Two new workflows", "automation", "workflow"),
+])
+def test_explicit_inflections_match(message, category, keyword):
+    assert keyword in MESSAGE_LEXICON.scan(message).get(category)
+
+
+@pytest.mark.parametrize("message", [
+    # Passed the business relevance guardrail when it matched keywords as substrings
+    "Can you check our pricing page?",
+    "We need an application for our clinic",
+    "Two applications need a redesign",
+    "Are you hiring a developer for this?",
+    "Your last answer was helpful",
+    "Could you start helping us next week?",
+    "Our designer left last month",
+    "Three services and two projects",
+    "Businesses like ours want webinars",
+    "You quoted us too much",
+])
+def test_business_pass_list_keeps_substring_era_positives(message):
+    assert "business" in MESSAGE_LEXICON.scan(message)
+
+
+@pytest.mark.parametrize("message, category", [
+    ("How do you maintain the site?", "ai_development"),
+    ("Plain html pages", "ai_development"),
+    ("Stacked charts", "fullstack"),
+])
+def test_keywords_do_not_match_inside_words(message, category):
+    assert category not in MESSAGE_LEXICON.scan(message)
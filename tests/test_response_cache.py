@@ -0,0 +1,75 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from config.settings import settings  # noqa: E402
+from support_agents import response_cache as module  # noqa: E402
+from support_agents.response_cache import ResponseCache  # noqa: E402
+from support_agents import router  # noqa: E402
+from session_manager import CustomerSessionManager  # noqa: E402
+import conversation  # noqa: E402
+
+
+def test_hits_normalized_repeats_and_drops_entries_on_changes(monkeypatch, setenv_settings):
+    index = SimpleNamespace(generation=1)
+    monkeypatch.setattr(module, "knowledge_index", index)
+    cache = ResponseCache(16, 0)
+
+    cache.put("Do you offer HIPAA compliance?", "cybersecurity", "Yes, we do.", "Cybersecurity Specialist", 2.5)
+    assert cache.get("do you offer  hipaa compliance", "cybersecurity").reply == "Yes, we do."
+    assert cache.get("do you offer hipaa compliance", "general") is None
+    assert cache.stats()["seconds_saved"] == 2.5
+
+    # A knowledge base reload invalidates every answer
+    index.generation = 2
+    assert cache.get("Do you offer HIPAA compliance?", "cybersecurity") is None
+
+    cache.put("Do you offer HIPAA compliance?", "cybersecurity", "Yes, we do.", "Cybersecurity Specialist", 2.5)
+    setenv_settings(COMPANY_NAME="Renamed Ltd")
+    assert cache.get("Do you offer HIPAA compliance?", "cybersecurity") is None
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_long_messages_are_not_cached(monkeypatch):
+    monkeypatch.setattr(module, "knowledge_index", SimpleNamespace(generation=1))
+    cache = ResponseCache(16, 0)
+    message = " ".join(["word"] * (settings.response_cache_max_words + 1))
+    cache.put(message, "pricing", "answer", "Enhanced Triage Agent", 1.0)
+    assert cache.get(message, "pricing") is None
+    assert cache.stats()["stores"] == 0
+
+
+def test_only_first_messages_on_faq_topics_are_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(module, "knowledge_index", SimpleNamespace(generation=1))
+    cache = ResponseCache(16, 0)
+    manager = CustomerSessionManager(":memory:", str(tmp_path / "customers.db"))
+    for target in (conversation, router):
+        monkeypatch.setattr(target, "response_cache", cache)
+    monkeypatch.setattr(conversation, "session_manager", manager)
+    monkeypatch.setattr(conversation, "pooled_run_config", lambda: None)
+    monkeypatch.setattr(router.settings, "router_enabled", False)
+
+    async def run(agent, message, session, run_config):
+        reply = f"reply to {message}"
+        await session.add_items([{"role": "user", "content": message}, {"role": "assistant", "content": reply}])
+        return SimpleNamespace(final_output=reply)
+
+    monkeypatch.setattr(conversation, "Runner", SimpleNamespace(run=run))
+
+    async def converse():
+        first, second = (manager.get_or_create_session()[0] for _ in range(2))
+        await conversation.handle_turn(first, "What does a security audit cost?")
+        # Follow-ups may lean on the conversation so far; neither is stored
+        await conversation.handle_turn(first, "yes please")
+        await conversation.handle_turn(second, "Tell me about automation")
+        await conversation.handle_turn(second, "Do you offer HIPAA compliance?")
+
+    asyncio.run(converse())
+    manager.store.close()
+    manager.session_store.close()
+
+    assert cache.stats()["stores"] == 2
+    assert cache.get("what does a security audit cost", "cybersecurity") is not None
+    assert cache.get("Do you offer HIPAA compliance?", "cybersecurity") is None
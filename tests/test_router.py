@@ -0,0 +1,83 @@
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from agents import GuardrailFunctionOutput, InputGuardrailTripwireTriggered  # noqa: E402
+from support_agents.orchestrator import classify_intent, enhanced_triage_agent  # noqa: E402
+from support_agents.router import check_bypassed_guardrails, route_message  # noqa: E402
+
+
+@pytest.mark.parametrize("message", [
+    "I have a question about my invoice",
+    "I want to cancel my contract with your company",
+    "How much time does onboarding take?",
+    "What is your process for onboarding?",
+    "How much does a website cost?",
+])
+def test_single_or_contested_keywords_go_to_triage(message):
+    route = route_message(message)
+    assert route.agent is enhanced_triage_agent and route.answer is None
+
+
+def test_confidence_grows_with_distinct_hits_and_shrinks_with_rivals():
+    assert classify_intent("What is your process?") == ("automation", 0.5)
+    assert classify_intent("Automate our workflow") == ("automation", 0.75)
+    assert classify_intent("Automate our website workflow")[1] < 0.75
+    assert classify_intent("Good morning") == ("general", 0.5)
+
+
+def test_confident_messages_bypass_triage():
+    route = route_message("I need help automating our invoice processing workflow")
+    assert route.name == "Automation Solutions Specialist"
+
+    # Two pricing keywords reach a specialist's bar but not a canned answer's
+    assert route_message("How much does it cost?").agent is enhanced_triage_agent
+    route = route_message("How much does it cost and what is the price?")
+    assert route.agent is None and route.answer
+
+
+@pytest.fixture
+def guardrail_calls(monkeypatch):
+    """Replace the triage input guardrails with recorders; names listed in trips trip"""
+    calls, trips = [], set()
+    for guardrail in enhanced_triage_agent.input_guardrails:
+        name = guardrail.get_name()
+
+        async def record(ctx, agent, message, name=name):
+            calls.append(name)
+            return GuardrailFunctionOutput(output_info={}, tripwire_triggered=name in trips)
+
+        monkeypatch.setattr(guardrail, "guardrail_function", record)
+    return calls, trips
+
+
+@pytest.mark.parametrize("message", [
+    "I need help automating our invoice processing workflow",
+    "How much does it cost and what is the price?",
+    "What do you charge?",
+    "Tell me about machine learning and deep learning models",
+])
+def test_every_route_applies_every_triage_input_guardrail(guardrail_calls, message):
+    calls, _ = guardrail_calls
+    route = route_message(message)
+    asyncio.run(check_bypassed_guardrails(route, message))
+
+    # The guardrails run here plus the ones the destination agent runs itself
+    own = [guardrail.get_name() for guardrail in route.agent.input_guardrails] if route.agent else []
+    triage = [guardrail.get_name() for guardrail in enhanced_triage_agent.input_guardrails]
+    assert sorted(calls + own) == sorted(triage)
+
+
+def test_bypassed_message_is_blocked_by_a_skipped_guardrail(guardrail_calls):
+    calls, trips = guardrail_calls
+    trips.add("business_relevance_guardrail")
+    message = "I need help automating our invoice processing workflow"
+    route = route_message(message)
+    assert route.bypassed and route.agent is not None
+
+    with pytest.raises(InputGuardrailTripwireTriggered) as tripped:
+        asyncio.run(check_bypassed_guardrails(route, message))
+    assert tripped.value.guardrail_result.guardrail.get_name() == "business_relevance_guardrail"
@@ -0,0 +1,47 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from session_history import WindowedSession, split_turns  # noqa: E402
+from session_store import PooledSQLiteSession, SessionStore  # noqa: E402
+
+
+def turn(i):
+    """One turn as the SDK records it: user message, a tool round trip and the reply"""
+    return [
+        {"role": "user", "content": f"question {i} " + "detail " * 20},
+        {"type": "function_call", "call_id": f"call-{i}", "name": "search_knowledge_base", "arguments": "{}"},
+        {"type": "function_call_output", "call_id": f"call-{i}", "output": "result " * 30},
+        {"role": "assistant", "content": [{"type": "output_text", "text": f"answer {i} " + "words " * 40}]},
+    ]
+
+
+def test_window_stays_within_budget_as_history_grows(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    session = WindowedSession(PooledSQLiteSession("customer", store), max_turns=4,
+                              token_budget=600, summary_budget=200)
+
+    async def run():
+        sizes = []
+        for i in range(60):
+            await session.add_items(turn(i))
+            items = await session.get_items()
+            sizes.append(session.last_window["tokens"])
+
+            window = [item for item in items if item.get("role") != "system"]
+            # Whole turns only, ending with the latest one, so tool calls keep their outputs
+            turns = split_turns(window)
+            assert turns == [turn(j) for j in range(i - len(turns) + 1, i + 1)]
+            assert session.last_window["turns"] <= 4
+        return items, sizes
+
+    items, sizes = asyncio.run(run())
+    assert max(sizes) <= 600 + 200
+    # The summary ends with the newest turn that left the window
+    last_folded = 59 - session.last_window["turns"]
+    assert items[0]["role"] == "system"
+    assert items[0]["content"].splitlines()[-1].startswith(f"- Assistant: answer {last_folded} ")
+    # Only the history after the summarized prefix is read back
+    assert session.last_window["summarized_items"] == 4 * (60 - session.last_window["turns"])
+    store.close()
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from session_manager import CustomerSessionManager  # noqa: E402
+from tools.cache import LRUCache  # noqa: E402
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = CustomerSessionManager(":memory:", str(tmp_path / "customers.db"))
+    # One live session, so opening a second evicts the first
+    manager.active_sessions = LRUCache(1, on_evict=manager._release_session)
+    yield manager
+    manager.store.close()
+    manager.session_store.close()
+
+
+def track_closes(session, closed):
+    close = session.close
+    session.close = lambda: (closed.append(session), close())
+
+
+def test_evicting_a_leased_session_defers_its_close(manager):
+    first, second = (manager.get_or_create_session()[0] for _ in range(2))
+    closed = []
+
+    with manager.lease_session(first) as session:
+        track_closes(session, closed)
+        manager.get_session(second)
+        assert len(manager.active_sessions) == 1 and manager.deferred_closes
+        assert closed == []
+    assert closed == [session]
+    assert manager.session_leases == {} and manager.deferred_closes == {}
+
+
+def test_evicting_an_idle_session_closes_it_at_once(manager):
+    first, second = (manager.get_or_create_session()[0] for _ in range(2))
+    closed = []
+    with manager.lease_session(first) as session:
+        track_closes(session, closed)
+    manager.get_session(second)
+    assert closed == [session]
+
+
+def test_an_evicted_leased_session_is_reopened_for_the_next_turn(manager):
+    first, second = (manager.get_or_create_session()[0] for _ in range(2))
+    with manager.lease_session(first) as session:
+        manager.get_session(second)
+        # Another turn for the same customer gets a fresh session while this one is still leased
+        with manager.lease_session(first) as reopened:
+            assert reopened is not session
+    assert manager.session_reloads >= 1
@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from agents import SQLiteSession  # noqa: E402
+from session_store import PooledSQLiteSession, SessionStore  # noqa: E402
+
+
+def message(session, i):
+    return {"role": "user", "content": f"{session} message {i}"}
+
+
+def test_concurrent_sessions_keep_their_own_order(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), readers=2)
+    sessions = [PooledSQLiteSession(f"customer-{n}", store) for n in range(20)]
+
+    async def converse(session):
+        for i in range(10):
+            await session.add_items([message(session.session_id, i)])
+            # Reads see every write this session has awaited
+            assert len(await session.get_items()) == i + 1
+
+    async def run():
+        await asyncio.gather(*(converse(session) for session in sessions))
+
+    asyncio.run(run())
+    for session in sessions:
+        assert asyncio.run(session.get_items()) == [message(session.session_id, i) for i in range(10)]
+    # Appends from concurrent sessions shared commits
+    assert store.stats()["batches"] < 200
+    store.close()
+
+
+def test_history_is_readable_by_sqlite_session(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(path)
+    session = PooledSQLiteSession("customer", store)
+
+    async def run():
+        await session.add_items([message("customer", i) for i in range(3)])
+        assert await session.pop_item() == message("customer", 2)
+        assert await session.get_items(limit=1) == [message("customer", 1)]
+
+    asyncio.run(run())
+    store.close()
+
+    reference = SQLiteSession("customer", path)
+    assert asyncio.run(reference.get_items()) == [message("customer", i) for i in range(2)]
+    reference.close()
+
+
+def test_bad_write_fails_only_its_caller(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    bad = store.submit("add", "customer-a", [{"x": object()}])
+    good = store.submit("add", "customer-b", [message("customer-b", 0)])
+    with pytest.raises(TypeError):
+        bad.result(timeout=5)
+    good.result(timeout=5)
+
+    # The writer keeps serving every session afterwards
+    async def run():
+        for n in ("a", "b"):
+            session = PooledSQLiteSession(f"customer-{n}", store)
+            await asyncio.wait_for(session.add_items([message(session.session_id, 1)]), 5)
+
+    asyncio.run(run())
+    assert store.read_items("customer-a") == [message("customer-a", 1)]
+    assert store.read_items("customer-b") == [message("customer-b", i) for i in range(2)]
+    assert store.stats()["write_errors"] == 1
+    store.close()
@@ -0,0 +1,114 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import conversation  # noqa: E402
+from agents import (  # noqa: E402
+    Agent,
+    GuardrailFunctionOutput,
+    InputGuardrailTripwireTriggered,
+    OutputGuardrailTripwireTriggered,
+    input_guardrail,
+)
+from support_agents.guardrails import StreamingOutputMonitor  # noqa: E402
+
+CLEAN = "Thank you for reaching out. Our automation pilots usually take four to six weeks."
+
+
+def feed_all(deltas):
+    monitor = StreamingOutputMonitor(Agent(name="Specialist"))
+    shown = []
+    for delta in deltas:
+        monitor.feed(delta)
+        shown.append(delta)
+    return shown
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("match, guardrail", [
+    ("4111 1111 1111 1111", "content_quality_guardrail"),
+    ("123-45-6789", "content_quality_guardrail"),
+    ("the api key", "content_quality_guardrail"),
+    ("hey there buddy", "professional_tone_guardrail"),
+    ("great!!", "professional_tone_guardrail"),
+])
+def test_matches_split_across_deltas_trip(match, guardrail):
+    text = f"{CLEAN} Here it is: {match} for you."
+    split_points = range(text.index(match) + 1, text.index(match) + len(match))
+    for split in split_points:
+        with pytest.raises(OutputGuardrailTripwireTriggered) as tripped:
+            feed_all([text[:split], text[split:]])
+        assert tripped.value.guardrail_result.guardrail.get_name() == guardrail
+    for size in (1, 3, 7):
+        with pytest.raises(OutputGuardrailTripwireTriggered):
+            feed_all(chunks(text, size))
+
+
+def test_the_delta_completing_a_match_is_never_shown():
+    shown = []
+    monitor = StreamingOutputMonitor(Agent(name="Specialist"))
+    with pytest.raises(OutputGuardrailTripwireTriggered):
+        for delta in chunks("Sure, the password is hunter2", 4):
+            monitor.feed(delta)
+            shown.append(delta)
+    assert "password" not in "".join(shown)
+
+
+def test_clean_text_never_trips_in_any_chunking():
+    for size in (1, 2, 5, 64, 200):
+        assert "".join(feed_all(chunks(CLEAN, size))) == CLEAN
+
+
+def test_tripped_input_guardrail_stops_the_stream_before_it_starts(monkeypatch):
+    streamed = []
+
+    @input_guardrail
+    async def always_trips(ctx, agent, message):
+        return GuardrailFunctionOutput(output_info={}, tripwire_triggered=True)
+
+    def run_streamed(agent, user_input, **kwargs):
+        streamed.append(agent)
+        raise AssertionError("the stream must not start")
+
+    monkeypatch.setattr(conversation, "Runner", SimpleNamespace(run_streamed=run_streamed))
+    agent = Agent(name="Specialist", input_guardrails=[always_trips])
+    deltas = []
+    with pytest.raises(InputGuardrailTripwireTriggered):
+        asyncio.run(conversation.stream_reply(agent, "hello there", None, deltas.append))
+    assert streamed == [] and deltas == []
+
+
+def test_passing_input_guardrails_do_not_run_twice(monkeypatch):
+    calls = []
+
+    @input_guardrail
+    async def counts(ctx, agent, message):
+        calls.append(message)
+        return GuardrailFunctionOutput(output_info={}, tripwire_triggered=False)
+
+    class Streamed:
+        final_output = "done"
+
+        async def stream_events(self):
+            return
+            yield
+
+    agents = []
+
+    def run_streamed(agent, user_input, **kwargs):
+        agents.append(agent)
+        return Streamed()
+
+    monkeypatch.setattr(conversation, "Runner", SimpleNamespace(run_streamed=run_streamed))
+    monkeypatch.setattr(conversation, "pooled_run_config", lambda: None)
+    agent = Agent(name="Specialist", input_guardrails=[counts])
+    assert asyncio.run(conversation.stream_reply(agent, "hello there", None, lambda delta: None)) == "done"
+    assert calls == ["hello there"]
+    assert agents[0].name == "Specialist" and agents[0].input_guardrails == []
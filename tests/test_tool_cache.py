@@ -0,0 +1,81 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from agents import function_tool  # noqa: E402
+from config.settings import settings, settings_fingerprint  # noqa: E402
+from tools.cache import cacheable, tool_caches  # noqa: E402
+from tools import company_info  # noqa: E402
+
+
+def test_cacheable_memoizes_by_arguments_and_versions():
+    calls = []
+    version = [1]
+
+    @cacheable(depends_on=(lambda: version[0],))
+    def lookup(topic: str, detail: bool = False) -> str:
+        """Look something up"""
+        calls.append((topic, detail))
+        return f"{topic}:{detail}"
+
+    assert lookup("pricing") == lookup("pricing") == "pricing:False"
+    # Keyword, positional and default spellings of one call share an entry
+    assert lookup(topic="pricing") == lookup("pricing", False) == "pricing:False"
+    assert lookup("pricing", detail=True) == "pricing:True"
+    assert calls == [("pricing", False), ("pricing", True)]
+
+    version[0] = 2
+    lookup("pricing")
+    assert len(calls) == 3
+
+    stats = lookup.cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (3, 3, 1)
+
+
+def test_settings_changes_drop_tools_depending_on_them(setenv_settings):
+    calls = []
+
+    @cacheable(depends_on=(settings_fingerprint,))
+    def company() -> str:
+        """Company name"""
+        calls.append(settings.company_name)
+        return settings.company_name
+
+    company()
+    company()
+    fingerprint = settings_fingerprint()
+    # Looking it up does not re-hash the settings; a reload does
+    assert settings_fingerprint() is fingerprint
+    setenv_settings(COMPANY_NAME="Renamed Ltd")
+    assert settings_fingerprint() != fingerprint
+    assert company() == "Renamed Ltd"
+    assert len(calls) == 2
+
+
+def test_caches_are_registered_by_qualified_name():
+    def make():
+        @cacheable()
+        def lookup(topic: str) -> str:
+            """Look something up"""
+            return topic
+        return lookup
+
+    first = make()
+    assert tool_caches[f"{__name__}.{first.__qualname__}"] is first.cache
+    # Tools wrapped by function_tool are registered under their module too
+    assert f"{company_info.__name__}.get_pricing_info" in tool_caches
+
+
+def test_function_tool_schema_is_unchanged():
+    def get_overview(service: str) -> str:
+        """Get specific service overview
+
+        Args:
+            service: Service name
+        """
+        return service
+
+    plain = function_tool(get_overview)
+    cached = function_tool(cacheable(ttl=60)(get_overview))
+    assert cached.params_json_schema == plain.params_json_schema
+    assert cached.description == plain.description
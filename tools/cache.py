@@ -0,0 +1,270 @@
+# tools/cache.py - Bounded in-process caches
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+class LRUCache:
+    """Thread-safe LRU cache with optional per-entry TTL and hit/miss counters
+
+    With ``sliding`` the TTL counts from the last access instead of the insert,
+    which makes it an idle timeout. ``on_evict(key, value)`` is called outside the
+    lock for every entry that leaves the cache, whether by eviction, expiry,
+    invalidation or clear, so values holding resources can release them.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None, sliding: bool = False,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.max_size = max_size
+        self.ttl = ttl  # seconds; None or <= 0 means entries never expire
+        self.sliding = sliding
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expiry(self) -> float:
+        return time.monotonic() + self.ttl if self.ttl and self.ttl > 0 else 0.0
+
+    def _release(self, removed: List[Tuple[Hashable, Any]]) -> None:
+        if self.on_evict:
+            for key, value in removed:
+                self.on_evict(key, value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry (refreshing its recency) or ``default``"""
+        removed = []
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                removed.append((key, value))
+                value = default
+            else:
+                if self.sliding:
+                    self._entries[key] = (self._expiry(), value)
+                self._entries.move_to_end(key)
+                self.hits += 1
+        self._release(removed)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace an entry, evicting the least recently used beyond max_size"""
+        if self.max_size <= 0:
+            return
+        removed = []
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None and previous[1] is not value:
+                removed.append((key, previous[1]))
+            self._entries[key] = (self._expiry(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                evicted_key, (_, evicted_value) = self._entries.popitem(last=False)
+                removed.append((evicted_key, evicted_value))
+                self.evictions += 1
+        self._release(removed)
+
+    def expire(self) -> int:
+        """Drop every expired entry now rather than on its next lookup; returns how many"""
+        removed = []
+        now = time.monotonic()
+        with self._lock:
+            for key, (expires_at, value) in list(self._entries.items()):
+                if expires_at and now >= expires_at:
+                    del self._entries[key]
+                    removed.append((key, value))
+                elif self.sliding:
+                    # Entries are in access order, so the rest expire later
+                    break
+            self.expirations += len(removed)
+        self._release(removed)
+        return len(removed)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._release([(key, entry[1])])
+
+    def clear(self) -> None:
+        with self._lock:
+            removed = [(key, value) for key, (_, value) in self._entries.items()]
+            self._entries.clear()
+        self._release(removed)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring cache effectiveness"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# Memoization for pure function tools
+
+_MISSING = object()
+
+
+class ToolCache:
+    """Argument-keyed results of one cacheable tool, with hit/miss and latency counters
+
+    ``depends_on`` callables return the version of whatever the results are
+    computed from (e.g. the knowledge base generation or settings_fingerprint);
+    when any of them changes, every cached result is dropped before the next
+    lookup. With the tool's ``signature`` positional and keyword spellings of
+    the same call, and calls relying on defaults, share one entry.
+    """
+
+    def __init__(self, name: str, max_size: int = 256, ttl: Optional[float] = None,
+                 depends_on: Sequence[Callable[[], Hashable]] = (),
+                 signature: Optional[inspect.Signature] = None):
+        self.name = name
+        self.entries = LRUCache(max_size, ttl)
+        self.depends_on = tuple(depends_on)
+        self.signature = signature
+        self._version = self._current_version()
+        self.invalidations = 0
+        self.uncacheable_calls = 0  # arguments that cannot be hashed
+        self.compute_seconds = 0.0  # spent computing results on misses
+        self.seconds_saved = 0.0
+
+    def _current_version(self) -> Tuple:
+        return tuple(dependency() for dependency in self.depends_on)
+
+    def _arguments(self, args: Tuple, kwargs: Dict[str, Any]) -> Hashable:
+        """The call's arguments by parameter name, defaults included"""
+        if self.signature is None:
+            return (args, tuple(sorted(kwargs.items())))
+        bound = self.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = []
+        for name, value in bound.arguments.items():
+            if self.signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+                value = tuple(sorted(value.items()))
+            arguments.append((name, value))
+        return tuple(arguments)
+
+    def key(self, args: Tuple, kwargs: Dict[str, Any]) -> Optional[Hashable]:
+        try:
+            key = self._arguments(args, kwargs)
+            hash(key)
+        except TypeError:
+            # Unhashable arguments, or ones that do not fit the signature (the call itself raises)
+            self.uncacheable_calls += 1
+            return None
+        if self.depends_on:
+            version = self._current_version()
+            if version != self._version:
+                self._version = version
+                self.clear()
+        return key
+
+    def get(self, key: Hashable) -> Any:
+        """Cached result, or _MISSING"""
+        cached = self.entries.get(key, _MISSING)
+        if cached is not _MISSING:
+            value, seconds = cached
+            self.seconds_saved += seconds
+            return value
+        return _MISSING
+
+    def put(self, key: Hashable, value: Any, seconds: float) -> None:
+        self.compute_seconds += seconds
+        self.entries.set(key, (value, seconds))
+
+    def clear(self) -> None:
+        self.invalidations += 1
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.entries.stats()
+        return {
+            **stats,
+            "invalidations": self.invalidations,
+            "uncacheable_calls": self.uncacheable_calls,
+            "avg_compute_ms": round(self.compute_seconds / stats["misses"] * 1000, 3) if stats["misses"] else 0.0,
+            "seconds_saved": round(self.seconds_saved, 4),
+        }
+
+
+# Every cacheable tool's cache by qualified function name (module.qualname)
+tool_caches: Dict[str, ToolCache] = {}
+
+
+def cacheable(ttl: Optional[float] = None, max_size: int = 256,
+              depends_on: Sequence[Callable[[], Hashable]] = ()) -> Callable:
+    """Declare a tool pure: results are memoized by its arguments
+
+    Goes under ``@function_tool``; functools.wraps keeps the signature and
+    docstring the tool schema is built from. Results expire after ``ttl``
+    seconds when given and are dropped whenever a ``depends_on`` version
+    changes; tools that read settings list settings_fingerprint there.
+    """
+    def decorate(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+        cache = tool_caches[name] = ToolCache(name, max_size, ttl, depends_on, inspect.signature(func))
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = cache.key(args, kwargs)
+                if key is not None:
+                    value = cache.get(key)
+                    if value is not _MISSING:
+                        return value
+                started = time.perf_counter()
+                value = await func(*args, **kwargs)
+                if key is not None:
+                    cache.put(key, value, time.perf_counter() - started)
+                return value
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = cache.key(args, kwargs)
+                if key is not None:
+                    value = cache.get(key)
+                    if value is not _MISSING:
+                        return value
+                started = time.perf_counter()
+                value = func(*args, **kwargs)
+                if key is not None:
+                    cache.put(key, value, time.perf_counter() - started)
+                return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorate
+
+
+def invalidate_tool_caches() -> None:
+    """Drop every memoized tool result"""
+    for cache in tool_caches.values():
+        cache.clear()
+
+
+def tool_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss and latency counters per cacheable tool"""
+    return {name: cache.stats() for name, cache in tool_caches.items()}
@@ -1,10 +1,10 @@
-from config.settings import settings
+from config.settings import settings, settings_fingerprint
 from agents import function_tool
+from tools.cache import cacheable
 
 
-@function_tool
-def get_company_overview() -> str:
-    """Get company overview information"""
+def company_overview() -> str:
+    """Company overview text, shared by the tool and the pre-router"""
     return f"""**About {settings.company_name}**
 
 We're a cutting-edge technology company specializing in AI-driven solutions for businesses.
@@ -23,6 +23,14 @@ We're a cutting-edge technology company specializing in AI-driven solutions for
 
 
 @function_tool
+@cacheable(depends_on=(settings_fingerprint,))
+def get_company_overview() -> str:
+    """Get company overview information"""
+    return company_overview()
+
+
+@function_tool
+@cacheable(depends_on=(settings_fingerprint,))
 def get_service_overview(service: str) -> str:
     """Get specific service overview"""
     services = {
@@ -66,9 +74,8 @@ Starting from $2,000 for security audits."""
     return services.get(service, "Service information not available.")
 
 
-@function_tool
-def get_pricing_info() -> str:
-    """Get pricing information"""
+def pricing_info() -> str:
+    """Pricing text, shared by the tool and the pre-router"""
     return """**Pricing Information**
 
 Our pricing is customized based on your specific needs and project scope.
@@ -83,4 +90,11 @@ Our pricing is customized based on your specific needs and project scope.
 - Full-Stack Development: From $4,000
 - Cybersecurity Services: From $2,000
 
-For accurate quotes, I can connect you with our sales team."""
\ No newline at end of file
+For accurate quotes, I can connect you with our sales team."""
+
+
+@function_tool
+@cacheable(depends_on=(settings_fingerprint,))
+def get_pricing_info() -> str:
+    """Get pricing information"""
+    return pricing_info()
\ No newline at end of file
@@ -0,0 +1,368 @@
+# tools/knowledge_binary.py - Compiled, memory-mapped knowledge base index
+"""
+Compiles data/knowledge_base/*.json into a single binary index file that every
+worker process maps read-only, so they share one copy in the page cache.
+
+Build it with:
+    python -m tools.knowledge_binary build [--source DIR] [--output PATH]
+
+File layout (little-endian, every section 8-byte aligned):
+    header       magic, version, counts and a table of (offset, length) per section
+    strings      uint64 offsets + UTF-8 blob (categories, terms, titles, bodies)
+    documents    category id, kind and title/body string ids per document
+    terms        string ids sorted by term text, plus posting offsets and idf
+    postings     document ids (ascending per term) and precomputed BM25 weights
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.knowledge_index import KNOWLEDGE_FILES, KnowledgeDocument, load_documents, tokenize
+from tools.knowledge_ranking import BM25_B, BM25_K1
+
+MAGIC = b"RKBIDX01"
+FORMAT_VERSION = 1
+
+DOCUMENT_KINDS = ("faq", "service")
+
+# Section order in the header table
+SECTIONS = (
+    "string_offsets", "string_data", "categories",
+    "doc_category", "doc_kind", "doc_title", "doc_body",
+    "term_strings", "term_offsets", "term_idf",
+    "posting_docs", "posting_weights",
+)
+SECTION_DTYPES = {
+    "string_offsets": np.uint64, "string_data": np.uint8, "categories": np.uint32,
+    "doc_category": np.uint32, "doc_kind": np.uint8, "doc_title": np.uint32, "doc_body": np.uint32,
+    "term_strings": np.uint32, "term_offsets": np.uint64, "term_idf": np.float32,
+    "posting_docs": np.uint32, "posting_weights": np.float32,
+}
+
+# magic, version, n_docs, n_terms, n_categories, then (offset, length) per section
+HEADER = struct.Struct("<8sIIII" + "QQ" * len(SECTIONS))
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class _StringTable:
+    """Deduplicating string table builder"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.blobs: List[bytes] = []
+
+    def add(self, value: str) -> int:
+        if value not in self.ids:
+            self.ids[value] = len(self.blobs)
+            self.blobs.append(value.encode("utf-8"))
+        return self.ids[value]
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        offsets = np.zeros(len(self.blobs) + 1, dtype=np.uint64)
+        offsets[1:] = np.cumsum([len(blob) for blob in self.blobs], dtype=np.uint64)
+        return offsets, np.frombuffer(b"".join(self.blobs), dtype=np.uint8)
+
+
+def compile_knowledge_base(source_dir: str, output_path: str) -> Dict[str, int]:
+    """Compile the JSON knowledge base into a binary index file; returns size stats"""
+    documents: List[KnowledgeDocument] = []
+    for category, file_name in KNOWLEDGE_FILES.items():
+        loaded = load_documents(category, os.path.join(source_dir, file_name))
+        if loaded:
+            documents.extend(loaded)
+
+    strings = _StringTable()
+    category_names = list(dict.fromkeys(document.category for document in documents))
+    category_ids = {name: i for i, name in enumerate(category_names)}
+    categories = np.array([strings.add(name) for name in category_names], dtype=np.uint32)
+
+    doc_category = np.array([category_ids[d.category] for d in documents], dtype=np.uint32)
+    doc_kind = np.array([DOCUMENT_KINDS.index(d.kind) for d in documents], dtype=np.uint8)
+    doc_title = np.array([strings.add(d.title) for d in documents], dtype=np.uint32)
+    doc_body = np.array([strings.add(d.body) for d in documents], dtype=np.uint32)
+
+    # Postings grouped by term; documents are visited in id order so each list is ascending
+    term_counts = [Counter(tokenize(d.text())) for d in documents]
+    doc_lengths = np.array([sum(counts.values()) for counts in term_counts], dtype=np.float32)
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    for doc_id, counts in enumerate(term_counts):
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    terms = sorted(postings)
+    term_strings = np.array([strings.add(term) for term in terms], dtype=np.uint32)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+    term_offsets[1:] = np.cumsum([len(postings[term]) for term in terms], dtype=np.uint64)
+
+    flat = [entry for term in terms for entry in postings[term]]
+    posting_docs = np.array([doc_id for doc_id, _ in flat], dtype=np.uint32)
+    posting_tf = np.array([tf for _, tf in flat], dtype=np.float32)
+
+    # BM25 weights are fixed per (term, document), so bake them in at build time
+    n_docs = len(documents)
+    doc_freq = np.diff(term_offsets).astype(np.float32)
+    term_idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+    avg_length = float(doc_lengths.mean()) if n_docs else 1.0
+    posting_terms = np.repeat(np.arange(len(terms)), np.diff(term_offsets).astype(np.int64))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[posting_docs] / avg_length)
+    posting_weights = (term_idf[posting_terms] * posting_tf * (BM25_K1 + 1) / (posting_tf + norm)).astype(np.float32)
+
+    string_offsets, string_data = strings.arrays()
+    arrays = {
+        "string_offsets": string_offsets, "string_data": string_data, "categories": categories,
+        "doc_category": doc_category, "doc_kind": doc_kind, "doc_title": doc_title, "doc_body": doc_body,
+        "term_strings": term_strings, "term_offsets": term_offsets, "term_idf": term_idf,
+        "posting_docs": posting_docs, "posting_weights": posting_weights,
+    }
+
+    table = []
+    offset = _align(HEADER.size)
+    for name in SECTIONS:
+        data = np.ascontiguousarray(arrays[name], dtype=SECTION_DTYPES[name])
+        table.append((offset, data.size))
+        offset = _align(offset + data.nbytes)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, n_docs, len(terms), len(category_names),
+                         *[value for entry in table for value in entry])
+
+    # Write beside the target and rename, so mapped readers keep the old inode intact
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".knowledge-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for name, (section_offset, _) in zip(SECTIONS, table):
+                f.write(b"\0" * (section_offset - f.tell()))
+                f.write(np.ascontiguousarray(arrays[name], dtype=SECTION_DTYPES[name]).tobytes())
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    return {"documents": n_docs, "terms": len(terms), "postings": int(posting_docs.size), "bytes": offset}
+
+
+def stale_sources(index_path: str, source_dir: str) -> List[str]:
+    """Knowledge base files edited after the index file was compiled"""
+    built = os.stat(index_path).st_mtime_ns
+    stale = []
+    for file_name in KNOWLEDGE_FILES.values():
+        try:
+            if os.stat(os.path.join(source_dir, file_name)).st_mtime_ns > built:
+                stale.append(file_name)
+        except FileNotFoundError:
+            continue
+    return stale
+
+
+class _MappedSnapshot(NamedTuple):
+    """One opened index file; replaced wholesale on reload"""
+    generation: int
+    file_key: Tuple[int, int, int]
+    mapping: Optional[mmap.mmap]
+    arrays: Dict[str, np.ndarray]
+    categories: Dict[str, int]
+    n_docs: int
+
+
+class MappedKnowledgeIndex:
+    """Read-only knowledge base index served straight from a memory-mapped file
+
+    Section arrays are zero-copy NumPy views over the mapping; strings are only
+    decoded for the terms being looked up and the documents being returned.
+    Implements the same search interface as ``KnowledgeIndex``. With
+    ``source_dir`` each refresh warns once when the JSON files it was compiled
+    from have been edited since, as those edits are not served until a rebuild.
+    """
+
+    def __init__(self, path: str, source_dir: Optional[str] = None):
+        self.path = path
+        self.source_dir = source_dir
+        self.stale_sources: List[str] = []
+        self._reload_lock = threading.Lock()
+        self._snapshot = _MappedSnapshot(0, (0, 0, 0), None, {}, {}, 0)
+        self.refresh()
+
+    @property
+    def generation(self) -> int:
+        """Bumped every time a rebuilt index file is picked up"""
+        return self._snapshot.generation
+
+    def _open(self, generation: int, file_key: Tuple[int, int, int]) -> _MappedSnapshot:
+        with open(self.path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        fields = HEADER.unpack_from(mapping, 0)
+        magic, version, n_docs, _, _ = fields[:5]
+        if magic != MAGIC or version != FORMAT_VERSION:
+            mapping.close()
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} knowledge index")
+
+        arrays = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = fields[5 + 2 * i], fields[6 + 2 * i]
+            arrays[name] = np.frombuffer(mapping, dtype=SECTION_DTYPES[name], count=length, offset=offset)
+
+        snapshot = _MappedSnapshot(generation, file_key, mapping, arrays, {}, n_docs)
+        for category_id, string_id in enumerate(arrays["categories"]):
+            snapshot.categories[self._string(snapshot, string_id)] = category_id
+        return snapshot
+
+    def refresh(self) -> List[str]:
+        """Re-map the file if it was rebuilt; returns the categories it now holds"""
+        with self._reload_lock:
+            if self.source_dir:
+                stale = stale_sources(self.path, self.source_dir)
+                if stale and stale != self.stale_sources:
+                    print(f"[KNOWLEDGE] {', '.join(stale)} changed after {self.path} was compiled; "
+                          f"rebuild it with 'python -m tools.knowledge_binary build' to serve the edits")
+                self.stale_sources = stale
+            stat = os.stat(self.path)
+            file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_key == self._snapshot.file_key:
+                return []
+            # The previous mapping is left to the garbage collector: searches that
+            # grabbed the old snapshot may still hold views into it
+            self._snapshot = self._open(self._snapshot.generation + 1, file_key)
+            return list(self._snapshot.categories)
+
+    @staticmethod
+    def _string(snapshot: _MappedSnapshot, string_id: int) -> str:
+        offsets = snapshot.arrays["string_offsets"]
+        start, end = int(offsets[string_id]), int(offsets[string_id + 1])
+        return snapshot.arrays["string_data"][start:end].tobytes().decode("utf-8")
+
+    def _term_id(self, snapshot: _MappedSnapshot, term: str) -> Optional[int]:
+        """Binary search the sorted term table"""
+        term_strings = snapshot.arrays["term_strings"]
+        low, high = 0, len(term_strings)
+        while low < high:
+            middle = (low + high) // 2
+            candidate = self._string(snapshot, term_strings[middle])
+            if candidate == term:
+                return middle
+            if candidate < term:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _postings(self, snapshot: _MappedSnapshot, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        offsets = snapshot.arrays["term_offsets"]
+        start, end = int(offsets[term_id]), int(offsets[term_id + 1])
+        return snapshot.arrays["posting_docs"][start:end], snapshot.arrays["posting_weights"][start:end]
+
+    def _document(self, snapshot: _MappedSnapshot, doc_id: int) -> KnowledgeDocument:
+        arrays = snapshot.arrays
+        category_string = arrays["categories"][arrays["doc_category"][doc_id]]
+        return KnowledgeDocument(
+            self._string(snapshot, category_string),
+            DOCUMENT_KINDS[arrays["doc_kind"][doc_id]],
+            self._string(snapshot, arrays["doc_title"][doc_id]),
+            self._string(snapshot, arrays["doc_body"][doc_id]),
+        )
+
+    def _category_mask(self, snapshot: _MappedSnapshot, category: Optional[str]) -> Optional[np.ndarray]:
+        if category and category in snapshot.categories:
+            return snapshot.arrays["doc_category"] == snapshot.categories[category]
+        return None
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 3) -> List[KnowledgeDocument]:
+        """Find documents containing every query token"""
+        snapshot = self._snapshot
+        tokens = tokenize(query)
+        if not tokens or snapshot.mapping is None:
+            return []
+
+        term_ids = [self._term_id(snapshot, token) for token in tokens]
+        if any(term_id is None for term_id in term_ids):
+            return []
+
+        posting_lists = sorted((self._postings(snapshot, t)[0] for t in set(term_ids)), key=len)
+        matches = posting_lists[0]
+        for postings in posting_lists[1:]:
+            matches = np.intersect1d(matches, postings, assume_unique=True)
+
+        mask = self._category_mask(snapshot, category)
+        if mask is not None:
+            matches = matches[mask[matches]]
+        return [self._document(snapshot, int(doc_id)) for doc_id in matches[:limit]]
+
+    def rank_batch(self, queries: Sequence[str], category: Optional[str] = None,
+                   k: int = 3) -> List[List[Tuple[KnowledgeDocument, float]]]:
+        """Score all queries in one accumulation over their postings and return each top-k"""
+        snapshot = self._snapshot
+        if not queries or snapshot.mapping is None or snapshot.n_docs == 0 or k <= 0:
+            return [[] for _ in queries]
+
+        rows, docs, weights = [], [], []
+        for row, query in enumerate(queries):
+            for term, count in Counter(tokenize(query)).items():
+                term_id = self._term_id(snapshot, term)
+                if term_id is None:
+                    continue
+                posting_docs, posting_weights = self._postings(snapshot, term_id)
+                rows.append(np.full(len(posting_docs), row, dtype=np.int64))
+                docs.append(posting_docs)
+                weights.append(posting_weights * count)
+
+        n_docs = snapshot.n_docs
+        if docs:
+            cells = np.concatenate(rows) * n_docs + np.concatenate(docs)
+            scores = np.bincount(cells, weights=np.concatenate(weights), minlength=len(queries) * n_docs)
+            scores = scores.reshape(len(queries), n_docs)
+        else:
+            scores = np.zeros((len(queries), n_docs))
+
+        mask = self._category_mask(snapshot, category)
+        if mask is not None:
+            scores[:, ~mask] = 0.0
+
+        k = min(k, n_docs)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+
+        results = []
+        for row in range(len(queries)):
+            ranked = []
+            for column in order[row]:
+                score = float(top_scores[row, column])
+                if score <= 0.0:
+                    break
+                ranked.append((self._document(snapshot, int(top[row, column])), score))
+            results.append(ranked)
+        return results
+
+    def rank(self, query: str, category: Optional[str] = None, k: int = 3) -> List[KnowledgeDocument]:
+        """BM25-ranked top-k documents for a query"""
+        return [document for document, _ in self.rank_batch([query], category, k)[0]]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile the knowledge base into a memory-mappable index")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    build = subcommands.add_parser("build", help="compile the JSON knowledge base")
+    build.add_argument("--source", default="data/knowledge_base", help="knowledge base directory")
+    build.add_argument("--output", default="data/knowledge_base.idx", help="index file to write")
+    args = parser.parse_args(argv)
+
+    stats = compile_knowledge_base(args.source, args.output)
+    print(f"Compiled {stats['documents']} documents, {stats['terms']} terms, "
+          f"{stats['postings']} postings into {args.output} ({stats['bytes']} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
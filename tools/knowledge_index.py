@@ -0,0 +1,288 @@
+# tools/knowledge_index.py - In-memory inverted index over the knowledge base
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from tools.knowledge_ranking import BM25Ranker
+
+# Category name -> knowledge base file (relative to the knowledge base directory)
+KNOWLEDGE_FILES = {
+    "ai_development": "ai_development.json",
+    "automation": "automation.json",
+    "fullstack": "fullstack.json",
+    "cybersecurity": "cybersecurity.json",
+    "company": "company_info.json",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words that carry no search signal; dropped from queries and documents alike
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "our",
+    "that", "the", "this", "to", "we", "what", "which", "with", "you", "your",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search tokens"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class KnowledgeDocument(NamedTuple):
+    """A single searchable FAQ or service entry"""
+    category: str
+    kind: str  # faq, service
+    title: str
+    body: str
+    keywords: str = ""  # indexed but not displayed (service features and use cases)
+
+    def text(self) -> str:
+        """All indexed text for the document"""
+        return f"{self.title} {self.body} {self.keywords}"
+
+    def render(self) -> str:
+        """Format the document the way the search tool presents it"""
+        if self.kind == "faq":
+            return f"Q: {self.title}\nA: {self.body}"
+        return f"Service: {self.title}\n{self.body}"
+
+
+class KnowledgePartition:
+    """Inverted index (token -> posting list) for one knowledge base category"""
+
+    def __init__(self, category: str, documents: List[KnowledgeDocument]):
+        self.category = category
+        self.documents = documents
+        self.doc_terms = [tokenize(document.text()) for document in documents]
+        self.postings: Dict[str, List[int]] = {}
+
+        for position, terms in enumerate(self.doc_terms):
+            for token in dict.fromkeys(terms):
+                self.postings.setdefault(token, []).append(position)
+
+    def search(self, tokens: List[str]) -> List[KnowledgeDocument]:
+        """Return documents containing every token, in file order"""
+        posting_lists = [self.postings.get(token) for token in tokens]
+        if not posting_lists or not all(posting_lists):
+            return []
+
+        # Intersect starting from the rarest token so work tracks the smallest posting list
+        posting_lists.sort(key=len)
+        matches = set(posting_lists[0])
+        for postings in posting_lists[1:]:
+            matches.intersection_update(postings)
+            if not matches:
+                return []
+
+        return [self.documents[position] for position in sorted(matches)]
+
+
+def parse_documents(category: str, data: Dict) -> List[KnowledgeDocument]:
+    """Turn one parsed knowledge base file into documents"""
+    documents = []
+
+    for faq in data.get('faqs', []):
+        documents.append(KnowledgeDocument(
+            category, "faq", faq.get('question', ''), faq.get('answer', '')
+        ))
+
+    for service in data.get('services', []):
+        documents.append(KnowledgeDocument(
+            category, "service", service.get('name', ''), service.get('description', ''),
+            " ".join(service.get('features', []) + service.get('use_cases', []))
+        ))
+
+    return documents
+
+
+def load_documents(category: str, file_path: str) -> Optional[List[KnowledgeDocument]]:
+    """Parse one knowledge base file; None if it is missing or invalid"""
+    try:
+        with open(file_path, 'r') as f:
+            return parse_documents(category, json.load(f))
+    except (json.JSONDecodeError, FileNotFoundError):
+        return None
+
+
+class FileState(NamedTuple):
+    """Change-detection fingerprint for one knowledge base file"""
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+class IndexSnapshot(NamedTuple):
+    """Immutable view of the index; replaced wholesale on reload"""
+    generation: int
+    partitions: Dict[str, KnowledgePartition]
+    ranker: BM25Ranker
+
+
+class KnowledgeIndex:
+    """Knowledge base index built once at startup and shared by every search
+
+    Searches read a single immutable snapshot, so a reload can build new
+    partitions off to the side and publish them with one reference swap.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.file_states: Dict[str, FileState] = {}
+        self._reload_lock = threading.Lock()
+        self._snapshot = IndexSnapshot(0, {}, BM25Ranker([], tokenize))
+        self.refresh()
+
+    @classmethod
+    def from_directory(cls, directory: str) -> "KnowledgeIndex":
+        """Build the index from the JSON files in a knowledge base directory"""
+        return cls(directory)
+
+    @property
+    def generation(self) -> int:
+        """Bumped every time a reload changes the indexed content"""
+        return self._snapshot.generation
+
+    @property
+    def partitions(self) -> Dict[str, KnowledgePartition]:
+        return self._snapshot.partitions
+
+    @property
+    def ranker(self) -> BM25Ranker:
+        return self._snapshot.ranker
+
+    def _load_partition(self, category: str, file_path: str) -> Tuple[Optional[FileState], Optional[KnowledgePartition], bool]:
+        """Re-read a file if it changed; returns (state, partition, changed)"""
+        previous = self.file_states.get(category)
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None, None, previous is not None
+
+        if previous and (previous.mtime_ns, previous.size) == (stat.st_mtime_ns, stat.st_size):
+            return previous, self.partitions.get(category), False
+
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        state = FileState(stat.st_mtime_ns, stat.st_size, hashlib.sha256(raw).hexdigest())
+
+        # Touched but identical content: keep the existing partition
+        if previous and previous.digest == state.digest:
+            return state, self.partitions.get(category), False
+
+        try:
+            partition = KnowledgePartition(category, parse_documents(category, json.loads(raw)))
+        except Exception as e:
+            # A half-saved or malformed edit must not wipe the category; keep serving the
+            # old partition and retry on the next refresh
+            print(f"[KNOWLEDGE] Skipping unreadable {os.path.basename(file_path)}: {e}")
+            return previous, self.partitions.get(category), False
+
+        return state, partition, True
+
+    def refresh(self) -> List[str]:
+        """Re-index categories whose files changed; returns the changed categories"""
+        with self._reload_lock:
+            snapshot = self._snapshot
+            partitions = dict(snapshot.partitions)
+            file_states = dict(self.file_states)
+            changed = []
+
+            for category, file_name in KNOWLEDGE_FILES.items():
+                state, partition, was_changed = self._load_partition(
+                    category, os.path.join(self.directory, file_name)
+                )
+                if state is None:
+                    file_states.pop(category, None)
+                else:
+                    file_states[category] = state
+                if not was_changed:
+                    continue
+
+                changed.append(category)
+                if partition is None:
+                    partitions.pop(category, None)
+                else:
+                    partitions[category] = partition
+
+            if changed:
+                # Keep category order stable regardless of which partition was replaced
+                partitions = {c: partitions[c] for c in KNOWLEDGE_FILES if c in partitions}
+                documents = [d for partition in partitions.values() for d in partition.documents]
+                doc_terms = [t for partition in partitions.values() for t in partition.doc_terms]
+                ranker = BM25Ranker(documents, tokenize, doc_terms=doc_terms)
+                self._snapshot = IndexSnapshot(snapshot.generation + 1, partitions, ranker)
+
+            # Committed last, so a failed refresh sees the same files as changed next time
+            self.file_states = file_states
+            return changed
+
+    def documents(self) -> List[KnowledgeDocument]:
+        """Every indexed document, in category then file order"""
+        return [document for partition in self.partitions.values() for document in partition.documents]
+
+    def select(self, category: Optional[str] = None) -> Iterable[KnowledgePartition]:
+        """Partitions to search, honouring an optional category filter"""
+        partitions = self.partitions
+        if category and category in partitions:
+            return [partitions[category]]
+        return partitions.values()
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 3) -> List[KnowledgeDocument]:
+        """Find documents containing every query token"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        results: List[KnowledgeDocument] = []
+        for partition in self.select(category):
+            results.extend(partition.search(tokens))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def rank(self, query: str, category: Optional[str] = None, k: int = 3) -> List[KnowledgeDocument]:
+        """BM25-ranked top-k documents for a query"""
+        return [document for document, _ in self.ranker.rank(query, category, k)]
+
+    def rank_batch(self, queries: Sequence[str], category: Optional[str] = None,
+                   k: int = 3) -> List[List[Tuple[KnowledgeDocument, float]]]:
+        """BM25-ranked top-k (document, score) pairs for each query, scored together"""
+        return self.ranker.rank_batch(queries, category, k)
+
+
+class KnowledgeBaseWatcher:
+    """Background thread that polls the knowledge base files and hot-reloads changes"""
+
+    def __init__(self, index: KnowledgeIndex, interval: float = 5.0):
+        self.index = index
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start polling; a non-positive interval disables the watcher"""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="knowledge-base-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                changed = self.index.refresh()
+            except Exception as e:
+                # Keep serving the current generation and retry on the next tick
+                print(f"[KNOWLEDGE] Reload failed: {e}")
+                continue
+            if changed:
+                print(f"[KNOWLEDGE] Reloaded {', '.join(changed)} (generation {self.index.generation})")
@@ -0,0 +1,92 @@
+# tools/knowledge_ranking.py - BM25 ranking over the knowledge base
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Standard BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+class BM25Ranker:
+    """Vectorized BM25 scorer over a fixed set of documents
+
+    The term-frequency matrix is turned into a dense (documents x terms) matrix of
+    BM25 term weights once, so scoring a batch of queries is a single matrix product.
+    Documents only need a ``text()`` method and a ``category`` attribute.
+    Building the matrix from pre-tokenized ``doc_terms`` is cheap, so reloads
+    rebuild it instead of patching it in place.
+    """
+
+    def __init__(self, documents: Sequence[Any], tokenize: Callable[[str], List[str]],
+                 k1: float = BM25_K1, b: float = BM25_B, doc_terms: Optional[Sequence[List[str]]] = None):
+        self.documents = list(documents)
+        self.tokenize = tokenize
+        self.vocabulary: Dict[str, int] = {}
+        self.categories: Dict[str, int] = {}
+
+        # Callers that already tokenized their documents pass the terms in
+        if doc_terms is None:
+            doc_terms = [self.tokenize(document.text()) for document in self.documents]
+        for terms in doc_terms:
+            for term in terms:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        n_docs, n_terms = len(self.documents), len(self.vocabulary)
+        self.term_frequencies = np.zeros((n_docs, n_terms), dtype=np.float32)
+        for row, terms in enumerate(doc_terms):
+            columns = np.fromiter((self.vocabulary[term] for term in terms), dtype=np.int64, count=len(terms))
+            np.add.at(self.term_frequencies[row], columns, 1.0)
+
+        self.category_ids = np.fromiter(
+            (self.categories.setdefault(document.category, len(self.categories)) for document in self.documents),
+            dtype=np.int32, count=n_docs
+        )
+
+        # BM25 term weights: idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * |d| / avgdl))
+        doc_lengths = self.term_frequencies.sum(axis=1)
+        avg_length = doc_lengths.mean() if n_docs else 0.0
+        doc_freq = (self.term_frequencies > 0).sum(axis=0)
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * doc_lengths / avg_length) if avg_length else np.full(n_docs, k1)
+        tf = self.term_frequencies
+        self.weights = (idf * tf * (k1 + 1) / (tf + norm[:, None].astype(np.float32))).astype(np.float32)
+
+    def query_matrix(self, queries: Sequence[str]) -> np.ndarray:
+        """Encode queries as a (queries x terms) matrix of term counts"""
+        matrix = np.zeros((len(queries), len(self.vocabulary)), dtype=np.float32)
+        for row, query in enumerate(queries):
+            for term in self.tokenize(query):
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    matrix[row, column] += 1.0
+        return matrix
+
+    def rank_batch(self, queries: Sequence[str], category: Optional[str] = None,
+                   k: int = 3) -> List[List[Tuple[Any, float]]]:
+        """Score every document for every query in one pass and return each query's top-k"""
+        if not queries or not self.documents or k <= 0:
+            return [[] for _ in queries]
+
+        scores = self.query_matrix(queries) @ self.weights.T  # (queries x documents)
+        if category and category in self.categories:
+            scores[:, self.category_ids != self.categories[category]] = 0.0
+
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+
+        results = []
+        for row in range(len(queries)):
+            ranked = []
+            for column in order[row]:
+                score = float(top_scores[row, column])
+                if score <= 0.0:
+                    break
+                ranked.append((self.documents[top[row, column]], score))
+            results.append(ranked)
+        return results
+
+    def rank(self, query: str, category: Optional[str] = None, k: int = 3) -> List[Tuple[Any, float]]:
+        """Top-k documents for a single query"""
+        return self.rank_batch([query], category, k)[0]
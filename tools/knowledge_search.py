@@ -1,61 +1,79 @@
-import json
 import os
-from typing import List, Dict, Any
+from typing import List
 from agents import function_tool
+from config.settings import settings, settings_fingerprint
+from tools.cache import cacheable
+from tools.knowledge_binary import MappedKnowledgeIndex, stale_sources
+from tools.knowledge_index import KnowledgeBaseWatcher, KnowledgeDocument, KnowledgeIndex
+
+
+def load_knowledge_index(index_path: str, source_dir: str):
+    """Map the compiled index when one is up to date, else index the JSON files"""
+    if os.path.exists(index_path):
+        stale = stale_sources(index_path, source_dir)
+        if not stale:
+            return MappedKnowledgeIndex(index_path, source_dir)
+        # Serving the old build would hide the edits; the JSON index also hot-reloads them
+        print(f"[KNOWLEDGE] {', '.join(stale)} changed after {index_path} was compiled; "
+              f"indexing the JSON files instead")
+    return KnowledgeIndex.from_directory(source_dir)
+
+
+# Built once at startup; searches never touch the JSON files
+knowledge_index = load_knowledge_index(settings.knowledge_index_path, settings.knowledge_base_dir)
+
+# Hot-reloads edited category files; started by the application entry point
+knowledge_watcher = KnowledgeBaseWatcher(knowledge_index, settings.knowledge_reload_interval)
+
+
+def knowledge_generation() -> int:
+    """Bumped on every knowledge base reload; cached search results depend on it"""
+    return knowledge_index.generation
+
+
+def format_results(results: List[KnowledgeDocument]) -> str:
+    """Render search hits for the agent"""
+    if results:
+        return "\n\n".join(document.render() for document in results)
+    else:
+        return "No specific information found in knowledge base."
+
+
+def search_knowledge(query: str, category: str = None) -> str:
+    """Search the prebuilt knowledge base index and format the top results"""
+    if settings.knowledge_search_mode == "exact":
+        # Documents containing every query term, in file order
+        results = knowledge_index.search(query, category, limit=3)
+    else:
+        # True top 3 by BM25 relevance
+        results = knowledge_index.rank(query, category, k=3)
+
+    return format_results(results)
+
+
+def search_knowledge_batch(queries: List[str], category: str = None) -> List[str]:
+    """Rank several queries in one vectorized scoring pass"""
+    return [
+        format_results([document for document, _ in ranked])
+        for ranked in knowledge_index.rank_batch(queries, category, k=3)
+    ]
+
 
 @function_tool
+@cacheable(max_size=1024, depends_on=(knowledge_generation, settings_fingerprint))
 def search_knowledge_base(query: str, category: str = None) -> str:
     """
     Search the company knowledge base for relevant information
-    
+
     Args:
         query: Search query
         category: Optional category filter (ai_development, automation, fullstack, cybersecurity)
-    
+
     Returns:
         Relevant information from knowledge base
     """
-    knowledge_files = {
-        "ai_development": "data/knowledge_base/ai_development.json",
-        "automation": "data/knowledge_base/automation.json", 
-        "fullstack": "data/knowledge_base/fullstack.json",
-        "cybersecurity": "data/knowledge_base/cybersecurity.json",
-        "company": "data/knowledge_base/company_info.json"
-    }
-    
-    results = []
-    query_lower = query.lower()
-    
-    # Determine which files to search
-    files_to_search = [knowledge_files[category]] if category and category in knowledge_files else knowledge_files.values()
-    
-    for file_path in files_to_search:
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    
-                # Search through FAQs
-                if 'faqs' in data:
-                    for faq in data['faqs']:
-                        if (query_lower in faq.get('question', '').lower() or 
-                            query_lower in faq.get('answer', '').lower()):
-                            results.append(f"Q: {faq['question']}\nA: {faq['answer']}")
-                
-                # Search through services
-                if 'services' in data:
-                    for service in data['services']:
-                        if query_lower in service.get('description', '').lower():
-                            results.append(f"Service: {service['name']}\n{service['description']}")
-                            
-            except (json.JSONDecodeError, FileNotFoundError):
-                continue
-    
-    if results:
-        return "\n\n".join(results[:3])  # Return top 3 results
-    else:
-        return "No specific information found in knowledge base."
+    return search_knowledge(query, category)
 
 def get_company_info() -> str:
     """Get general company information"""
-    return search_knowledge_base("company overview", "company")
\ No newline at end of file
+    return search_knowledge("company overview", "company")